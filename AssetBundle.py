@@ -0,0 +1,122 @@
+"""
+حزمة صور النظارات: كل الصور مفكوكة ومضروبة في الشفافية داخل ملف واحد مربوط بالذاكرة.
+Glasses sprite bundle: every PNG decoded and premultiplied once into a single
+memory-mapped array, so launching does no PNG decoding at all.
+
+الملفات (بجانب الصور في assets/):
+Files, next to the PNGs in assets/:
+    glasses_bundle.npy    بايتات BGRA مضروبة لكل الصور متتالية - Concatenated premultiplied BGRA bytes
+    glasses_bundle.json   الفهرس (الموضع والحجم) وبصمة كل PNG - Index (offset, size) and each PNG's size/mtime
+
+تُعاد الحزمة تلقائياً إذا تغيرت أو أُضيفت صورة مطلوبة، ويمكن بناؤها مسبقاً:
+The bundle is rebuilt automatically when a requested PNG changes or is added;
+it can also be built ahead of time:
+    python AssetBundle.py [assets_dir]
+"""
+import json
+import os
+import sys
+
+import cv2
+import numpy as np
+
+from UIDrawing import AlphaSprite
+
+BUNDLE_NAME = "glasses_bundle"
+BUNDLE_VERSION = 1
+
+
+def bundle_paths(assets_dir):
+    base = os.path.join(assets_dir, BUNDLE_NAME)
+    return base + ".npy", base + ".json"
+
+
+def _fingerprint(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _sources(assets_dir, names):
+    """{الاسم: بصمة الـ PNG} للصور الموجودة - {name: PNG fingerprint} for the PNGs that exist."""
+    sources = {}
+    for name in names:
+        path = os.path.join(assets_dir, f"{name}.png")
+        if os.path.exists(path): sources[name] = _fingerprint(path)
+    return sources
+
+
+def build_bundle(assets_dir):
+    """
+    فك كل صور المجلد وضربها في الشفافية وكتابة الحزمة (إن أمكن). تُرجع {الاسم: AlphaSprite}.
+    Decode and premultiply every PNG in the folder and write the bundle (when
+    the folder is writable). Returns {name: AlphaSprite}.
+    """
+    names = [f[:-4] for f in sorted(os.listdir(assets_dir)) if f.lower().endswith(".png")]
+    sprites, entries, chunks, offset = {}, [], [], 0
+    for name, fingerprint in _sources(assets_dir, names).items():
+        img = cv2.imread(os.path.join(assets_dir, f"{name}.png"), cv2.IMREAD_UNCHANGED)
+        if img is None or img.ndim != 3: continue
+        sprite = sprites[name] = AlphaSprite(img)
+        h, w = sprite.shape[:2]
+        entries.append({'name': name, 'offset': offset, 'h': h, 'w': w, 'source': fingerprint})
+        chunks.append(sprite.premultiplied.reshape(-1))
+        offset += h * w * 4
+
+    npy_path, index_path = bundle_paths(assets_dir)
+    try:
+        np.save(npy_path + ".tmp.npy", np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.uint8))
+        with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({'version': BUNDLE_VERSION, 'sprites': entries}, f)
+        os.replace(npy_path + ".tmp.npy", npy_path)
+        os.replace(index_path + ".tmp", index_path)
+    except OSError as e:
+        # مجلد للقراءة فقط (كشك مقفل): نستخدم الصور المفكوكة في الذاكرة
+        # Read-only folder (locked-down kiosk): keep the in-memory sprites
+        print(f"Warning: could not write sprite bundle ({e})")
+    return sprites
+
+
+def load_bundle(assets_dir, names):
+    """
+    الحزمة مربوطة بالذاكرة إذا كانت محدثة، وإلا None.
+    The requested sprites from the memory-mapped bundle if it is up to date, else None.
+    """
+    npy_path, index_path = bundle_paths(assets_dir)
+    try:
+        with open(index_path, encoding="utf-8") as f:
+            index = json.load(f)
+        data = np.load(npy_path, mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+    if index.get('version') != BUNDLE_VERSION: return None
+    entries = {e['name']: e for e in index['sprites']}
+    sources = _sources(assets_dir, names)
+    # كل صورة مطلوبة موجودة وبنفس البصمة (الصور الزائدة لا تضر)
+    # Every requested PNG is present with the same fingerprint (extra entries are fine)
+    if any(name not in entries or entries[name]['source'] != fp for name, fp in sources.items()): return None
+
+    sprites = {}
+    for name in sources:
+        e = entries[name]
+        size = e['h'] * e['w'] * 4
+        view = data[e['offset']:e['offset'] + size].reshape(e['h'], e['w'], 4)
+        sprites[name] = AlphaSprite(view, premultiplied=True)
+    return sprites
+
+
+def load_sprites(assets_dir, names):
+    """
+    صور النظارات من الحزمة، أو من ملفات PNG مع إعادة بناء الحزمة.
+    Glasses sprites from the bundle, or from the PNGs (rebuilding the bundle).
+    """
+    sprites = load_bundle(assets_dir, names)
+    if sprites is None:
+        built = build_bundle(assets_dir)
+        sprites = {name: built[name] for name in names if name in built}
+    return sprites
+
+
+if __name__ == "__main__":
+    assets = sys.argv[1] if len(sys.argv) > 1 else "assets"
+    built = build_bundle(assets)
+    print(f"{bundle_paths(assets)[0]}: {len(built)} sprites")
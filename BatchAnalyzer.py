@@ -0,0 +1,224 @@
+"""
+تحليل بدون واجهة لملفات الفيديو ومجلدات الصور (للخوادم والقياس).
+Headless analysis of video files and image folders, for servers and benchmarks.
+
+نفس منطق النظام (FaceMesh + get_geometric_shape + التصويت + SmartExpert) بدون
+أي رسم أو نافذة أو كاميرا. النتائج تُكتب كسطر JSON لكل إطار.
+Runs the app's pipeline (FaceMesh + get_geometric_shape + the shape vote +
+SmartExpert) with no drawing, window or camera, and streams one JSON line per
+analyzed frame.
+
+Usage:
+    python BatchAnalyzer.py clip.mp4 frames_dir/ --output results.jsonl
+    python BatchAnalyzer.py videos/*.mp4 --workers 4 --skip 2
+    python BatchAnalyzer.py clip.mp4 --max-faces 4 --inference-h 320
+
+كل سطر / Each line:
+    {"source": ..., "frame": 12, "t": 0.4, "faces": [{"track_id": 1, "box": [...],
+     "aligned": true, "raw_shape": "Oval", "shape": "Oval", "stats": {...},
+     "recommendations": ["rectangle", "square", "aviator"]}]}
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+import cv2
+
+from Smart_Glasses_Project import TARGET_H, FaceAnalyzer, MultiFaceAnalyzer
+from SmartExpert import SmartExpert
+
+IMAGE_EXTS = ('.jpg', '.png', '.jpeg')
+STAT_NAMES = ("face_ratio", "chin_angle", "jaw_ratio", "forehead_ratio")
+
+# محرك خبير واحد لكل عملية؛ الكاشف جديد لكل مصدر (حالة التتبع لا تنتقل بين الفيديوهات)
+# One expert per process; a fresh detector per source (tracking state must not carry across videos)
+_expert = None
+
+
+def new_detector(static, max_faces):
+    from cvzone.FaceMeshModule import FaceMeshDetector
+    return FaceMeshDetector(staticMode=static, maxFaces=max_faces)
+
+
+def get_expert():
+    global _expert
+    if _expert is None: _expert = SmartExpert()
+    return _expert
+
+
+def expand_sources(paths):
+    """
+    المسارات المعطاة إلى قائمة مصادر (فيديو أو مجلد صور).
+    Expand the CLI paths into sources: video files and image folders.
+    """
+    sources = []
+    for path in paths:
+        if os.path.isdir(path) and any(f.lower().endswith(IMAGE_EXTS) for f in os.listdir(path)):
+            sources.append(os.path.abspath(path))
+        elif os.path.isdir(path):
+            # مجلد فيديوهات - a folder of videos
+            sources.extend(os.path.abspath(os.path.join(path, f)) for f in sorted(os.listdir(path))
+                           if not f.startswith('.') and os.path.isfile(os.path.join(path, f)))
+        elif os.path.isfile(path):
+            sources.append(os.path.abspath(path))
+        else:
+            print(f"Skipping missing path: {path}", file=sys.stderr)
+    return sources
+
+
+def iter_frames(source, skip=1):
+    """
+    (رقم الإطار، الزمن بالثواني، الصورة) كل skip إطارات؛ الإطارات المتخطاة لا تُفك.
+    Yield (index, seconds, image) for every `skip`-th frame. Skipped video frames
+    are only grabbed, not decoded into images.
+    """
+    if os.path.isdir(source):
+        names = sorted(f for f in os.listdir(source) if f.lower().endswith(IMAGE_EXTS))
+        for i in range(0, len(names), skip):
+            img = cv2.imread(os.path.join(source, names[i]))
+            if img is not None: yield i, None, img
+        return
+    cap = cv2.VideoCapture(source)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 0
+    index = 0
+    try:
+        while True:
+            if index % skip:
+                if not cap.grab(): break
+            else:
+                success, img = cap.read()
+                if not success: break
+                yield index, (index / fps if fps > 0 else None), img
+            index += 1
+    finally:
+        cap.release()
+
+
+def scale_frame(img, target_h):
+    """
+    تحجيم لنفس ارتفاع الواجهة (بدون عكس) - Resize to the UI height (no mirroring,
+    so boxes stay in the footage's own orientation).
+    """
+    if target_h is None or img.shape[0] == target_h: return img
+    return cv2.resize(img, (int(img.shape[1] * target_h / img.shape[0]), target_h))
+
+
+def face_record(result):
+    """نتيجة وجه واحد إلى قاموس JSON - One face's analyzer result as a JSON-ready dict."""
+    aligned = result['raw_shape'] is not None
+    return {
+        'track_id': result.get('track_id'),
+        'box': [int(v) for v in result['face_box']],
+        'aligned': aligned,
+        'raw_shape': result['raw_shape'],
+        'shape': result['shape'],
+        'stats': dict(zip(STAT_NAMES, (round(float(v), 3) for v in result['stats']))) if aligned else None,
+        'recommendations': list(result['recommendations']),
+    }
+
+
+def iter_source(source, opts):
+    """
+    تحليل مصدر واحد وإرجاع سطر JSON لكل إطار محلَّل.
+    Analyze one source, yielding one JSON line per analyzed frame.
+    """
+    is_dir = os.path.isdir(source)
+    # صور مستقلة: وضع ثابت ونافذة تصويت من إطار واحد - Unrelated images: static mode, 1-frame vote
+    window = opts['window'] or (1 if is_dir else FaceAnalyzer.BUFFER_SIZE)
+    # كاشف ومحلل جديدان لكل مصدر: لا تتبع ولا تصويت ولا معرّفات من الفيديو السابق
+    # Fresh detector and analyzer per source: no tracking, votes or track ids from the previous one
+    detector = new_detector(is_dir, opts['max_faces'])
+    if opts['max_faces'] > 1:
+        analyzer = MultiFaceAnalyzer(detector, get_expert(), window, opts['inference_h'])
+    else:
+        analyzer = FaceAnalyzer(detector, get_expert(), window, opts['inference_h'])
+
+    try:
+        for index, seconds, img in iter_frames(source, opts['skip']):
+            result = analyzer.analyze(scale_frame(img, opts['height']))
+            faces = result['faces'] or ((result,) if result['face_box'] is not None else ())
+            yield json.dumps({'source': source, 'frame': index,
+                              't': None if seconds is None else round(seconds, 3),
+                              'faces': [face_record(f) for f in faces]}, ensure_ascii=False)
+    finally:
+        detector.faceMesh.close()
+
+
+def analyze_source(job):
+    """
+    (يعمل داخل العمليات الفرعية) تحليل ملف كامل - (Runs in pool workers) analyze a
+    whole source; returns (source, lines, seconds).
+    """
+    source, opts = job
+    t0 = time.perf_counter()
+    lines = list(iter_source(source, opts))
+    return source, lines, time.perf_counter() - t0
+
+
+def _report(source, frames, seconds):
+    print(f"{os.path.basename(source)}: {frames} frames, {frames / max(seconds, 1e-9):.1f} fps", file=sys.stderr)
+
+
+def run(sources, opts, workers=1, out=sys.stdout):
+    """
+    تحليل كل المصادر وكتابة النتائج. بعملية واحدة تُكتب الأسطر فور إنتاجها،
+    ومع عدة عمليات تُوزع الملفات عليها ويُكتب كل ملف فور اكتماله.
+    Analyze every source. With one process lines are streamed as they are
+    produced; with several, files are sharded across the pool and each file's
+    lines are written as soon as it completes. Returns (frames, wall seconds).
+    """
+    t0 = time.perf_counter()
+    total = 0
+    if workers <= 1 or len(sources) <= 1:
+        for source in sources:
+            t_file, frames = time.perf_counter(), 0
+            for line in iter_source(source, opts):
+                out.write(line + "\n")
+                frames += 1
+            out.flush()
+            _report(source, frames, time.perf_counter() - t_file)
+            total += frames
+        return total, time.perf_counter() - t0
+
+    with Pool(min(workers, len(sources))) as pool:
+        for source, lines, seconds in pool.imap_unordered(analyze_source, [(s, opts) for s in sources]):
+            for line in lines: out.write(line + "\n")
+            out.flush()
+            _report(source, len(lines), seconds)
+            total += len(lines)
+    return total, time.perf_counter() - t0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless face-shape / glasses analysis")
+    parser.add_argument("paths", nargs="+", help="video files, image folders, or folders of videos")
+    parser.add_argument("--output", "-o", default="-", help="JSON-lines output file (default: stdout)")
+    parser.add_argument("--skip", type=int, default=1, help="analyze every Nth frame")
+    parser.add_argument("--workers", type=int, default=1, help="processes; files are sharded across them")
+    parser.add_argument("--max-faces", type=int, default=1, help="faces per frame (>1 enables tracking)")
+    parser.add_argument("--height", type=int, default=TARGET_H, help="resize frames to this height (0 = native)")
+    parser.add_argument("--inference-h", type=int, default=None, help="FaceMesh input height")
+    parser.add_argument("--window", type=int, default=None,
+                        help="shape vote window (default: 15 for videos, 1 for image folders)")
+    args = parser.parse_args(argv)
+
+    sources = expand_sources(args.paths)
+    if not sources:
+        parser.error("no readable inputs")
+    opts = {'skip': max(1, args.skip), 'max_faces': args.max_faces, 'height': args.height or None,
+            'inference_h': args.inference_h, 'window': args.window}
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        frames, seconds = run(sources, opts, args.workers, out)
+    finally:
+        if out is not sys.stdout: out.close()
+    print(f"Total: {frames} frames from {len(sources)} sources in {seconds:.1f} s "
+          f"({frames / max(seconds, 1e-9):.1f} fps aggregate, {args.workers} workers)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
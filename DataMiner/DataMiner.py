@@ -1,13 +1,39 @@
 """
 أداة تحليل البيانات لاستخراج خصائص الوجه من مجموعة الصور.
 Data analysis tool to extract face features from the dataset.
+
+- يوزع فك ترميز الصور واستخراج FaceMesh على كل الأنوية (Process Pool).
+  Image decoding and FaceMesh extraction are fanned out over all cores.
+- نتائج كل صورة تُحفظ في ذاكرة مؤقتة على القرص (المسار + وقت التعديل)،
+  فإعادة التشغيل أو إضافة صور جديدة تعالج الجديد فقط.
+  Per-image results are cached on disk (path + mtime), so reruns and added
+  images are incremental.
+
+Usage:
+    python DataMiner.py                 # كل الصور بكل الأنوية - every image, all cores
+    python DataMiner.py --limit 60      # عينة 60 صورة لكل شكل - 60-image sample per shape
+    python DataMiner.py --workers 1     # بدون توازي - single process
+    python DataMiner.py --evaluate      # تقييم المصنّف بعد الاستخراج - score the classifier afterwards
+
+الناتج: مخزن خصائص عمودي في DataMiner/feature_store (انظر FeatureStore.py).
+Output: a columnar feature store in DataMiner/feature_store (see FeatureStore.py).
 """
+import argparse
 import cv2
 import os
-import math
+import sqlite3
+import sys
 import numpy as np
+from multiprocessing import Pool
 from cvzone.FaceMeshModule import FaceMeshDetector
 
+# محرك الهندسة المشترك مع النظام الرئيسي (في المجلد الأب)
+# Geometry engine shared with the main app (parent folder)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from FaceGeometry import compute_features
+from FeatureStore import save_feature_store
+import ShapeEvaluator
+
 # ==========================================
 # إعدادات المسار (Path Configuration)
 # ضع مسار الداتاسيت هنا - Update Dataset Path Here
@@ -17,92 +43,219 @@ DATASET_PATH = os.path.join("..", "FaceShape Dataset", "testing_set")
 # استخدم مسار نسبي لجعله يعمل على أي جهاز
 # Use relative path to make it portable
 
+# ملف الذاكرة المؤقتة بجانب هذا السكربت - Feature cache next to this script
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "feature_cache.sqlite")
+
+# مخزن الخصائص العمودي الناتج - Columnar feature store output
+STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "feature_store")
+
 SHAPES = ["Square", "Round", "Oval", "Heart", "Oblong", "Diamond"]
-detector = FaceMeshDetector(maxFaces=1)
+IMAGE_EXTS = ('.jpg', '.png', '.jpeg')
+FEATURE_NAMES = ("face_ratio", "jaw_ratio", "forehead_ratio", "chin_angle")
 
-def calculate_angle(p1, p2, p3):
+# كاشف واحد لكل عملية، يُنشأ عند أول استخدام (لا يصح نسخه بين العمليات)
+# One detector per process, created lazily (MediaPipe graphs must not cross a fork)
+_detector = None
+
+def get_detector():
+    global _detector
+    if _detector is None:
+        # الصور مستقلة عن بعضها، لذا نستخدم الوضع الثابت بدلاً من التتبع
+        # Images are unrelated, so use static mode instead of video tracking
+        _detector = FaceMeshDetector(staticMode=True, maxFaces=1)
+    return _detector
+
+# ==========================================
+# الذاكرة المؤقتة للخصائص (Feature Cache)
+# ==========================================
+class FeatureCache:
     """
-    حساب الزاوية بين ثلاث نقاط.
-    Calculate angle between three points.
+    ذاكرة مؤقتة SQLite: لكل صورة النقاط (468×2) والنسب الأربع، مفتاحها المسار + mtime.
+    SQLite cache of per-image landmarks (468x2) and the four ratios, keyed by path + mtime.
+    الصور التي لا يوجد بها وجه تُحفظ أيضاً (landmarks = NULL) حتى لا تُعاد معالجتها.
+    Images without a face are cached too (NULL landmarks) so they are not retried.
     """
-    x1, y1 = p1
-    x2, y2 = p2
-    x3, y3 = p3
-    angle = math.degrees(math.atan2(y3 - y2, x3 - x2) - math.atan2(y1 - y2, x1 - x2))
-    if angle < 0: angle += 360
-    if angle > 180: angle = 360 - angle
-    return angle
-
-def analyze_shape_advanced(shape_name):
+    COMMIT_EVERY = 64
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS images (path TEXT PRIMARY KEY, mtime REAL, landmarks BLOB, "
+            + ", ".join(f"{name} REAL" for name in FEATURE_NAMES) + ")")
+        self._pending = 0
+
+    def lookup(self, paths):
+        """
+        إرجاع {path: (landmarks, features)} للصور المحفوظة التي لم تتغير.
+        Return {path: (landmarks, features)} for cached images whose mtime still matches.
+        """
+        wanted = {p: os.path.getmtime(p) for p in paths}
+        found = {}
+        for path, mtime, blob, *feats in self.conn.execute(
+                "SELECT path, mtime, landmarks, " + ", ".join(FEATURE_NAMES) + " FROM images"):
+            if wanted.get(path) != mtime: continue
+            landmarks = None if blob is None else np.frombuffer(blob, dtype=np.int32).reshape(-1, 2)
+            found[path] = (landmarks, None if blob is None else np.array(feats, dtype=np.float64))
+        return found
+
+    def put(self, path, mtime, landmarks, features):
+        blob = None if landmarks is None else np.ascontiguousarray(landmarks, dtype=np.int32).tobytes()
+        feats = [None] * len(FEATURE_NAMES) if features is None else [float(v) for v in features]
+        self.conn.execute("INSERT OR REPLACE INTO images VALUES (?, ?, ?, " + ", ".join("?" * len(FEATURE_NAMES)) + ")",
+                          [path, mtime, blob, *feats])
+        self._pending += 1
+        # الحفظ الدوري يسمح باستئناف التشغيل بعد انقطاعه - Periodic commits make runs resumable
+        if self._pending >= self.COMMIT_EVERY: self.commit()
+
+    def commit(self):
+        self.conn.commit()
+        self._pending = 0
+
+    def close(self):
+        self.commit()
+        self.conn.close()
+
+# ==========================================
+# الاستخراج (Extraction)
+# ==========================================
+def list_images(shape_name, limit=None):
     """
-    تحليل مجموعة صور لشكل وجه معين واستخراج المتوسطات.
-    Analyze a set of images for a specific face shape and extract averages.
+    مسارات صور شكل معين (مرتبة)، مع حد أقصى اختياري.
+    Sorted image paths for one shape, optionally capped at `limit`.
     """
     folder = os.path.join(DATASET_PATH, shape_name)
     if not os.path.exists(folder):
         print(f"Folder not found: {shape_name} | مسار غير موجود")
-        return
+        return []
+    files = sorted(f for f in os.listdir(folder) if f.lower().endswith(IMAGE_EXTS))
+    if limit is not None: files = files[:limit]
+    return [os.path.abspath(os.path.join(folder, f)) for f in files]
 
+def extract_image(img_path):
+    """
+    (يعمل داخل العمليات الفرعية) فك ترميز الصورة واستخراج النقاط والنسب.
+    (Runs in pool workers) decode one image and extract landmarks + ratios.
+    """
+    mtime = os.path.getmtime(img_path)
+    img = cv2.imread(img_path)
+    if img is None: return img_path, mtime, None, None
+    _, faces = get_detector().findFaceMesh(img, draw=False)
+    if not faces: return img_path, mtime, None, None
+    landmarks = np.array(faces[0], dtype=np.int32)
+    feats = compute_features(landmarks)
+    return img_path, mtime, landmarks, np.array([feats[name] for name in FEATURE_NAMES], dtype=np.float64)
+
+def mine(paths, workers=None, cache=None):
+    """
+    استخراج الخصائص لكل المسارات مع إعادة استخدام الذاكرة المؤقتة.
+    Extract features for every path, reusing cached results and processing the
+    remaining images across `workers` processes (None = all cores, 1 = in-process).
+    Returns {path: (landmarks, features)}; images without a face map to (None, None).
+    """
+    results = cache.lookup(paths) if cache is not None else {}
+    todo = [p for p in paths if p not in results]
+    print(f"{len(paths)} images: {len(paths) - len(todo)} cached, {len(todo)} to process")
+    if not todo: return results
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(todo) == 1:
+        iterator = map(extract_image, todo)
+        pool = None
+    else:
+        pool = Pool(min(workers, len(todo)))
+        iterator = pool.imap_unordered(extract_image, todo, chunksize=4)
+    try:
+        for count, (path, mtime, landmarks, feats) in enumerate(iterator, 1):
+            results[path] = (landmarks, feats)
+            if cache is not None: cache.put(path, mtime, landmarks, feats)
+            print(f"Processed {count}/{len(todo)} images...", end='\r')
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if cache is not None: cache.commit()
+    print()
+    return results
+
+# ==========================================
+# التحليل (Analysis)
+# ==========================================
+def summarize_shape(shape_name, feature_rows):
+    """طباعة متوسطات النسب لشكل معين - Print the mean ratios for one shape."""
+    feats = np.array([f for f in feature_rows if f is not None and np.all(np.isfinite(f))])
+    if not len(feats): return
+    means = dict(zip(FEATURE_NAMES, feats.mean(axis=0)))
+    print(f"\nResults for: {shape_name.upper()} ({len(feats)} faces)")
+    print(f"  > Face Ratio (Height):    {means['face_ratio']:.1f}")
+    print(f"  > Jaw Ratio (Width):      {means['jaw_ratio']:.1f}")
+    print(f"  > Forehead Ratio:         {means['forehead_ratio']:.1f}")
+    print(f"  > Chin Angle:             {means['chin_angle']:.1f}")
+    print("------------------------------------------------")
+
+def analyze_shape_advanced(shape_name, limit=None, workers=None, cache=None):
+    """
+    تحليل مجموعة صور لشكل وجه معين واستخراج المتوسطات.
+    Analyze a set of images for a specific face shape and extract averages.
+    """
+    paths = list_images(shape_name, limit)
+    if not paths: return
     print(f"--- Analyzing: {shape_name} ---")
-    
-    r_face_len = []
-    r_jaw_width = []
-    r_forehead = []
-    angles = []
-    
-    count = 0
-    files = os.listdir(folder)
-    
-    for file in files:
-        if count >= 60: break # نكتفي بـ 60 صورة للعينة - Limit to 60 images sample
-        if not file.lower().endswith(('.jpg', '.png', '.jpeg')): continue
-        
-        img_path = os.path.join(folder, file)
-        img = cv2.imread(img_path)
-        if img is None: continue
-        
-        img, faces = detector.findFaceMesh(img, draw=False)
-        if faces:
-            f = faces[0]
-            
-            # النقاط الرئيسية في الوجه (Face Mesh Points)
-            pt_cheek_L, pt_cheek_R = f[234], f[454]
-            pt_jaw_L, pt_jaw_R = f[132], f[361]
-            pt_fore_L, pt_fore_R = f[103], f[332]
-            pt_top, pt_bottom = f[10], f[152]
-            
-            # حساب المسافات (Distances)
-            w_cheeks, _ = detector.findDistance(pt_cheek_L, pt_cheek_R)
-            w_jaw, _ = detector.findDistance(pt_jaw_L, pt_jaw_R)
-            w_forehead, _ = detector.findDistance(pt_fore_L, pt_fore_R)
-            h_face, _ = detector.findDistance(pt_top, pt_bottom)
-            
-            # حساب الزاوية (Chin Angle)
-            ang = calculate_angle(f[132], f[152], f[361])
-            
-            # حساب النسب (Ratios)
-            if w_cheeks != 0: # Avoid division by zero
-                rf_len = (h_face / w_cheeks) * 100
-                rf_jaw = (w_jaw / w_cheeks) * 100
-                rf_fore = (w_forehead / w_cheeks) * 100
-                
-                r_face_len.append(rf_len)
-                r_jaw_width.append(rf_jaw)
-                r_forehead.append(rf_fore)
-                angles.append(ang)
-                
-                count += 1
-                print(f"Processed {count} images...", end='\r')
-
-    if r_face_len:
-        print(f"\nResults for: {shape_name.upper()}")
-        print(f"  > Face Ratio (Height):    {np.mean(r_face_len):.1f}")
-        print(f"  > Jaw Ratio (Width):      {np.mean(r_jaw_width):.1f}")
-        print(f"  > Forehead Ratio:         {np.mean(r_forehead):.1f}")
-        print(f"  > Chin Angle:             {np.mean(angles):.1f}")
-        print("------------------------------------------------")
+    results = mine(paths, workers, cache)
+    summarize_shape(shape_name, [results[p][1] for p in paths])
+
+def write_store(output, paths_by_shape, results):
+    """
+    كتابة كل الوجوه المكتشفة إلى مخزن الخصائص العمودي.
+    Write every detected face to the columnar feature store.
+    """
+    landmarks, labels, paths = [], [], []
+    for shape_name, shape_paths in paths_by_shape.items():
+        for p in shape_paths:
+            lm = results[p][0]
+            if lm is None: continue
+            landmarks.append(lm)
+            labels.append(shape_name)
+            paths.append(p)
+    store = save_feature_store(output, np.array(landmarks).reshape(-1, 468, 2), labels, paths, SHAPES)
+    print(f"Feature store written: {output} ({len(store)} faces)")
+    return store
+
+def analyze_dataset(shapes=SHAPES, limit=None, workers=None, cache=None, output=None):
+    """
+    تحليل كل الأشكال في مجمّع عمليات واحد (توازٍ أفضل من شكل تلو الآخر).
+    Analyze every shape with a single pool run (better parallelism than per-shape runs)
+    and, if `output` is given, write the columnar feature store.
+    """
+    paths_by_shape = {s: list_images(s, limit) for s in shapes}
+    all_paths = [p for paths in paths_by_shape.values() for p in paths]
+    if not all_paths: return {}
+    results = mine(all_paths, workers, cache)
+    for s, paths in paths_by_shape.items():
+        if paths: summarize_shape(s, [results[p][1] for p in paths])
+    if output is not None: write_store(output, paths_by_shape, results)
+    return results
 
 # تشغيل التحليل (Run Analysis)
 if __name__ == "__main__":
-    for s in SHAPES:
-        analyze_shape_advanced(s)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Face Shape dataset miner")
+    parser.add_argument("--dataset", default=DATASET_PATH, help="folder with one sub-folder per shape")
+    parser.add_argument("--limit", type=int, default=None, help="max images per shape (default: all)")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--cache", default=CACHE_PATH, help="feature cache file")
+    parser.add_argument("--no-cache", action="store_true", help="ignore and do not write the cache")
+    parser.add_argument("--output", default=STORE_PATH, help="columnar feature store folder")
+    parser.add_argument("--no-store", action="store_true", help="only print the means")
+    parser.add_argument("--evaluate", action="store_true",
+                        help="then run ShapeEvaluator (confusion matrices, precision/recall) on the results")
+    args = parser.parse_args()
+
+    DATASET_PATH = args.dataset
+    cache = None if args.no_cache else FeatureCache(args.cache)
+    try:
+        analyze_dataset(SHAPES, args.limit, args.workers, cache, None if args.no_store else args.output)
+    finally:
+        if cache is not None: cache.close()
+    if args.evaluate:
+        inputs = ([] if args.no_store else ["--input", args.output]) + ([] if args.no_cache else ["--input", args.cache])
+        if inputs: sys.exit(ShapeEvaluator.main(inputs))
@@ -0,0 +1,201 @@
+"""
+محرك هندسة الوجه المتجه (NumPy) المشترك بين النظام و DataMiner.
+Vectorized face-geometry engine shared by the live app and DataMiner.
+
+يستقبل نقاط FaceMesh كمصفوفة (468×2) لوجه واحد أو (N×468×2) لدفعة كاملة،
+ويحسب كل المسافات والنسب وزاوية الذقن ونسبة الالتفات في تمريرة واحدة.
+Takes FaceMesh landmarks as a (468, 2) array for one face or an (N, 468, 2)
+batch and computes every distance, ratio, chin angle and yaw ratio in one pass.
+
+لوجه واحد في كل إطار يوجد مسار عددي بسيط (face_features / classify_shape)
+لأن تكلفة استدعاءات NumPy أكبر من الحساب نفسه لتسع نقاط.
+For the single live face per frame there is a plain-float path
+(face_features / classify_shape): on nine points NumPy's per-call overhead
+costs more than the maths.
+"""
+import math
+
+import numpy as np
+
+# ==========================================
+# نقاط FaceMesh المستخدمة (Landmark Indices)
+# ==========================================
+NOSE = 4
+HEAD_TOP, CHIN_BOTTOM = 10, 152
+CHEEK_L, CHEEK_R = 234, 454
+JAW_L, JAW_R = 132, 361
+FORE_L, FORE_R = 103, 332
+
+# النقاط التسع المستخدمة فقط؛ تُنتقى قبل التحويل إلى مصفوفة (لا حاجة لكل الـ 468)
+# The only nine points used; picked before any array conversion (no need for all 468)
+FEATURE_POINTS = (NOSE, HEAD_TOP, CHIN_BOTTOM, CHEEK_L, CHEEK_R, JAW_L, JAW_R, FORE_L, FORE_R)
+_LOCAL = {idx: i for i, idx in enumerate(FEATURE_POINTS)}
+
+# أزواج المسافات: طول الوجه، الخدين، الفك، الجبهة، الأنف-الأذن يسار/يمين (بترقيم FEATURE_POINTS)
+# Distance pairs: face height, cheeks, jaw, forehead, nose-ear left/right (FEATURE_POINTS positions)
+_PAIRS_A = np.array([_LOCAL[i] for i in (HEAD_TOP, CHEEK_L, JAW_L, FORE_L, NOSE, NOSE)])
+_PAIRS_B = np.array([_LOCAL[i] for i in (CHIN_BOTTOM, CHEEK_R, JAW_R, FORE_R, CHEEK_L, CHEEK_R)])
+_JAW_L, _CHIN, _JAW_R = _LOCAL[JAW_L], _LOCAL[CHIN_BOTTOM], _LOCAL[JAW_R]
+
+SHAPES = np.array(["Oval", "Round", "Square", "Oblong", "Heart", "Diamond"])
+
+# حدود قواعد الشكل؛ المصدر الوحيد للمسارين المتجه (classify_shapes) والعددي (classify_shape)
+# Shape-rule thresholds: the single source for both the vectorized (classify_shapes)
+# and the scalar (classify_shape) classifier
+SHAPE_RULES = {
+    'oblong_face_ratio': 128.0,     # face_ratio >= : Oblong
+    'short_face_ratio': 123.0,      # face_ratio <= : Square / Round
+    'square_chin_angle': 89.2,      # chin_angle >= : Square (else Round)
+    'oval_jaw_ratio': 94.0,         # jaw_ratio > : Oval
+    'pointed_chin_angle': 84.0,     # chin_angle < : Heart / Diamond (else Oval)
+    'heart_forehead_ratio': 70.0,   # forehead_ratio > : Heart (else Diamond)
+}
+
+# حدود الالتفات المقبولة (الرأس ينظر للأمام) - Accepted yaw range (looking forward)
+YAW_MIN, YAW_MAX = 0.60, 1.60
+
+
+def as_landmarks(faces):
+    """
+    تحويل نقاط cvzone (قائمة [x, y]) إلى مصفوفة float64.
+    Convert cvzone landmark lists (or a list of faces) into a float64 array.
+    """
+    return np.asarray(faces, dtype=np.float64)
+
+
+def feature_points(landmarks):
+    """
+    النقاط التسع فقط كمصفوفة (..., 9, 2)؛ قوائم cvzone تُنتقى قبل التحويل.
+    Just the FEATURE_POINTS as a float64 (..., 9, 2) array. cvzone lists are
+    indexed before conversion, so a 468-point face costs 9 points, not 936 numbers.
+    """
+    if isinstance(landmarks, np.ndarray):
+        return landmarks[..., FEATURE_POINTS, :].astype(np.float64, copy=False)
+    if len(landmarks) and isinstance(landmarks[0][0], (list, tuple, np.ndarray)):
+        return np.array([[face[i] for i in FEATURE_POINTS] for face in landmarks], dtype=np.float64)
+    return np.array([landmarks[i] for i in FEATURE_POINTS], dtype=np.float64)
+
+
+def angle_between(p1, p2, p3):
+    """
+    الزاوية عند p2 بالدرجات (0-180) لمصفوفات نقاط بأي أبعاد دفعية.
+    Angle at p2 in degrees (0-180) for point arrays with any batch shape (..., 2).
+    """
+    p1, p2, p3 = (np.asarray(p, dtype=np.float64) for p in (p1, p2, p3))
+    angle = np.degrees(np.arctan2(p3[..., 1] - p2[..., 1], p3[..., 0] - p2[..., 0]) -
+                       np.arctan2(p1[..., 1] - p2[..., 1], p1[..., 0] - p2[..., 0]))
+    angle = np.where(angle < 0, angle + 360, angle)
+    return np.where(angle > 180, 360 - angle, angle)
+
+
+def compute_features(landmarks):
+    """
+    حساب كل المقاييس الهندسية دفعة واحدة.
+    Compute every geometric measure in one vectorized pass.
+
+    landmarks: (468, 2) أو (N, 468, 2). تُرجع قاموساً من مصفوفات بالأبعاد الدفعية
+    (أو قيم مفردة لوجه واحد).
+    Returns a dict of arrays with the batch shape (0-d for a single face).
+    """
+    lm = feature_points(landmarks)
+    dists = np.hypot(*np.moveaxis(lm[..., _PAIRS_B, :] - lm[..., _PAIRS_A, :], -1, 0))
+    h_face, w_cheeks, w_jaw, w_forehead, d_ear_l, d_ear_r = np.moveaxis(dists, -1, 0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        face_ratio = h_face / w_cheeks * 100
+        jaw_ratio = w_jaw / w_cheeks * 100
+        forehead_ratio = w_forehead / w_cheeks * 100
+    return {
+        'h_face': h_face, 'w_cheeks': w_cheeks, 'w_jaw': w_jaw, 'w_forehead': w_forehead,
+        'face_ratio': face_ratio, 'jaw_ratio': jaw_ratio, 'forehead_ratio': forehead_ratio,
+        'chin_angle': angle_between(lm[..., _JAW_L, :], lm[..., _CHIN, :], lm[..., _JAW_R, :]),
+        'yaw_ratio': d_ear_l / (d_ear_r + 1e-5),
+    }
+
+
+def face_features(face):
+    """
+    نفس compute_features لوجه واحد بعمليات عددية عادية (المسار الحي لكل إطار).
+    compute_features for a single face with plain float maths: the live per-frame
+    path, where NumPy's per-call overhead would dominate nine points.
+    Returns the same keys, as Python floats.
+    """
+    (nx, ny), (tx, ty), (cx, cy), (lx, ly), (rx, ry), (jlx, jly), (jrx, jry), (flx, fly), (frx, fry) = (
+        face[i] for i in FEATURE_POINTS)
+    h_face = math.hypot(cx - tx, cy - ty)
+    w_cheeks = math.hypot(rx - lx, ry - ly)
+    w_jaw = math.hypot(jrx - jlx, jry - jly)
+    w_forehead = math.hypot(frx - flx, fry - fly)
+    chin_angle = math.degrees(math.atan2(jry - cy, jrx - cx) - math.atan2(jly - cy, jlx - cx))
+    if chin_angle < 0: chin_angle += 360
+    if chin_angle > 180: chin_angle = 360 - chin_angle
+    # نفس نتيجة NumPy عند عرض صفري (inf أو nan) - Same as NumPy for a zero width (inf or nan)
+    face_ratio, jaw_ratio, forehead_ratio = (
+        v / w_cheeks * 100 if w_cheeks else (math.inf if v else math.nan) for v in (h_face, w_jaw, w_forehead))
+    return {
+        'h_face': h_face, 'w_cheeks': w_cheeks, 'w_jaw': w_jaw, 'w_forehead': w_forehead,
+        'face_ratio': face_ratio, 'jaw_ratio': jaw_ratio, 'forehead_ratio': forehead_ratio,
+        'chin_angle': chin_angle,
+        'yaw_ratio': math.hypot(lx - nx, ly - ny) / (math.hypot(rx - nx, ry - ny) + 1e-5),
+    }
+
+
+def is_aligned(features):
+    """قناع الوجوه التي تنظر للأمام - Mask of faces looking forward."""
+    yaw = features['yaw_ratio']
+    return (yaw > YAW_MIN) & (yaw < YAW_MAX)
+
+
+def classify_shapes(features):
+    """
+    تصنيف شكل الوجه بالقواعد الهندسية لكل عناصر الدفعة معاً.
+    Rule-based face-shape classification for a whole batch at once.
+    """
+    face_ratio = np.asarray(features['face_ratio'])
+    jaw_ratio = np.asarray(features['jaw_ratio'])
+    forehead_ratio = np.asarray(features['forehead_ratio'])
+    chin_angle = np.asarray(features['chin_angle'])
+
+    rules = SHAPE_RULES
+    oblong = face_ratio >= rules['oblong_face_ratio']
+    short = ~oblong & (face_ratio <= rules['short_face_ratio'])
+    middle = ~oblong & ~short & ~(jaw_ratio > rules['oval_jaw_ratio']) & (chin_angle < rules['pointed_chin_angle'])
+    shapes = np.select(
+        [oblong, short & (chin_angle >= rules['square_chin_angle']), short,
+         middle & (forehead_ratio > rules['heart_forehead_ratio']), middle],
+        ["Oblong", "Square", "Round", "Heart", "Diamond"],
+        default="Oval",
+    )
+    return shapes
+
+
+def classify_shape(features):
+    """
+    نفس قواعد classify_shapes لوجه واحد (قيم عادية) - classify_shapes for one face, without np.select.
+    Both read SHAPE_RULES; tests/test_face_geometry.py keeps the two in step.
+    """
+    rules = SHAPE_RULES
+    face_ratio, chin_angle = features['face_ratio'], features['chin_angle']
+    if face_ratio >= rules['oblong_face_ratio']: return "Oblong"
+    if face_ratio <= rules['short_face_ratio']:
+        return "Square" if chin_angle >= rules['square_chin_angle'] else "Round"
+    if features['jaw_ratio'] > rules['oval_jaw_ratio'] or not chin_angle < rules['pointed_chin_angle']: return "Oval"
+    return "Heart" if features['forehead_ratio'] > rules['heart_forehead_ratio'] else "Diamond"
+
+
+def feature_matrix(features):
+    """
+    المصفوفة (N×4) بترتيب stats في الواجهة: الطول، الزاوية، الفك، الجبهة.
+    (N, 4) matrix in the UI's stats order: face, chin angle, jaw, forehead.
+    """
+    return np.stack([features['face_ratio'], features['chin_angle'],
+                     features['jaw_ratio'], features['forehead_ratio']], axis=-1)
+
+
+def score_batch(landmarks):
+    """
+    حساب المقاييس والتصنيف وقناع الاستقامة لدفعة (N×468×2) دفعة واحدة.
+    Features, shape labels and alignment mask for an (N, 468, 2) batch.
+    """
+    features = compute_features(landmarks)
+    return features, classify_shapes(features), is_aligned(features)
@@ -0,0 +1,103 @@
+"""
+تشغيل FaceMesh بدقة مخفضة مع إعادة النقاط إلى إحداثيات العرض.
+Reduced-resolution FaceMesh inference with landmarks mapped back to display coordinates.
+
+النسب الهندسية في get_geometric_shape لا تتأثر بالحجم، لذا لا حاجة لتشغيل
+FaceMesh على الصورة المكبّرة (720p).
+The ratios used by get_geometric_shape are scale-invariant, so FaceMesh does not
+need to run on the upscaled 720p frame.
+"""
+import cv2
+
+
+def face_bbox(face):
+    """المستطيل المحيط بنقاط الوجه - Bounding box (x1, y1, x2, y2) of a landmark list."""
+    xs = [p[0] for p in face]
+    ys = [p[1] for p in face]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+class ScaledFaceMesh:
+    """
+    غلاف حول FaceMeshDetector يصغّر الصورة (أو يقص منطقة الوجه) قبل الاستدلال.
+    Wraps a cvzone FaceMeshDetector: downscales the frame (or crops the face ROI
+    found on the previous frame) before inference and rescales the landmarks.
+
+    inference_h  ارتفاع صورة الاستدلال (None = الدقة الكاملة)
+                 Inference image height in pixels (None = full resolution).
+    use_roi      قص منطقة الوجه من الإطار السابق - Crop around the previous face.
+    roi_margin   هامش القص كنسبة من حجم الوجه - ROI padding relative to the face size.
+    """
+    def __init__(self, detector, inference_h=None, use_roi=False, roi_margin=0.35):
+        self.detector = detector
+        self.inference_h = inference_h
+        self.use_roi = use_roi
+        self.roi_margin = roi_margin
+        self._prev_box = None
+        self._roi_detector = None
+
+    def _get_roi_detector(self):
+        """
+        كاشف منفصل لمنطقة القص: تتبع MediaPipe يعتمد على ثبات إحداثيات الصورة،
+        لذا لا يصح خلط الإطار الكامل والقص في نفس الكاشف.
+        A separate detector for ROI crops: MediaPipe's tracker assumes a stable image
+        frame, so full frames and crops must not share one graph.
+        """
+        if self._roi_detector is None:
+            d = self.detector
+            self._roi_detector = type(d)(staticMode=getattr(d, 'staticMode', False),
+                                         maxFaces=getattr(d, 'maxFaces', 1),
+                                         minDetectionCon=getattr(d, 'minDetectionCon', 0.5),
+                                         minTrackCon=getattr(d, 'minTrackCon', 0.5))
+        return self._roi_detector
+
+    def _roi(self, shape):
+        """منطقة القص المربعة حول الوجه السابق - Square crop around the previous face, clipped."""
+        if not self.use_roi or self._prev_box is None: return None
+        img_h, img_w = shape[:2]
+        x1, y1, x2, y2 = self._prev_box
+        size = max(x2 - x1, y2 - y1) * (1 + 2 * self.roi_margin)
+        cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+        rx1, ry1 = max(0, int(cx - size / 2)), max(0, int(cy - size / 2))
+        rx2, ry2 = min(img_w, int(cx + size / 2)), min(img_h, int(cy + size / 2))
+        if rx2 - rx1 < 32 or ry2 - ry1 < 32: return None
+        return rx1, ry1, rx2, ry2
+
+    def _detect(self, detector, img, region):
+        """تشغيل الكاشف على منطقة وإرجاع النقاط بإحداثيات الصورة الأصلية."""
+        rx1, ry1, rx2, ry2 = region
+        crop = img[ry1:ry2, rx1:rx2]
+        rh, rw = crop.shape[:2]
+        if self.inference_h is not None and rh > self.inference_h:
+            scale = self.inference_h / rh
+            crop = cv2.resize(crop, (max(1, int(rw * scale)), self.inference_h), interpolation=cv2.INTER_LINEAR)
+        face_mesh = getattr(detector, 'faceMesh', None)
+        if face_mesh is not None:
+            # تشغيل MediaPipe مباشرة وتحويل النقاط المُطبّعة مرة واحدة فقط بدقة كاملة
+            # Run MediaPipe directly and convert the normalised landmarks once, at full precision
+            results = face_mesh.process(cv2.cvtColor(crop, cv2.COLOR_BGR2RGB))
+            if not results.multi_face_landmarks: return []
+            return [[[int(rx1 + lm.x * rw), int(ry1 + lm.y * rh)] for lm in face_lms.landmark]
+                    for face_lms in results.multi_face_landmarks]
+
+        _, faces = detector.findFaceMesh(crop, draw=False)
+        sx, sy = rw / crop.shape[1], rh / crop.shape[0]
+        return [[[int(rx1 + x * sx), int(ry1 + y * sy)] for x, y in face] for face in faces]
+
+    def find(self, img):
+        """
+        كشف الوجوه وإرجاع النقاط بإحداثيات img.
+        Detect faces and return landmark lists in img's coordinates.
+        """
+        full = (0, 0, img.shape[1], img.shape[0])
+        roi = self._roi(img.shape)
+        faces = self._detect(self._get_roi_detector(), img, roi) if roi is not None else []
+        if not faces:
+            # فقدنا الوجه داخل منطقة القص: نعود للصورة كاملة
+            # Lost the face inside the crop: fall back to the full frame
+            faces = self._detect(self.detector, img, full)
+        self._prev_box = face_bbox(faces[0]) if faces else None
+        return faces
+
+    def reset(self):
+        self._prev_box = None
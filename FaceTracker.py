@@ -0,0 +1,124 @@
+"""
+متتبع وجوه خفيف (IoU + المسافة بين المراكز) لربط الوجوه عبر الإطارات.
+Lightweight IoU / centroid tracker that associates faces across frames.
+
+كل مسار يحمل رقماً ثابتاً وقاموس حالة (state) يخزن فيه المستخدم ما يشاء
+(مثل ShapeVoter والتوصية)، والمسارات التي تغيب طويلاً تُحذف.
+Each track keeps a stable ID and a `state` dict for caller data (e.g. its
+ShapeVoter and recommendation); tracks that stay unseen too long are evicted.
+"""
+import numpy as np
+
+
+class Track:
+    """مسار وجه واحد - One tracked face."""
+    __slots__ = ('track_id', 'box', 'hits', 'misses', 'state')
+
+    def __init__(self, track_id, box):
+        self.track_id = track_id
+        self.box = box
+        self.hits = 1
+        self.misses = 0
+        self.state = {}
+
+
+def iou_matrix(a, b):
+    """
+    مصفوفة IoU بين مجموعتي مستطيلات (x1, y1, x2, y2).
+    Pairwise IoU between two (N, 4) / (M, 4) box arrays -> (N, M).
+    """
+    a, b = a[:, None, :], b[None, :, :]
+    iw = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    ih = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = iw * ih
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / np.maximum(area_a + area_b - inter, 1e-9)
+
+
+class FaceTracker:
+    """
+    ربط جشع: أولاً بأعلى IoU، ثم بأقرب مركز للوجوه المتبقية (حركة سريعة).
+    Greedy association: highest IoU first, then nearest centroid for what is
+    left (fast motion with little overlap).
+
+    iou_threshold     أقل IoU للربط - Minimum IoU for a match.
+    max_center_dist   أقصى مسافة بين المركزين كنسبة من عرض الوجه - Max centroid distance, in face widths.
+    max_misses        عدد الإطارات قبل حذف المسار الغائب - Unseen frames before a track is evicted.
+    """
+    def __init__(self, iou_threshold=0.3, max_center_dist=0.5, max_misses=15):
+        self.iou_threshold = iou_threshold
+        self.max_center_dist = max_center_dist
+        self.max_misses = max_misses
+        self.tracks = []
+        self.evicted = []
+        self._next_id = 1
+
+    @staticmethod
+    def _greedy(score, valid):
+        """أزواج (مسار، وجه) بترتيب تنازلي للنقاط - Greedy (track, face) pairs by descending score."""
+        pairs = []
+        if not score.size: return pairs
+        used_t, used_f = set(), set()
+        for flat in np.argsort(-score, axis=None, kind='stable'):
+            t, f = divmod(int(flat), score.shape[1])
+            if not valid[t, f]: break
+            if t in used_t or f in used_f: continue
+            used_t.add(t)
+            used_f.add(f)
+            pairs.append((t, f))
+        return pairs
+
+    def update(self, boxes):
+        """
+        ربط وجوه الإطار الحالي بالمسارات وإرجاع مسار لكل وجه (بنفس الترتيب).
+        Associate this frame's boxes with the tracks; returns one Track per box,
+        in input order. Tracks evicted by this call are listed in self.evicted.
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        self.evicted = []
+        match = {}  # face index -> track index
+        if self.tracks and len(boxes):
+            prev = np.array([t.box for t in self.tracks], dtype=np.float64)
+            iou = iou_matrix(prev, boxes)
+            for t, f in self._greedy(iou, iou >= self.iou_threshold):
+                match[f] = t
+
+            free_t = [t for t in range(len(self.tracks)) if t not in match.values()]
+            free_f = [f for f in range(len(boxes)) if f not in match]
+            if free_t and free_f:
+                # حركة سريعة: المركز الأقرب نسبة إلى عرض الوجه - Fast motion: nearest centroid in face widths
+                pc = (prev[free_t, :2] + prev[free_t, 2:]) / 2
+                bc = (boxes[free_f, :2] + boxes[free_f, 2:]) / 2
+                width = np.maximum(prev[free_t, 2] - prev[free_t, 0], 1.0)[:, None]
+                dist = np.hypot(*np.moveaxis(pc[:, None, :] - bc[None, :, :], -1, 0)) / width
+                for t, f in self._greedy(-dist, dist <= self.max_center_dist):
+                    match[free_f[f]] = free_t[t]
+
+        seen = set(match.values())
+        new_tracks = []
+        for t, track in enumerate(self.tracks):
+            if t in seen: continue
+            track.misses += 1
+            if track.misses > self.max_misses: self.evicted.append(track)
+        assigned = []
+        for f, box in enumerate(boxes.tolist()):
+            if f in match:
+                track = self.tracks[match[f]]
+                track.box = box
+                track.hits += 1
+                track.misses = 0
+            else:
+                track = Track(self._next_id, box)
+                self._next_id += 1
+                new_tracks.append(track)
+            assigned.append(track)
+        if self.evicted:
+            evicted = {id(t) for t in self.evicted}
+            self.tracks = [t for t in self.tracks if id(t) not in evicted]
+        self.tracks.extend(new_tracks)
+        return assigned
+
+    def reset(self):
+        self.tracks = []
+        self.evicted = []
@@ -0,0 +1,103 @@
+"""
+مخزن الخصائص العمودي (ملفات .npy قابلة للربط بالذاكرة).
+Columnar feature store: one memory-mappable .npy file per column.
+
+المجلد يحتوي على:
+The store directory contains:
+    landmarks.npy       (N, 468, 2) int32   نقاط FaceMesh الخام - raw FaceMesh landmarks
+    face_ratio.npy      (N,) float64
+    jaw_ratio.npy       (N,) float64
+    forehead_ratio.npy  (N,) float64
+    chin_angle.npy      (N,) float64
+    label.npy           (N,) int16          فهرس في label_names - index into label_names
+    path.npy            (N,) unicode        مسار الصورة الأصلية - source image path
+    meta.json           label_names, count, version
+
+القراءة لا تحتاج إلى الصور ولا إلى MediaPipe، ويمكن ربطها بالذاكرة مباشرة.
+Reading needs neither the images nor MediaPipe, and columns are memory-mapped.
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+
+from FaceGeometry import compute_features
+
+STORE_VERSION = 1
+FEATURE_COLUMNS = ("face_ratio", "jaw_ratio", "forehead_ratio", "chin_angle")
+COLUMNS = ("landmarks",) + FEATURE_COLUMNS + ("label", "path")
+
+
+class FeatureStore:
+    """
+    قارئ المخزن: كل عمود مصفوفة NumPy (مربوطة بالذاكرة افتراضياً).
+    Store reader: each column is a NumPy array (memory-mapped by default).
+    """
+    def __init__(self, path, mmap=True):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.label_names = list(self.meta["label_names"])
+        self._mmap_mode = "r" if mmap else None
+        self._columns = {}
+
+    def __getitem__(self, name):
+        if name not in COLUMNS: raise KeyError(name)
+        col = self._columns.get(name)
+        if col is None:
+            col = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode=self._mmap_mode)
+            self._columns[name] = col
+        return col
+
+    def __len__(self):
+        return int(self.meta["count"])
+
+    def features(self):
+        """
+        مصفوفة (N×4) بترتيب FEATURE_COLUMNS.
+        (N, 4) matrix in FEATURE_COLUMNS order.
+        """
+        return np.stack([self[name] for name in FEATURE_COLUMNS], axis=1)
+
+    def labels(self):
+        """أسماء الأشكال لكل صف - Shape name per row."""
+        return np.asarray(self.label_names)[self["label"]]
+
+
+def save_feature_store(path, landmarks, labels, paths, label_names):
+    """
+    كتابة المخزن (يُكتب في مجلد مؤقت ثم يُستبدل دفعة واحدة).
+    Write a store from raw landmarks; the feature columns are derived with
+    FaceGeometry. Written to a temporary folder first and swapped in at the end.
+
+    landmarks    (N, 468, 2)
+    labels       أسماء الأشكال - shape names (length N)
+    paths        مسارات الصور - source image paths (length N)
+    label_names  ترتيب الفئات - class order used for the int labels
+    """
+    landmarks = np.asarray(landmarks, dtype=np.int32).reshape(-1, 468, 2)
+    label_index = {name: i for i, name in enumerate(label_names)}
+    label_ids = np.array([label_index[name] for name in labels], dtype=np.int16)
+    features = compute_features(landmarks) if len(landmarks) else {k: np.zeros(0) for k in FEATURE_COLUMNS}
+
+    tmp = path.rstrip(os.sep) + ".tmp"
+    if os.path.exists(tmp): shutil.rmtree(tmp)
+    os.makedirs(tmp)
+    np.save(os.path.join(tmp, "landmarks.npy"), landmarks)
+    for name in FEATURE_COLUMNS:
+        np.save(os.path.join(tmp, f"{name}.npy"), np.asarray(features[name], dtype=np.float64))
+    np.save(os.path.join(tmp, "label.npy"), label_ids)
+    np.save(os.path.join(tmp, "path.npy"), np.asarray(list(paths), dtype=str))
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"version": STORE_VERSION, "count": int(len(landmarks)),
+                   "label_names": list(label_names)}, f, indent=2)
+
+    if os.path.exists(path): shutil.rmtree(path)
+    os.replace(tmp, path)
+    return FeatureStore(path)
+
+
+def load_feature_store(path, mmap=True):
+    """فتح مخزن موجود - Open an existing store."""
+    return FeatureStore(path, mmap=mmap)
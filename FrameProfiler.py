@@ -0,0 +1,211 @@
+"""
+قياس زمن كل مرحلة في الحلقة الرئيسية (الالتقاط، FaceMesh، الهندسة، الرسم، العرض...).
+Per-stage timing for the main loop: capture, FaceMesh, geometry, drawing, display...
+
+- مؤقتات perf_counter_ns بتكلفة منخفضة، ونافذة متحركة لكل مرحلة مع p50/p95/p99.
+  Low-overhead perf_counter_ns laps, with a rolling window and p50/p95/p99 per stage.
+- لوحة تشخيص اختيارية في الشريط الجانبي، وحفظ دوري في CSV (إلحاق) أو JSON (آخر لقطة)
+  لمقارنة أجهزة الأكشاك واكتشاف التراجع بعد التحديثات.
+  Optional debug panel in the sidebar, and a periodic CSV (appended) or JSON
+  (latest snapshot) dump to compare kiosk hardware and catch regressions.
+
+الاستخدام / Usage:
+    t = profiler.start()
+    faces = detector.find(img)
+    t = profiler.lap('facemesh', t)
+    ...
+    profiler.tick()   # نهاية الإطار - end of frame
+
+NULL_PROFILER له نفس الواجهة ولا يفعل شيئاً، فيبقى الكود نفسه عند إيقاف القياس.
+NULL_PROFILER has the same API and does nothing, so call sites stay unconditional.
+"""
+import csv
+import json
+import os
+import platform
+import threading
+import time
+from time import perf_counter_ns
+
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+
+
+class NullProfiler:
+    """بديل لا يفعل شيئاً (القياس متوقف) - No-op stand-in used when profiling is off."""
+    enabled = False
+    show_panel = False
+
+    def start(self): return 0
+    def lap(self, stage, t0): return 0
+    def add_ns(self, stage, ns): pass
+    def tick(self): pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class _Ring:
+    """آخر N عينة (نانو ثانية) - The last N samples, in nanoseconds."""
+    __slots__ = ('values', 'head', 'count')
+
+    def __init__(self, size):
+        self.values = np.zeros(size, dtype=np.int64)
+        self.head = 0
+        self.count = 0
+
+    def push(self, ns):
+        self.values[self.head] = ns
+        self.head = (self.head + 1) % len(self.values)
+        if self.count < len(self.values): self.count += 1
+
+    def samples(self):
+        return self.values[:self.count] if self.count < len(self.values) else self.values
+
+
+class FrameProfiler:
+    """
+    أزمنة المراحل ومعدل الإطارات على نافذة متحركة.
+    Rolling per-stage timings and frame rate.
+
+    window        عدد العينات لكل مرحلة - Samples kept per stage.
+    dump_path     ملف الحفظ الدوري (.csv يُلحق، .json يُستبدل) أو None
+                  Periodic dump file (.csv is appended, .json overwritten), or None.
+    dump_every    الفترة بين مرات الحفظ بالثواني - Seconds between dumps.
+    show_panel    عرض لوحة التشخيص في الشريط الجانبي - Draw the debug panel in the sidebar.
+    panel_every   تحديث نص اللوحة كل (ثانية) - Seconds between panel text refreshes.
+    """
+    enabled = True
+
+    def __init__(self, window=300, dump_path=None, dump_every=30.0, show_panel=False, panel_every=0.5):
+        self.window = window
+        self.dump_path = dump_path
+        self.dump_every = dump_every
+        self.show_panel = show_panel
+        self.panel_every = panel_every
+        self._lock = threading.Lock()
+        self._rings = {}
+        self._frames = _Ring(window)
+        self._frame_count = 0
+        self._t0 = perf_counter_ns()
+        self._last_dump = self._t0
+        self._panel = []
+        self._panel_at = 0
+
+    # ------------------------------------------
+    # التسجيل (Recording)
+    # ------------------------------------------
+    def start(self):
+        """بداية مرحلة (نانو ثانية) - Timestamp to pass to the first lap()."""
+        return perf_counter_ns()
+
+    def lap(self, stage, t0):
+        """
+        تسجيل الزمن منذ t0 للمرحلة stage وإرجاع الوقت الحالي (بداية المرحلة التالية).
+        Record the time since t0 under `stage`; returns now, the next stage's t0.
+        """
+        t1 = perf_counter_ns()
+        self.add_ns(stage, t1 - t0)
+        return t1
+
+    def add_ns(self, stage, ns):
+        with self._lock:
+            ring = self._rings.get(stage)
+            if ring is None: ring = self._rings[stage] = _Ring(self.window)
+            ring.push(ns)
+
+    def tick(self):
+        """نهاية إطار: تحديث معدل الإطارات والحفظ الدوري - End of a frame: FPS and periodic dump."""
+        now = perf_counter_ns()
+        with self._lock:
+            self._frames.push(now)
+            self._frame_count += 1
+        if self.dump_path and now - self._last_dump >= self.dump_every * 1e9:
+            self._last_dump = now
+            self.dump()
+
+    # ------------------------------------------
+    # الإحصائيات (Statistics)
+    # ------------------------------------------
+    def fps(self):
+        """معدل الإطارات على النافذة الحالية - Frame rate over the current window."""
+        with self._lock:
+            ring = self._frames
+            if ring.count < 2: return 0.0
+            newest = ring.values[(ring.head - 1) % len(ring.values)]
+            oldest = ring.values[ring.head % len(ring.values)] if ring.count == len(ring.values) else ring.values[0]
+            count = ring.count
+        return (count - 1) * 1e9 / max(int(newest - oldest), 1)
+
+    def summary(self):
+        """
+        {stage: {'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms'}} بترتيب أول ظهور.
+        Per-stage statistics in milliseconds, in first-seen order.
+        """
+        with self._lock:
+            samples = {stage: ring.samples().copy() for stage, ring in self._rings.items()}
+        stats = {}
+        for stage, ns in samples.items():
+            ms = ns / 1e6
+            p = np.percentile(ms, PERCENTILES)
+            stats[stage] = {'count': int(len(ms)), 'mean_ms': float(ms.mean()),
+                            **{f"p{q}_ms": float(v) for q, v in zip(PERCENTILES, p)}}
+        return stats
+
+    def snapshot(self):
+        """كل الإحصائيات مع معلومات الجهاز - Every statistic plus host information."""
+        return {
+            'time': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'host': platform.node(), 'platform': platform.platform(), 'processor': platform.processor(),
+            'uptime_s': round((perf_counter_ns() - self._t0) / 1e9, 1),
+            'frames': self._frame_count, 'fps': round(self.fps(), 2),
+            'stages': {k: {f: round(v, 3) if isinstance(v, float) else v for f, v in s.items()}
+                       for k, s in self.summary().items()},
+        }
+
+    # ------------------------------------------
+    # الإخراج (Output)
+    # ------------------------------------------
+    def dump(self, path=None):
+        """
+        حفظ لقطة: CSV يُلحق سطراً لكل مرحلة، JSON يستبدل الملف بآخر لقطة.
+        Write a snapshot: CSV appends one row per stage, JSON atomically replaces the file.
+        """
+        path = path or self.dump_path
+        if not path: return
+        snap = self.snapshot()
+        if path.lower().endswith(".json"):
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(snap, f, indent=2)
+            os.replace(tmp, path)
+            return
+        fields = ['time', 'host', 'stage', 'count', 'mean_ms'] + [f"p{q}_ms" for q in PERCENTILES] + ['fps']
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        with open(path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            if new_file: writer.writeheader()
+            for stage, s in snap['stages'].items():
+                writer.writerow({'time': snap['time'], 'host': snap['host'], 'stage': stage,
+                                 'fps': snap['fps'], **s})
+
+    def panel_lines(self):
+        """
+        صفوف لوحة التشخيص (خلايا نصية)، يُعاد حسابها كل panel_every ثانية فقط.
+        Debug panel rows as tuples of text cells, recomputed at most every panel_every seconds.
+        """
+        now = perf_counter_ns()
+        if now - self._panel_at >= self.panel_every * 1e9:
+            self._panel_at = now
+            rows = [(f"FPS {self.fps():.1f}",), ("stage ms",) + tuple(f"p{q}" for q in PERCENTILES)]
+            for stage, s in self.summary().items():
+                rows.append((stage,) + tuple(f"{s[f'p{q}_ms']:.1f}" for q in PERCENTILES))
+            self._panel = rows
+        return self._panel
+
+    def report(self):
+        """نص مختصر للطباعة عند الخروج - Multi-line summary printed on exit."""
+        return "\n".join([f"profile: {self._frame_count} frames, {self.fps():.1f} fps"] +
+                         [f"  {stage}: p50 {s['p50_ms']:.2f}ms  p95 {s['p95_ms']:.2f}ms  p99 {s['p99_ms']:.2f}ms"
+                          for stage, s in self.summary().items()])
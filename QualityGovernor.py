@@ -0,0 +1,166 @@
+"""
+منظّم الجودة التكيفي: يخفّض العمل لكل إطار عندما يتأخر الجهاز ويعيده عند توفر الوقت.
+Adaptive quality governor: sheds per-frame work when the machine falls behind
+the target FPS and restores it when headroom returns.
+
+مستويات الجودة مرتبة من الأعلى إلى الأدنى؛ كل مستوى يحدد:
+Quality levels are ordered best first; each one sets:
+    infer_every     تشغيل FaceMesh كل N إطارات (بينها تُستقرأ النقاط) - Run FaceMesh every Nth frame
+                    (landmarks are extrapolated in between)
+    inference_h     ارتفاع صورة الاستدلال (None = كاملة) - FaceMesh input height (None = full)
+    freeze_sidebar  إيقاف تحديث القياسات بعد ثبات الشكل - Stop redrawing the measurements once the shape is locked
+
+لا يعتمد على OpenCV أو الكاميرا - No OpenCV or camera dependency.
+"""
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+
+QualityLevel = namedtuple('QualityLevel', 'infer_every inference_h freeze_sidebar')
+
+QUALITY_LEVELS = (
+    QualityLevel(1, None, False),
+    QualityLevel(1, 480, False),
+    QualityLevel(1, 480, True),
+    QualityLevel(2, 360, True),
+    QualityLevel(3, 320, True),
+)
+
+
+class QualityGovernor:
+    """
+    يقارن زمن معالجة الإطار (بدون انتظار الكاميرا) بميزانية target_fps.
+    Compares per-frame processing time (excluding the camera wait) with the
+    target_fps budget and moves one level at a time, with hysteresis:
+
+    - تخفيض: متوسط آخر window إطارات فوق الميزانية - Degrade: the window's mean is over budget.
+    - رفع: المتوسط أقل من up_headroom من الميزانية، والزمن المسجّل سابقاً للمستوى
+      الأعلى يدخل في الميزانية (أو مر probe_s منذ آخر تجربة له).
+      Restore: the mean is under up_headroom of the budget, and the cost last
+      measured at the better level fits the budget (or it was last tried
+      more than probe_s ago).
+    - لا تغيير قبل cooldown_s من آخر تغيير - No change within cooldown_s of the last one.
+    """
+    def __init__(self, target_fps=24.0, levels=QUALITY_LEVELS, window=30, up_headroom=0.7,
+                 cooldown_s=2.0, probe_s=30.0, clock=time.monotonic):
+        self.target_fps = target_fps
+        self.levels = levels
+        self.window = window
+        self.up_headroom = up_headroom
+        self.cooldown_s = cooldown_s
+        self.probe_s = probe_s
+        self.clock = clock
+        self.history = deque(maxlen=32)
+        self.reset()
+
+    def reset(self, level=0):
+        self.level = level
+        self._times = deque(maxlen=self.window)
+        self._level_cost = {}     # level -> (mean ms, when measured)
+        self._changed_at = self.clock()
+        self._frame = 0
+        self._locked = None
+
+    # ------------------------------------------
+    # القياس والقرار (Measurement & Decisions)
+    # ------------------------------------------
+    @property
+    def budget_ms(self):
+        return 1000.0 / self.target_fps
+
+    @property
+    def settings(self):
+        """إعدادات المستوى الحالي - The current QualityLevel."""
+        return self.levels[self.level]
+
+    def should_infer(self):
+        """هل يُشغّل FaceMesh في هذا الإطار؟ (يُستدعى مرة لكل إطار) - Run FaceMesh on this frame? Call once per frame."""
+        run = self._frame % self.settings.infer_every == 0
+        self._frame += 1
+        return run
+
+    def frame_done(self, frame_ms):
+        """
+        تسجيل زمن معالجة إطار واتخاذ القرار؛ تُرجع المستوى الجديد عند تغيّره وإلا None.
+        Record one frame's processing time and decide. Returns the new level
+        when it changed, else None.
+        """
+        self._times.append(frame_ms)
+        if len(self._times) < self.window or self._locked is not None: return None
+        now = self.clock()
+        if now - self._changed_at < self.cooldown_s: return None
+
+        mean = sum(self._times) / len(self._times)
+        self._level_cost[self.level] = (mean, now)
+        budget = self.budget_ms
+        if mean > budget and self.level + 1 < len(self.levels):
+            return self._set(self.level + 1, now, f"{mean:.1f}ms > {budget:.1f}ms budget")
+        if mean < budget * self.up_headroom and self.level > 0:
+            cost, measured_at = self._level_cost.get(self.level - 1, (0.0, -np.inf))
+            if cost <= budget or now - measured_at > self.probe_s:
+                return self._set(self.level - 1, now, f"{mean:.1f}ms < {budget * self.up_headroom:.1f}ms headroom")
+        return None
+
+    def _set(self, level, now, reason):
+        self.history.append({'t': now, 'from': self.level, 'to': level, 'reason': reason})
+        self.level = level
+        self._changed_at = now
+        self._times.clear()
+        return level
+
+    def lock(self, level=None):
+        """
+        تثبيت مستوى (None = إلغاء التثبيت) - Pin a level (for tests/kiosk tuning); None releases it.
+        """
+        if level is not None: self._set(level, self.clock(), "locked")
+        self._locked = level
+
+    def state(self):
+        """
+        القرارات الحالية كقاموس (للواجهة أو السجلات) - Current decisions as a dict, for the UI or logs.
+        """
+        mean = sum(self._times) / len(self._times) if self._times else None
+        s = self.settings
+        return {
+            'level': self.level, 'levels': len(self.levels), 'locked': self._locked is not None,
+            'infer_every': s.infer_every, 'inference_h': s.inference_h, 'freeze_sidebar': s.freeze_sidebar,
+            'target_fps': self.target_fps, 'budget_ms': round(self.budget_ms, 2),
+            'frame_ms': None if mean is None else round(mean, 2),
+            'last_change': dict(self.history[-1]) if self.history else None,
+        }
+
+
+class LandmarkExtrapolator:
+    """
+    استقراء خطي للنقاط بين مرات تشغيل FaceMesh (بدون تأخير العرض).
+    Linear extrapolation of landmarks between FaceMesh runs, from the velocity
+    of the last two runs. True interpolation would need the next run's result
+    and delay the mirror by N frames, so the motion is projected forward instead
+    (capped at max_ahead_s).
+    """
+    def __init__(self, max_ahead_s=0.25):
+        self.max_ahead_s = max_ahead_s
+        self._tracks = {}
+
+    def update(self, key, landmarks, t):
+        """نتيجة FaceMesh جديدة للوجه key - A fresh FaceMesh result for face `key`."""
+        landmarks = np.asarray(landmarks, dtype=np.float64)
+        prev = self._tracks.get(key)
+        velocity = None
+        if prev is not None and t > prev[0] and prev[1].shape == landmarks.shape:
+            velocity = (landmarks - prev[1]) / (t - prev[0])
+        self._tracks[key] = (t, landmarks, velocity)
+
+    def predict(self, key, t):
+        """النقاط المتوقعة في اللحظة t، أو None - Predicted landmarks at time t, or None."""
+        track = self._tracks.get(key)
+        if track is None: return None
+        t0, landmarks, velocity = track
+        if velocity is None: return landmarks
+        return landmarks + velocity * min(max(t - t0, 0.0), self.max_ahead_s)
+
+    def retain(self, keys):
+        """حذف الوجوه غير الموجودة - Drop faces that are no longer present."""
+        for key in list(self._tracks):
+            if key not in keys: del self._tracks[key]
@@ -0,0 +1,420 @@
+"""
+وضع الخدمة: خادم محلي (HTTP أو Unix socket) يقدّم تحليل شكل الوجه والتوصيات
+لعدة شاشات في المتجر بنسخة واحدة من MediaPipe و SmartExpert.
+Service mode: a local asyncio server (HTTP over TCP or a Unix socket) that
+serves face-shape analysis and recommendations to several in-store screens
+from one copy of MediaPipe and SmartExpert.
+
+الواجهة / Endpoints:
+    POST /v1/landmarks   JSON {"landmarks": [[x, y] * 468]} أو {"faces": [...]} لعدة وجوه،
+                         أو مصفوفة .npy (Content-Type: application/x-npy) بأبعاد (468, 2) / (N, 468, 2)
+    POST /v1/frame       صورة JPEG (Content-Type: image/jpeg) - FaceMesh في عمليات العمال
+    GET  /v1/health      الإحصاءات (الطلبات، متوسط حجم الدفعة، المرفوض، طول الطابور)
+
+الرد / Response:
+    {"faces": [{"box": [...], "aligned": true, "shape": "Oval", "stats": {...},
+                "recommendations": ["rectangle", "square", "aviator"]}]}
+
+- الطلبات المتزامنة تُجمع في دفعات صغيرة (حتى --max-batch أو --max-delay-ms)
+  وتُحسب الهندسة والتوصيات لكل الدفعة مرة واحدة (FaceGeometry / recommend_batch).
+  Concurrent requests are micro-batched (up to --max-batch requests or
+  --max-delay-ms) into one vectorized geometry + recommend_batch call.
+- صور JPEG تُرسل كدفعة لعملية عامل واحدة تحتفظ بكاشف FaceMesh جاهز.
+  JPEG batches go to a worker process that keeps one warm FaceMesh detector.
+- الضغط الخلفي: الطابور محدود، وعند امتلائه يُرد 503 مع Retry-After بدل التأخير بلا حد.
+  Backpressure: queues are bounded; when full the server answers 503 with
+  Retry-After instead of letting latency grow without bound.
+
+Usage:
+    python RecommendationService.py                         # http://127.0.0.1:8765
+    python RecommendationService.py --unix /tmp/glasses.sock --workers 2
+    python benchmarks/load_test.py                          # اختبار الحمل - load test
+"""
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from FaceGeometry import compute_features, feature_matrix, is_aligned
+from ShapeClassifier import features_to_matrix
+from Smart_Glasses_Project import face_box, shape_classifier
+from SmartExpert import SmartExpert
+
+N_LANDMARKS = 468
+STAT_NAMES = ("face_ratio", "chin_angle", "jaw_ratio", "forehead_ratio")
+MAX_FACES_PER_REQUEST = 16
+MAX_BODY = 8 << 20
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+# ==========================================
+# التحليل المتجه (Vectorized Scoring)
+# ==========================================
+def score_faces(landmarks, expert):
+    """
+    الشكل والمقاييس والتوصيات لدفعة (N×468×2) بنفس منطق get_geometric_shape.
+    Shape, stats and recommendations for an (N, 468, 2) batch, with the same
+    classifier and expert as get_geometric_shape, in one vectorized pass.
+    Faces not looking forward get aligned=False and no shape, as in the app.
+    """
+    lm = np.asarray(landmarks, dtype=np.float64).reshape(-1, N_LANDMARKS, 2)
+    if not len(lm): return []
+    features = compute_features(lm)
+    aligned = is_aligned(features)
+    shapes = np.asarray(shape_classifier.predict(features_to_matrix(features))).astype(str)
+    stats = feature_matrix(features)
+    ids, _ = expert.recommend_batch({'shape': shapes, 'angle': stats[:, 1]})
+    boxes = face_box(lm)
+
+    records = []
+    for i in range(len(lm)):
+        ok = bool(aligned[i])
+        records.append({
+            'box': [int(v) for v in boxes[i]],
+            'aligned': ok,
+            'shape': str(shapes[i]) if ok else None,
+            'stats': dict(zip(STAT_NAMES, (round(float(v), 3) for v in stats[i]))) if ok else None,
+            'recommendations': [expert.glass_types[int(g)]['img'] for g in ids[i] if g >= 0] if ok else [],
+        })
+    return records
+
+
+def parse_landmarks(body, content_type):
+    """
+    جسم الطلب إلى مصفوفة (N×468×2)؛ ValueError للمدخلات غير الصالحة.
+    Request body -> (N, 468, 2) array. Raises ValueError on malformed input.
+    """
+    try:
+        if content_type.startswith("application/x-npy"):
+            arr = np.load(io.BytesIO(body), allow_pickle=False)
+        else:
+            data = json.loads(body)
+            if isinstance(data, dict): data = data.get('faces', data.get('landmarks'))
+            if data is None: raise ValueError("expected a 'faces' or 'landmarks' array")
+            arr = np.asarray(data, dtype=np.float64)
+        arr = np.asarray(arr, dtype=np.float64)
+    except (TypeError, EOFError, OSError) as e:
+        # جسم فارغ أو مقطوع، أو عناصر ليست أرقاماً - Empty/truncated body, or non-numeric items
+        raise ValueError(f"malformed landmarks body: {e}") from None
+    if arr.ndim == 2: arr = arr[None]
+    if arr.ndim != 3 or arr.shape[1:] != (N_LANDMARKS, 2):
+        raise ValueError(f"landmarks must be ({N_LANDMARKS}, 2) or (N, {N_LANDMARKS}, 2), got {arr.shape}")
+    if not np.isfinite(arr).all(): raise ValueError("landmarks must be finite numbers")
+    if len(arr) > MAX_FACES_PER_REQUEST:
+        raise ValueError(f"at most {MAX_FACES_PER_REQUEST} faces per request")
+    return arr
+
+
+# ==========================================
+# عمليات العمال (Worker Processes)
+# ==========================================
+# كاشف جاهز واحد لكل عملية عامل - One warm detector per worker process
+_worker_detector = None
+
+
+def _init_worker(max_faces):
+    """
+    (داخل العامل) إنشاء كاشف FaceMesh ثابت وتشغيله مرة على صورة فارغة.
+    (In the worker) build a static-mode FaceMesh detector and run it once on a
+    blank frame, so the first real request does not pay for graph setup.
+    """
+    global _worker_detector
+    from cvzone.FaceMeshModule import FaceMeshDetector
+    # الإطارات من شاشات مختلفة لا علاقة بينها: وضع ثابت بدل التتبع
+    # Frames from different screens are unrelated: static mode, no tracking
+    _worker_detector = FaceMeshDetector(staticMode=True, maxFaces=max_faces)
+    _worker_detector.findFaceMesh(np.zeros((480, 640, 3), dtype=np.uint8), draw=False)
+
+
+def _worker_ready():
+    return os.getpid()
+
+
+def detect_batch(jpegs):
+    """
+    (داخل العامل) فك دفعة JPEG وتشغيل FaceMesh. None للصور غير القابلة للفك.
+    (In the worker) decode a batch of JPEGs and run FaceMesh on each.
+    Returns one float32 (N, 468, 2) array per image, or None if it did not decode.
+    """
+    import cv2
+    out = []
+    for data in jpegs:
+        img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if img is None:
+            out.append(None)
+            continue
+        _, faces = _worker_detector.findFaceMesh(img, draw=False)
+        out.append(np.asarray(faces, dtype=np.float32).reshape(-1, N_LANDMARKS, 2))
+    return out
+
+
+# ==========================================
+# التجميع في دفعات (Micro-batching)
+# ==========================================
+class Overloaded(Exception):
+    """الطابور ممتلئ - The batcher's queue is full."""
+
+
+class MicroBatcher:
+    """
+    يجمع الطلبات المتزامنة في دفعات: أول طلب ينتظر حتى max_delay_ms ليلحق به غيره.
+    Collects concurrent requests into batches. A batch closes after max_batch
+    items or max_delay_ms after its first item; up to `concurrency` batches run
+    at once, so while they are busy the queue grows and the next batch is
+    bigger. A full queue (max_queue) rejects new items with Overloaded.
+
+    fn: coroutine function list(items) -> list(results), same length and order.
+    """
+    def __init__(self, fn, max_batch=64, max_delay_ms=2.0, max_queue=256, concurrency=1):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000.0
+        self.concurrency = concurrency
+        self.queue = asyncio.Queue(max_queue)
+        self.stats = {'requests': 0, 'batches': 0, 'rejected': 0, 'errors': 0}
+        self._tasks = set()
+
+    async def submit(self, item):
+        """نتيجة عنصر واحد بعد معالجة دفعته - One item's result once its batch ran."""
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((item, future))
+        except asyncio.QueueFull:
+            self.stats['rejected'] += 1
+            raise Overloaded() from None
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.concurrency)
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0: break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await slots.acquire()
+            task = asyncio.create_task(self._run_batch(batch, slots))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch, slots):
+        try:
+            # العملاء الذين قطعوا الاتصال لا يُحسبون - Skip clients that already gave up
+            batch = [(item, f) for item, f in batch if not f.done()]
+            if not batch: return
+            self.stats['batches'] += 1
+            self.stats['requests'] += len(batch)
+            results = await self.fn([item for item, _ in batch])
+            for (_, future), result in zip(batch, results):
+                if not future.done(): future.set_result(result)
+        except Exception as e:
+            self.stats['errors'] += 1
+            for _, future in batch:
+                if not future.done(): future.set_exception(e)
+        finally:
+            slots.release()
+
+    def snapshot(self):
+        s = dict(self.stats)
+        s['mean_batch'] = round(s['requests'] / s['batches'], 2) if s['batches'] else None
+        s['queued'] = self.queue.qsize()
+        return s
+
+
+# ==========================================
+# الخادم (Server)
+# ==========================================
+class RecommendationService:
+    """
+    خادم HTTP/1.1 بسيط (مع keep-alive) فوق asyncio، لـ TCP أو Unix socket.
+    Minimal HTTP/1.1 server (keep-alive) on asyncio streams, over TCP or a Unix socket.
+
+    workers: عمليات FaceMesh لطلبات JPEG (0 = تعطيل /v1/frame).
+    workers: FaceMesh processes for JPEG requests (0 disables /v1/frame).
+    """
+    def __init__(self, expert=None, workers=1, max_faces=1, max_batch=64, max_delay_ms=2.0, max_queue=256):
+        self.expert = expert or SmartExpert()
+        self.workers = workers
+        self.max_faces = max_faces
+        self.landmarks = MicroBatcher(self._score_landmarks, max_batch, max_delay_ms, max_queue)
+        # دفعة لكل عامل في نفس الوقت - one batch in flight per worker
+        self.frames = MicroBatcher(self._score_frames, max_batch, max_delay_ms, max_queue, concurrency=max(workers, 1))
+        self.pool = None
+        self.started = time.time()
+
+    async def _score_landmarks(self, items):
+        counts = [len(a) for a in items]
+        records = score_faces(np.concatenate(items), self.expert)
+        return self._split(records, counts)
+
+    async def _score_frames(self, jpegs):
+        detected = await asyncio.get_running_loop().run_in_executor(self.pool, detect_batch, jpegs)
+        found = [a for a in detected if a is not None]
+        records = score_faces(np.concatenate(found), self.expert) if found else []
+        per_image = iter(self._split(records, [len(a) for a in found]))
+        return [None if a is None else next(per_image) for a in detected]
+
+    @staticmethod
+    def _split(records, counts):
+        out, start = [], 0
+        for n in counts:
+            out.append(records[start:start + n])
+            start += n
+        return out
+
+    async def start_workers(self):
+        """تشغيل العمال وتجهيز كاشفاتهم قبل قبول الطلبات - Start and warm the workers before serving."""
+        if self.workers <= 0: return
+        # spawn: لا ننسخ حالة الخادم (الخيوط، الحلقة) إلى العمال - Workers never inherit the server's threads/loop
+        self.pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                        initializer=_init_worker, initargs=(self.max_faces,))
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _worker_ready) for _ in range(self.workers)))
+
+    def health(self):
+        return {'uptime_s': round(time.time() - self.started, 1), 'workers': self.workers,
+                'landmarks': self.landmarks.snapshot(), 'frames': self.frames.snapshot()}
+
+    # ------------------------------------------
+    # بروتوكول HTTP (HTTP Protocol)
+    # ------------------------------------------
+    async def dispatch(self, method, path, headers, body):
+        """(الحالة، الرد) لطلب واحد - (status, payload) for one request."""
+        path = path.split("?", 1)[0]
+        if path == "/v1/health":
+            return (200, self.health()) if method == "GET" else (405, {'error': "use GET"})
+        if path not in ("/v1/landmarks", "/v1/frame"): return 404, {'error': f"unknown path {path}"}
+        if method != "POST": return 405, {'error': "use POST"}
+
+        if path == "/v1/landmarks":
+            try:
+                landmarks = parse_landmarks(body, headers.get('content-type', ''))
+            except ValueError as e:
+                return 400, {'error': str(e)}
+            return 200, {'faces': await self.landmarks.submit(landmarks)}
+
+        if self.pool is None: return 404, {'error': "frame analysis is disabled (--workers 0)"}
+        faces = await self.frames.submit(body)
+        if faces is None: return 400, {'error': "could not decode image"}
+        return 200, {'faces': faces}
+
+    @staticmethod
+    def _response(status, payload, keep_alive, extra=()):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}", "Content-Type: application/json",
+                f"Content-Length: {len(body)}", f"Connection: {'keep-alive' if keep_alive else 'close'}", *extra]
+        return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line: break
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""): break
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, path, _ = line.decode("latin-1").split(" ", 2)
+                    length = int(headers.get('content-length', 0))
+                    if length < 0: raise ValueError(length)
+                except ValueError:
+                    # طلب مشوّه: رد 400 ثم إغلاق (لا يمكن معرفة حدود الطلب التالي)
+                    # Malformed request: answer 400, then close (the next request's framing is unknown)
+                    writer.write(self._response(400, {'error': "malformed request line or Content-Length"}, False))
+                    await writer.drain()
+                    break
+                if length > MAX_BODY:
+                    writer.write(self._response(413, {'error': f"body over {MAX_BODY} bytes"}, False))
+                    break
+                body = await reader.readexactly(length) if length else b""
+                keep_alive = headers.get('connection', '').lower() != "close"
+
+                extra = ()
+                try:
+                    status, payload = await self.dispatch(method, path, headers, body)
+                except Overloaded:
+                    status, payload, extra = 503, {'error': "overloaded, retry later"}, ("Retry-After: 1",)
+                except Exception as e:  # خطأ غير متوقع لا يُسقط الخادم - never takes the server down
+                    status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+                writer.write(self._response(status, payload, keep_alive, extra))
+                await writer.drain()
+                if not keep_alive: break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def serve(self, host="127.0.0.1", port=8765, unix=None):
+        await self.start_workers()
+        batchers = [asyncio.create_task(b.run()) for b in (self.landmarks, self.frames)]
+        if unix:
+            if os.path.exists(unix): os.unlink(unix)
+            server = await asyncio.start_unix_server(self.handle, path=unix, limit=MAX_BODY)
+            where = f"unix:{unix}"
+        else:
+            server = await asyncio.start_server(self.handle, host, port, limit=MAX_BODY)
+            where = f"http://{host}:{port}"
+        print(f"Recommendation service on {where} ({self.workers} FaceMesh workers)", flush=True)
+        # SIGTERM يوقف الخادم بشكل نظيف فلا تبقى عمليات عمال يتيمة
+        # SIGTERM shuts down cleanly so no orphaned worker processes are left behind
+        stop = asyncio.Event()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                asyncio.get_running_loop().add_signal_handler(sig, stop.set)
+            except (NotImplementedError, AttributeError):  # Windows
+                pass
+        try:
+            async with server:
+                await stop.wait()
+        finally:
+            for task in batchers: task.cancel()
+            if self.pool is not None: self.pool.shutdown(cancel_futures=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local face-shape / glasses recommendation service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=1, help="FaceMesh processes for JPEG requests (0 = off)")
+    parser.add_argument("--max-faces", type=int, default=1, help="faces detected per JPEG")
+    parser.add_argument("--max-batch", type=int, default=64, help="requests per micro-batch")
+    parser.add_argument("--max-delay-ms", type=float, default=2.0, help="wait for more requests this long")
+    parser.add_argument("--max-queue", type=int, default=256, help="queued requests before answering 503")
+    args = parser.parse_args(argv)
+
+    service = RecommendationService(workers=args.workers, max_faces=args.max_faces, max_batch=args.max_batch,
+                                    max_delay_ms=args.max_delay_ms, max_queue=args.max_queue)
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+"""
+مصنّف شكل الوجه القابل للتدريب (NumPy فقط) بديلاً عن الحدود الثابتة.
+Trainable, NumPy-only face-shape classifier to replace the hard-coded thresholds.
+
+يعمل على نفس النسب الأربع (الطول، الفك، الجبهة، زاوية الذقن) من مخزن الخصائص
+الذي ينتجه DataMiner، ويُحفظ في ملف صغير (.npz).
+Works on the same four ratios, trained from the DataMiner feature store and
+serialized to a tiny .npz model file.
+
+Usage:
+    python ShapeClassifier.py train --store DataMiner/feature_store --kind tree --depth 4
+    python ShapeClassifier.py evaluate --store path/to/testing_store [--model models/shape_classifier.npz]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from FaceGeometry import classify_shape, classify_shapes
+from ShapeMetrics import confusion_metrics, measure_throughput
+
+FEATURE_NAMES = ("face_ratio", "jaw_ratio", "forehead_ratio", "chin_angle")
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "shape_classifier.npz")
+
+
+def features_to_matrix(features):
+    """
+    قاموس الخصائص (من FaceGeometry) إلى مصفوفة (N×4) بترتيب FEATURE_NAMES.
+    FaceGeometry feature dict -> (N, 4) matrix in FEATURE_NAMES order.
+    """
+    return np.stack([np.atleast_1d(np.asarray(features[name], dtype=np.float64)) for name in FEATURE_NAMES], axis=-1)
+
+
+class RuleClassifier:
+    """
+    القواعد الأصلية في get_geometric_shape بنفس واجهة المصنّفات المدرّبة.
+    The original get_geometric_shape rules behind the trained-classifier interface.
+    """
+    kind = "rules"
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(FEATURE_NAMES))
+        return classify_shapes(dict(zip(FEATURE_NAMES, X.T)))
+
+
+class NearestCentroidClassifier:
+    """
+    أقرب مركز فئة بعد توحيد المقاييس (z-score).
+    Nearest class centroid in standardized (z-score) feature space.
+    """
+    kind = "centroid"
+
+    def __init__(self, classes, mean, scale, centroids):
+        self.classes = np.asarray(classes)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.centroids = np.asarray(centroids, dtype=np.float64)
+
+    @classmethod
+    def fit(cls, X, y, classes):
+        X = np.asarray(X, dtype=np.float64)
+        mean, scale = X.mean(axis=0), X.std(axis=0)
+        scale[scale == 0] = 1.0
+        Z = (X - mean) / scale
+        centroids = np.stack([Z[y == i].mean(axis=0) if np.any(y == i) else np.full(X.shape[1], np.inf)
+                              for i in range(len(classes))])
+        return cls(classes, mean, scale, centroids)
+
+    def predict(self, X):
+        Z = (np.asarray(X, dtype=np.float64).reshape(-1, len(self.mean)) - self.mean) / self.scale
+        d = ((Z[:, None, :] - self.centroids[None, :, :]) ** 2).sum(axis=-1)
+        return self.classes[np.argmin(d, axis=1)]
+
+    def to_arrays(self):
+        return {'mean': self.mean, 'scale': self.scale, 'centroids': self.centroids}
+
+
+class DecisionTreeClassifier:
+    """
+    شجرة قرار صغيرة (CART / Gini) مخزنة كمصفوفات، والتنبؤ متجه بالكامل.
+    Small CART (Gini) tree stored as flat arrays; prediction is fully vectorized
+    (one gather per depth level for the whole batch).
+    """
+    kind = "tree"
+
+    def __init__(self, classes, feature, threshold, left, right, value):
+        self.classes = np.asarray(classes)
+        self.feature = np.asarray(feature, dtype=np.int16)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left, dtype=np.int32)
+        self.right = np.asarray(right, dtype=np.int32)
+        self.value = np.asarray(value, dtype=np.int16)
+        self.depth = self._depth()
+
+    def _depth(self):
+        depth, frontier = 0, [0]
+        while frontier:
+            frontier = [c for n in frontier if self.feature[n] >= 0 for c in (self.left[n], self.right[n])]
+            depth += 1 if frontier else 0
+        return depth
+
+    @staticmethod
+    def _best_split(X, y, n_classes, min_leaf):
+        """أفضل تقسيم (feature, threshold, gini) عبر كل المقاييس - Best Gini split over all features."""
+        n = len(y)
+        best = (None, None, np.inf)
+        onehot = np.eye(n_classes)[y]
+        for f in range(X.shape[1]):
+            order = np.argsort(X[:, f], kind="stable")
+            xs = X[order, f]
+            left_counts = np.cumsum(onehot[order], axis=0)[:-1]
+            right_counts = left_counts[-1] + onehot[order[-1]] - left_counts
+            n_left = np.arange(1, n)
+            n_right = n - n_left
+            gini = (n_left * (1 - ((left_counts / n_left[:, None]) ** 2).sum(1)) +
+                    n_right * (1 - ((right_counts / n_right[:, None]) ** 2).sum(1))) / n
+            valid = (xs[1:] > xs[:-1]) & (n_left >= min_leaf) & (n_right >= min_leaf)
+            if not valid.any(): continue
+            gini = np.where(valid, gini, np.inf)
+            i = int(np.argmin(gini))
+            if gini[i] < best[2]:
+                best = (f, (xs[i] + xs[i + 1]) / 2, gini[i])
+        return best
+
+    @classmethod
+    def fit(cls, X, y, classes, max_depth=4, min_leaf=5):
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.int64)
+        n_classes = len(classes)
+        feature, threshold, left, right, value = [], [], [], [], []
+
+        def new_node(idx):
+            feature.append(-1); threshold.append(0.0); left.append(-1); right.append(-1)
+            value.append(int(np.bincount(y[idx], minlength=n_classes).argmax()))
+            return len(feature) - 1
+
+        stack = [(new_node(np.arange(len(y))), np.arange(len(y)), 0)]
+        while stack:
+            node, idx, depth = stack.pop()
+            if depth >= max_depth or len(np.unique(y[idx])) < 2: continue
+            f, t, _ = cls._best_split(X[idx], y[idx], n_classes, min_leaf)
+            if f is None: continue
+            go_left = X[idx, f] <= t
+            feature[node], threshold[node] = f, t
+            left[node] = new_node(idx[go_left])
+            right[node] = new_node(idx[~go_left])
+            stack.append((left[node], idx[go_left], depth + 1))
+            stack.append((right[node], idx[~go_left], depth + 1))
+        return cls(classes, feature, threshold, left, right, value)
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(FEATURE_NAMES))
+        node = np.zeros(len(X), dtype=np.int32)
+        rows = np.arange(len(X))
+        for _ in range(self.depth):
+            f = self.feature[node]
+            internal = f >= 0
+            go_left = X[rows, np.maximum(f, 0)] <= self.threshold[node]
+            node = np.where(internal, np.where(go_left, self.left[node], self.right[node]), node)
+        return self.classes[self.value[node]]
+
+    def to_arrays(self):
+        return {'feature': self.feature, 'threshold': self.threshold, 'left': self.left,
+                'right': self.right, 'value': self.value}
+
+
+KINDS = {c.kind: c for c in (NearestCentroidClassifier, DecisionTreeClassifier)}
+
+
+def save_classifier(model, path=MODEL_PATH):
+    """حفظ المصنّف في ملف .npz صغير - Save a trained classifier to a tiny .npz file."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    np.savez(path, kind=model.kind, classes=model.classes.astype(str),
+             feature_names=np.asarray(FEATURE_NAMES), **model.to_arrays())
+
+
+def load_classifier(path=MODEL_PATH, fallback=True):
+    """
+    تحميل المصنّف؛ إذا لم يوجد الملف نعود إلى القواعد الأصلية.
+    Load a classifier; falls back to the original rules when the file is missing.
+    """
+    if not os.path.exists(path):
+        if fallback: return RuleClassifier()
+        raise FileNotFoundError(path)
+    with np.load(path) as data:
+        arrays = {k: data[k] for k in data.files}
+    if tuple(arrays.pop('feature_names')) != FEATURE_NAMES:
+        raise ValueError(f"{path}: unexpected feature order")
+    kind = str(arrays.pop('kind'))
+    return KINDS[kind](**arrays)
+
+
+def classify_features(clf, features):
+    """
+    شكل وجه واحد من قاموس خصائصه كما في النظام الحي: القواعد بقيم عادية، أو مسار المصفوفة للنماذج.
+    One face's shape from its feature dict, exactly as the live app does it: the
+    scalar rules for the rule classifier, the (1, 4) matrix path for trained models.
+    """
+    if isinstance(clf, RuleClassifier): return classify_shape(features)
+    return str(clf.predict(features_to_matrix(features))[0])
+
+
+def train_classifier(store, kind="tree", **params):
+    """تدريب مصنّف من مخزن الخصائص - Train a classifier from a FeatureStore."""
+    X = store.features()
+    y = np.asarray(store['label'], dtype=np.int64)
+    finite = np.all(np.isfinite(X), axis=1)
+    return KINDS[kind].fit(X[finite], y[finite], np.asarray(store.label_names), **params)
+
+
+# ==========================================
+# أداة التقييم (Evaluation Harness)
+# ==========================================
+def _nan_if_none(value):
+    return float('nan') if value is None else value
+
+
+def evaluate(store, classifiers, repeat=20):
+    """
+    دقة كل شكل وسرعة التصنيف لكل مصنّف على مخزن موسوم (المقاييس من ShapeMetrics).
+    Per-shape accuracy and throughput of each classifier on a labelled store;
+    the metrics come from ShapeMetrics, shared with ShapeEvaluator.
+    """
+    X = store.features()
+    finite = np.all(np.isfinite(X), axis=1)
+    X, truth = X[finite], store.labels()[finite]
+    shapes = list(store.label_names)
+
+    print(f"{len(X)} labelled faces")
+    print(f"{'classifier':10s} " + " ".join(f"{s:>8s}" for s in shapes) + f" {'overall':>8s} {'faces/s':>12s}")
+    report = {}
+    for name, clf in classifiers.items():
+        metrics = confusion_metrics(truth, clf.predict(X), shapes)
+        throughput = _nan_if_none(measure_throughput(clf, X, repeat)['faces_per_s'])
+        # دقة الشكل = الاسترجاع (نسبة وجوه هذا الشكل المصنّفة صحيحاً) - per-shape accuracy is recall
+        per_shape = {s: _nan_if_none(metrics['per_class'][s]['recall']) for s in shapes}
+        overall = _nan_if_none(metrics['accuracy'])
+        report[name] = {'per_shape': per_shape, 'overall': overall, 'throughput': throughput}
+        print(f"{name:10s} " + " ".join(f"{per_shape[s] * 100:7.1f}%" for s in shapes) +
+              f" {overall * 100:7.1f}% {throughput:12,.0f}")
+    return report
+
+
+if __name__ == "__main__":
+    from FeatureStore import load_feature_store
+
+    parser = argparse.ArgumentParser(description="Train / evaluate the face-shape classifier")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_train = sub.add_parser("train", help="fit a classifier on a feature store")
+    p_train.add_argument("--store", required=True)
+    p_train.add_argument("--kind", choices=sorted(KINDS), default="tree")
+    p_train.add_argument("--depth", type=int, default=4, help="tree depth")
+    p_train.add_argument("--min-leaf", type=int, default=5, help="minimum samples per tree leaf")
+    p_train.add_argument("--out", default=MODEL_PATH)
+    p_eval = sub.add_parser("evaluate", help="compare the model with the rules on a labelled store")
+    p_eval.add_argument("--store", required=True)
+    p_eval.add_argument("--model", default=MODEL_PATH)
+    args = parser.parse_args()
+
+    store = load_feature_store(args.store)
+    if args.command == "train":
+        params = {'max_depth': args.depth, 'min_leaf': args.min_leaf} if args.kind == "tree" else {}
+        model = train_classifier(store, args.kind, **params)
+        save_classifier(model, args.out)
+        print(f"Saved {args.kind} classifier to {args.out}")
+        evaluate(store, {'rules': RuleClassifier(), args.kind: model})
+    else:
+        t0 = time.perf_counter()
+        model = load_classifier(args.model, fallback=False)
+        print(f"Model loaded in {(time.perf_counter() - t0) * 1e6:.0f} us")
+        evaluate(store, {'rules': RuleClassifier(), model.kind: model})
@@ -0,0 +1,398 @@
+"""
+أداة تقييم تدريجية لمصنّف شكل الوجه على خصائص DataMiner المحفوظة.
+Incremental evaluation harness for the face-shape classifier over the features
+DataMiner already extracted (no images, no MediaPipe).
+
+لكل مدخل ولكل مصنّف: مصفوفة الالتباس، الدقة والاسترجاع لكل شكل، والسرعة.
+For every input and classifier: confusion matrix, per-class precision/recall
+and throughput.
+
+المدخلات:
+Inputs:
+    مجلد FeatureStore (مثل DataMiner/feature_store) - a FeatureStore folder
+    DataMiner/feature_cache.sqlite: الشكل من اسم المجلد، ويُقسّم حسب المجلد الأعلى
+    (testing_set / training_set) - labels come from the image's folder and rows
+    are split by the folder above it (testing_set / training_set).
+
+الذاكرة المؤقتة (eval_cache.sqlite) مفتاحها (نسخة المصنّف، بصمة الخصائص):
+The cache (eval_cache.sqlite) is keyed by (classifier version, feature hash):
+    - مدخل لم يتغير مع نفس المصنّف يُقرأ تقريره (الدقة) مباشرة - an unchanged
+      input with an unchanged classifier reuses its stored accuracy report;
+    - غير ذلك تُصنّف الصفوف الجديدة فقط (التنبؤ محفوظ لكل صف) - otherwise only
+      rows whose features were never scored by that version are predicted.
+السرعة لا تُحفظ بل تُقاس في كل تشغيل.
+Throughput is never cached: it is re-measured on every run.
+
+نسخة المصنّف بصمة لمعاملاته (أو لكود القواعد وجدول SHAPE_RULES)، فتغيير الحدود ينشئ نسخة جديدة.
+The classifier version hashes its parameters (or both rule functions and the
+SHAPE_RULES table), so any threshold change is a new version.
+
+التنبؤات بنفس مسار النظام الحي (وجه واحد في كل استدعاء عبر classify_features)،
+وأي وجه يختلف تصنيفه في مسار الدفعات (predict) يُعد تراجعاً.
+Predictions go through the live app's path (one face per classify_features
+call); faces the batch path (predict) labels differently are a regression.
+
+مع --baseline تُقارن النتائج بتشغيل سابق: انخفاض الدقة أو استرجاع أي شكل
+أكثر من الحد، أو بطء أكثر من --speed-tolerance، يُعتبر تراجعاً (exit code 1)،
+وتُعدّ الوجوه التي تغير تصنيفها بين النسختين.
+With --baseline the run is diffed against an earlier one: an accuracy or
+per-class recall drop beyond --tolerance, or a slowdown beyond
+--speed-tolerance, is a regression (exit code 1), and faces whose prediction
+flipped between the two classifier versions are counted.
+
+Usage:
+    python ShapeEvaluator.py                                    # feature_store + feature_cache, rules + model
+    python ShapeEvaluator.py --input path/to/store --classifier rules --classifier models/tree.npz
+    python ShapeEvaluator.py --save-baseline                    # store DataMiner/eval_baseline.json
+    python ShapeEvaluator.py --baseline DataMiner/eval_baseline.json
+"""
+import argparse
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+import FaceGeometry
+from FeatureStore import load_feature_store
+from ShapeClassifier import FEATURE_NAMES, MODEL_PATH, RuleClassifier, classify_features, load_classifier
+from ShapeMetrics import CLASSES, confusion_metrics, measure_throughput
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(ROOT, "DataMiner")
+DEFAULT_INPUTS = (os.path.join(DATA_DIR, "feature_store"), os.path.join(DATA_DIR, "feature_cache.sqlite"))
+CACHE_PATH = os.path.join(DATA_DIR, "eval_cache.sqlite")
+RESULTS_PATH = os.path.join(DATA_DIR, "eval_results", "latest.json")
+BASELINE_PATH = os.path.join(DATA_DIR, "eval_baseline.json")
+
+
+# ==========================================
+# المدخلات والبصمات (Inputs & Fingerprints)
+# ==========================================
+def _cache_inputs(path):
+    """
+    صفوف feature_cache.sqlite مقسّمة حسب مجلد المجموعة.
+    DataMiner feature_cache.sqlite rows, split by the dataset folder.
+    """
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        rows = conn.execute("SELECT path, " + ", ".join(FEATURE_NAMES) +
+                            " FROM images WHERE landmarks IS NOT NULL ORDER BY path").fetchall()
+    finally:
+        conn.close()
+    splits = {}
+    for image_path, *feats in rows:
+        shape_dir = os.path.dirname(image_path)
+        label = os.path.basename(shape_dir)
+        if label not in CLASSES: continue
+        split = splits.setdefault(os.path.basename(os.path.dirname(shape_dir)), ([], []))
+        split[0].append(feats)
+        split[1].append(label)
+    base = os.path.basename(path)
+    return [(f"{base}:{split}", np.array(X, dtype=np.float64).reshape(-1, len(FEATURE_NAMES)), np.array(y))
+            for split, (X, y) in sorted(splits.items())]
+
+
+def load_inputs(path):
+    """
+    [(الاسم، الخصائص N×4، الشكل الحقيقي)] من مخزن خصائص أو من ذاكرة DataMiner.
+    [(name, (N, 4) features, true shapes)] from a FeatureStore folder or a
+    DataMiner feature cache.
+    """
+    if os.path.isdir(path):
+        store = load_feature_store(path)
+        return [(os.path.basename(path.rstrip(os.sep)), np.asarray(store.features(), dtype=np.float64),
+                 store.labels())]
+    return _cache_inputs(path)
+
+
+def feature_hash(X, truth):
+    """بصمة الخصائص والأشكال الحقيقية - sha256 prefix of the features and labels."""
+    h = hashlib.sha256(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    h.update("\n".join(map(str, truth)).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def classifier_version(clf):
+    """
+    بصمة المصنّف: معاملاته، أو كود القواعد (المساران) وجدول الحدود للمصنّف القاعدي.
+    Classifier fingerprint: its parameters, or for the rule classifier both rule
+    functions (scalar and vectorized) and the SHAPE_RULES table. The live-app
+    entry point is hashed for every kind.
+    """
+    h = hashlib.sha256(clf.kind.encode("utf-8"))
+    h.update(inspect.getsource(classify_features).encode("utf-8"))
+    if isinstance(clf, RuleClassifier):
+        for rule in (FaceGeometry.classify_shape, FaceGeometry.classify_shapes):
+            h.update(inspect.getsource(rule).encode("utf-8"))
+        h.update(json.dumps(FaceGeometry.SHAPE_RULES, sort_keys=True).encode("utf-8"))
+    else:
+        h.update("\n".join(map(str, clf.classes)).encode("utf-8"))
+        for name, arr in sorted(clf.to_arrays().items()):
+            h.update(name.encode("utf-8"))
+            h.update(np.ascontiguousarray(arr).tobytes())
+    return f"{clf.kind}-{h.hexdigest()[:12]}"
+
+
+# ==========================================
+# الذاكرة المؤقتة للنتائج (Result Cache)
+# ==========================================
+class ResultCache:
+    """
+    ذاكرة SQLite: التنبؤ لكل (نسخة، بايتات الخصائص) والتقرير لكل (نسخة، بصمة مدخل).
+    SQLite cache: one prediction per (version, feature bytes) and one report per
+    (version, input feature hash).
+    """
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS predictions "
+                          "(version TEXT, features BLOB, shape TEXT, PRIMARY KEY (version, features))")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS reports "
+                          "(version TEXT, feature_hash TEXT, report TEXT, PRIMARY KEY (version, feature_hash))")
+
+    def report(self, version, fhash):
+        row = self.conn.execute("SELECT report FROM reports WHERE version = ? AND feature_hash = ?",
+                                (version, fhash)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put_report(self, version, fhash, report):
+        self.conn.execute("INSERT OR REPLACE INTO reports VALUES (?, ?, ?)", (version, fhash, json.dumps(report)))
+        self.conn.commit()
+
+    def lookup(self, version, X):
+        """
+        التنبؤات المحفوظة لصفوف X (None للصفوف غير المصنّفة).
+        Stored predictions for the rows of X (None for rows never scored).
+        """
+        known = dict(self.conn.execute("SELECT features, shape FROM predictions WHERE version = ?", (version,)))
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        return [known.get(row.tobytes()) for row in X]
+
+    def predict(self, version, predict, X):
+        """
+        التنبؤ لكل الصفوف مع تصنيف الصفوف الجديدة فقط. تُرجع (التنبؤات، عدد الصفوف المصنّفة).
+        Predictions for every row, calling predict(matrix) only on the rows not
+        cached for this version. Returns (predictions, rows scored).
+        """
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        pred = self.lookup(version, X)
+        todo = [i for i, p in enumerate(pred) if p is None]
+        if todo:
+            scored = predict(X[todo])
+            for i, shape in zip(todo, scored): pred[i] = str(shape)
+            self.conn.executemany("INSERT OR REPLACE INTO predictions VALUES (?, ?, ?)",
+                                  [(version, X[i].tobytes(), pred[i]) for i in todo])
+            self.conn.commit()
+        return np.array(pred, dtype=object).astype(str), len(todo)
+
+    def close(self):
+        self.conn.close()
+
+
+# ==========================================
+# التقييم (Evaluation)
+# ==========================================
+def live_predict(clf, X):
+    """
+    التصنيف بمسار النظام الحي، وجه واحد في كل مرة - Labels from the live app's
+    per-face path (classify_features on each row's feature dict).
+    """
+    return np.array([classify_features(clf, dict(zip(FEATURE_NAMES, row))) for row in X.tolist()], dtype=str)
+
+
+def evaluate_input(clf, version, X, truth, cache, repeat=20):
+    """
+    تقرير مصنّف واحد على مدخل واحد، من الذاكرة المؤقتة متى أمكن.
+    One classifier's report on one input, from the cache whenever possible.
+    """
+    fhash = feature_hash(X, truth)
+    live = functools.partial(live_predict, clf)
+    report = cache.report(version, fhash)
+    cached, rescored = report is not None, 0
+    if not cached:
+        pred, rescored = cache.predict(version, live, X)
+        # مسار الدفعات (DataMiner والخدمة) يجب أن يطابق المسار الحي - The batch path must agree
+        batch_mismatches = int(np.sum(np.asarray(clf.predict(X)).astype(str) != pred)) if len(X) else 0
+        report = dict(confusion_metrics(truth, pred), version=version, feature_hash=fhash,
+                      batch_mismatches=batch_mismatches)
+        cache.put_report(version, fhash, report)
+    # السرعة تُقاس في كل تشغيل ولا تُحفظ، فيُكتشف البطء حتى بدون تغيير النسخة
+    # Speed is measured on every run and never cached, so a slowdown shows up
+    # even when the classifier version is unchanged
+    return dict(report, **measure_throughput(clf, X, repeat, predict_one=live), cached=cached, rescored=rescored)
+
+
+def load_classifiers(specs):
+    """
+    {الاسم: المصنّف} من "rules" أو مسارات ملفات .npz.
+    {name: classifier} from "rules" or .npz model paths.
+    """
+    classifiers = {}
+    for spec in specs:
+        if spec == "rules": classifiers['rules'] = RuleClassifier()
+        else: classifiers[os.path.splitext(os.path.basename(spec))[0]] = load_classifier(spec, fallback=False)
+    return classifiers
+
+
+def run_evaluation(paths, classifiers, cache, repeat=20):
+    """
+    تقييم كل المدخلات الموجودة. تُرجع (التقارير، الصفوف المقيّمة لكل مدخل).
+    Evaluate every input that exists. Returns ({input: {classifier: report}},
+    {input: (features, truth)}) - the rows are kept for prediction diffs.
+    """
+    versions = {name: classifier_version(clf) for name, clf in classifiers.items()}
+    runs, rows = {}, {}
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"Input not found: {path}", file=sys.stderr)
+            continue
+        for name, X, truth in load_inputs(path):
+            # الوجوه التي فشل حساب نسبها لا تُقيّم - Faces with undefined ratios are skipped
+            finite = np.all(np.isfinite(X), axis=1)
+            X, truth = rows[name] = (X[finite], np.asarray(truth)[finite])
+            runs[name] = {clf_name: evaluate_input(clf, versions[clf_name], X, truth, cache, repeat)
+                          for clf_name, clf in classifiers.items()}
+    return runs, rows
+
+
+def _pct(value):
+    return f"{'-':>6s}" if value is None else f"{value * 100:5.1f}%"
+
+
+def print_report(runs):
+    for input_name, reports in runs.items():
+        print(f"\n=== {input_name} ===")
+        for clf_name, r in reports.items():
+            source = "cached" if r['cached'] else f"{r['rescored']} rows scored"
+            acc = "-" if r['accuracy'] is None else f"{r['accuracy'] * 100:.1f}%"
+            speed = "-" if r['faces_per_s'] is None else f"{r['faces_per_s']:,.0f} faces/s, {r['single_us']:.1f} us/face"
+            print(f"\n{clf_name} [{r['version']}]  {r['count']} faces  accuracy {acc}  {speed}  ({source})")
+            if r.get('batch_mismatches'):
+                print(f"  WARNING: {r['batch_mismatches']} faces get a different shape from the batch path")
+            classes = [c for c in r['classes'] if r['per_class'][c]['support'] or any(
+                row[r['classes'].index(c)] for row in r['confusion'])]
+            idx = [r['classes'].index(c) for c in classes]
+            print(f"  {'truth/pred':12s} " + " ".join(f"{c[:7]:>7s}" for c in classes) +
+                  f" {'prec':>6s} {'recall':>6s} {'f1':>6s}")
+            for i, c in zip(idx, classes):
+                m = r['per_class'][c]
+                print(f"  {c:12s} " + " ".join(f"{r['confusion'][i][j]:7d}" for j in idx) +
+                      f" {_pct(m['precision'])} {_pct(m['recall'])} {_pct(m['f1'])}")
+
+
+# ==========================================
+# المقارنة بتشغيل سابق (Run Diffs)
+# ==========================================
+def compare(runs, rows_by_input, baseline, cache, tolerance=0.01, speed_tolerance=0.25):
+    """
+    مقارنة كل (مدخل، مصنّف) بالتشغيل السابق. تُرجع (الأسطر، التراجعات).
+    Diff every (input, classifier) pair against the baseline run.
+    Returns (rows, regressions); each row is (input, classifier, notes, status).
+    """
+    rows, regressions = [], []
+    for input_name, reports in runs.items():
+        for clf_name, new in reports.items():
+            old = baseline['runs'].get(input_name, {}).get(clf_name)
+            if old is None:
+                rows.append((input_name, clf_name, ["not in baseline"], "new"))
+                continue
+            notes, worse = [], []
+            if old['feature_hash'] != new['feature_hash']: notes.append("inputs changed")
+            if old['version'] != new['version']: notes.append(f"version {old['version']} -> {new['version']}")
+            if None not in (old['accuracy'], new['accuracy']):
+                delta = new['accuracy'] - old['accuracy']
+                (worse if delta < -tolerance else notes).append(f"accuracy {delta * 100:+.1f} pts")
+            for c, m in new['per_class'].items():
+                old_recall = old['per_class'].get(c, {}).get('recall')
+                if None not in (old_recall, m['recall']) and m['recall'] - old_recall < -tolerance:
+                    worse.append(f"{c} recall {(m['recall'] - old_recall) * 100:+.1f} pts")
+            if new.get('batch_mismatches'):
+                worse.append(f"{new['batch_mismatches']} live/batch mismatches")
+            if None not in (old['faces_per_s'], new['faces_per_s']) and \
+                    new['faces_per_s'] < old['faces_per_s'] * (1 - speed_tolerance):
+                worse.append(f"throughput x{new['faces_per_s'] / old['faces_per_s']:.2f}")
+            flips = None
+            if old['version'] != new['version'] and input_name in rows_by_input:
+                flips = prediction_flips(cache, old['version'], new['version'], *rows_by_input[input_name])
+            if flips is not None: notes.append(f"{flips[0]} newly wrong, {flips[1]} newly right")
+            if worse: regressions.append(f"{input_name}/{clf_name}")
+            rows.append((input_name, clf_name, worse + notes, "REGRESSION" if worse else "ok"))
+    return rows, regressions
+
+
+def prediction_flips(cache, old_version, new_version, X, truth):
+    """
+    (صار خطأ، صار صحيحاً) بين نسختين على نفس الصفوف، إن كانت تنبؤات الاثنتين محفوظة.
+    (newly wrong, newly right) rows between two versions on the same features,
+    when both versions' predictions are cached; else None.
+    """
+    old, new = cache.lookup(old_version, X), cache.lookup(new_version, X)
+    if None in old or None in new: return None
+    old_ok, new_ok = np.array(old) == truth, np.array(new) == truth
+    return int(np.sum(old_ok & ~new_ok)), int(np.sum(~old_ok & new_ok))
+
+
+def print_comparison(rows):
+    print(f"\n{'input':34s} {'classifier':12s} {'status':10s} notes")
+    for input_name, clf_name, notes, status in rows:
+        print(f"{input_name:34s} {clf_name:12s} {status:10s} {'; '.join(notes)}")
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--input", action="append", help="FeatureStore folder or DataMiner feature cache "
+                                                          "(repeatable; default: DataMiner's store and cache)")
+    parser.add_argument("--classifier", action="append",
+                        help="'rules' or a .npz model (repeatable; default: rules + the shipped model)")
+    parser.add_argument("--cache", default=CACHE_PATH, help="result cache file")
+    parser.add_argument("--repeat", type=int, default=20, help="batches timed for throughput")
+    parser.add_argument("--output", default=RESULTS_PATH, help="machine-readable results (JSON)")
+    parser.add_argument("--baseline", help="diff against this results file")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="allowed accuracy/recall drop (fraction)")
+    parser.add_argument("--speed-tolerance", type=float, default=0.25, help="allowed throughput drop (fraction)")
+    parser.add_argument("--save-baseline", nargs="?", const=BASELINE_PATH, help="also store results as a baseline")
+    args = parser.parse_args(argv)
+
+    specs = args.classifier or ["rules"] + ([MODEL_PATH] if os.path.exists(MODEL_PATH) else [])
+    classifiers = load_classifiers(specs)
+    cache = ResultCache(args.cache)
+    try:
+        t0 = time.perf_counter()
+        runs, rows_by_input = run_evaluation(args.input or DEFAULT_INPUTS, classifiers, cache, args.repeat)
+        if not runs:
+            print("No inputs to evaluate (run DataMiner first)", file=sys.stderr)
+            return 2
+        print_report(runs)
+        print(f"\nEvaluated in {time.perf_counter() - t0:.2f}s")
+
+        data = {'meta': {'time': time.strftime("%Y-%m-%dT%H:%M:%S"), 'numpy': np.__version__}, 'runs': runs}
+        write_json(args.output, data)
+        if args.save_baseline: write_json(args.save_baseline, data)
+
+        if args.baseline:
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+            rows, regressions = compare(runs, rows_by_input, baseline, cache, args.tolerance, args.speed_tolerance)
+            print_comparison(rows)
+            if regressions:
+                print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+                return 1
+    finally:
+        cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
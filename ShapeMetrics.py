@@ -0,0 +1,69 @@
+"""
+مقاييس تقييم مصنّف شكل الوجه: مصفوفة الالتباس والسرعة.
+Face-shape classifier metrics: confusion matrix and throughput.
+
+وحدة طرفية (NumPy و FaceGeometry فقط) يستخدمها ShapeClassifier و ShapeEvaluator،
+فتُحسب الدقة في مكان واحد.
+A leaf module (NumPy and FaceGeometry only) shared by ShapeClassifier and
+ShapeEvaluator, so accuracy is computed in one place.
+"""
+import time
+
+import numpy as np
+
+import FaceGeometry
+
+CLASSES = tuple(str(s) for s in FaceGeometry.SHAPES)
+
+
+def _rounded(value):
+    """قيمة مقربة أو None إذا لم تكن محددة - Rounded value, or None when undefined (nan/inf)."""
+    return round(float(value), 4) if np.isfinite(value) else None
+
+
+def confusion_metrics(truth, pred, classes=CLASSES):
+    """
+    مصفوفة الالتباس (الصفوف = الحقيقة) والدقة والاسترجاع و F1 لكل شكل.
+    Confusion matrix (rows = truth, columns = prediction) with per-class
+    precision, recall and F1.
+    """
+    classes = list(classes) + sorted((set(map(str, truth)) | set(map(str, pred))) - set(classes))
+    index = {c: i for i, c in enumerate(classes)}
+    k = len(classes)
+    t = np.array([index[str(c)] for c in truth], dtype=np.int64)
+    p = np.array([index[str(c)] for c in pred], dtype=np.int64)
+    confusion = np.bincount(t * k + p, minlength=k * k).reshape(k, k)
+    tp = np.diag(confusion).astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = tp / confusion.sum(axis=0)
+        recall = tp / confusion.sum(axis=1)
+        f1 = 2 * precision * recall / (precision + recall)
+    return {
+        'count': int(len(t)),
+        'accuracy': _rounded(tp.sum() / len(t)) if len(t) else None,
+        'classes': classes,
+        'confusion': confusion.tolist(),
+        'per_class': {c: {'precision': _rounded(precision[i]), 'recall': _rounded(recall[i]),
+                          'f1': _rounded(f1[i]), 'support': int(confusion[i].sum())}
+                      for i, c in enumerate(classes)},
+    }
+
+
+def measure_throughput(clf, X, repeat=20, singles=200, predict_one=None):
+    """
+    دفعة كاملة (وجه/ث) ووجه واحد كما في النظام الحي (ميكروثانية).
+    Whole-batch faces/s, and microseconds per single-face call as in the live app.
+    predict_one(X[:1]) is the timed single-face path (default: clf.predict).
+    """
+    if not len(X): return {'faces_per_s': None, 'single_us': None}
+    clf.predict(X)
+    t0 = time.perf_counter()
+    for _ in range(repeat): clf.predict(X)
+    batch_s = time.perf_counter() - t0
+    row = X[:1]
+    predict_one = predict_one or clf.predict
+    t0 = time.perf_counter()
+    for _ in range(singles): predict_one(row)
+    single_s = time.perf_counter() - t0
+    return {'faces_per_s': round(len(X) * repeat / max(batch_s, 1e-9), 1),
+            'single_us': round(single_s / singles * 1e6, 2)}
@@ -0,0 +1,110 @@
+"""
+تنعيم زمني لشكل الوجه: تصويت متدفق بتكلفة ثابتة لكل إطار.
+Temporal smoothing of the face shape: a streaming vote with O(1) work per frame.
+
+لا يعتمد على الكاميرا أو OpenCV، ويمكن استخدام نسخة منه لكل وجه.
+No camera or OpenCV dependency; one instance per tracked face.
+"""
+import numpy as np
+
+
+class ShapeVoter:
+    """
+    حلقة ثابتة الحجم من آخر الأشكال مع عدّاد لكل شكل يُحدّث تدريجياً.
+    Fixed-size ring buffer of the latest shape labels with incrementally updated
+    per-class counts.
+
+    size          عدد الإطارات في النافذة - Frames in the voting window.
+    max_misses    عدد الإطارات غير المستقيمة المتتالية المسموح بها قبل مسح التقدم
+                  Consecutive misaligned frames tolerated before progress is reset (hysteresis).
+    ratio_alpha   وزن الإطار الجديد في المتوسط الأسي للنسب (None = بدون)
+                  Weight of the newest frame in the exponentially weighted ratios (None = off).
+    classify      دالة تحول النسب المنعّمة إلى شكل؛ إذا أُعطيت مع ratio_alpha يصبح
+                  الشكل المستقر تصنيف النسب المنعّمة بدل تصويت الأغلبية.
+                  Maps smoothed ratios to a shape; with ratio_alpha set, the stable
+                  shape is the classification of the smoothed ratios instead of the majority vote.
+    """
+    def __init__(self, size=15, max_misses=5, ratio_alpha=None, classify=None):
+        self.size = size
+        self.max_misses = max_misses
+        self.ratio_alpha = ratio_alpha
+        self.classify = classify
+        self._ring = [None] * size
+        self.reset()
+
+    def reset(self):
+        """مسح كل التاريخ - Drop all history."""
+        for i in range(self.size): self._ring[i] = None
+        self._head = 0
+        self.count = 0
+        self.counts = {}
+        self.leader = None
+        self.misses = 0
+        self.ratios = None
+
+    def push(self, shape, ratios=None):
+        """
+        إضافة تصويت إطار مستقيم: O(1) (العدّادات تتغير بمقدار واحد فقط).
+        Add one aligned frame's vote. O(1): only two counters change.
+        """
+        old = self._ring[self._head]
+        if old is not None:
+            self.counts[old] -= 1
+        else:
+            self.count += 1
+        self._ring[self._head] = shape
+        self._head = (self._head + 1) % self.size
+        n = self.counts.get(shape, 0) + 1
+        self.counts[shape] = n
+        self.misses = 0
+
+        # القائد يتغير فقط إذا تفوّق عليه شكل آخر (التعادل يُبقي القائد الحالي)
+        # The leader changes only when beaten outright (ties keep the current leader)
+        if self.leader is None or (shape != self.leader and n > self.counts.get(self.leader, 0)):
+            self.leader = shape
+        elif old == self.leader and shape != self.leader:
+            # القائد فقد صوتاً: قد يتفوق عليه شكل آخر (عدد الأشكال ثابت وصغير)
+            # The leader lost a vote and may now be beaten (few classes, constant work)
+            best = max(self.counts, key=self.counts.get)
+            if self.counts[best] > self.counts[self.leader]: self.leader = best
+
+        if ratios is not None and self.ratio_alpha is not None:
+            ratios = np.asarray(ratios, dtype=np.float64)
+            if self.ratios is None:
+                self.ratios = ratios.copy()
+            else:
+                self.ratios *= 1.0 - self.ratio_alpha
+                self.ratios += self.ratio_alpha * ratios
+        return self
+
+    def miss(self):
+        """
+        إطار غير مستقيم: التقدم يُمسح فقط بعد max_misses إطارات متتالية.
+        A misaligned frame; progress is only reset after max_misses in a row.
+        Returns True when the history was reset.
+        """
+        self.misses += 1
+        if self.misses > self.max_misses:
+            self.reset()
+            return True
+        return False
+
+    @property
+    def full(self):
+        """امتلأت النافذة (النتيجة مستقرة) - The window is full, so the vote is stable."""
+        return self.count == self.size
+
+    @property
+    def progress(self):
+        """نسبة امتلاء النافذة (0-1) - Fraction of the window filled."""
+        return self.count / self.size
+
+    @property
+    def shape(self):
+        """
+        الشكل المستقر: الأغلبية، أو تصنيف النسب المنعّمة إذا كان مفعّلاً.
+        The stable shape: the majority vote, or the smoothed ratios' class when enabled.
+        """
+        if self.classify is not None and self.ratios is not None:
+            return self.classify(self.ratios)
+        return self.leader
@@ -0,0 +1,247 @@
+"""
+مُركّب الشريط الجانبي: رسم الإطار الثابت مرة واحدة وإعادة رسم المناطق المتغيرة فقط.
+Sidebar compositor: static chrome is rendered once per resolution, and only the
+dynamic regions (status, stats grid, recommendation card) are redrawn when
+their contents change.
+"""
+import cv2
+import numpy as np
+
+from FrameProfiler import NULL_PROFILER
+from UIDrawing import (
+    COLOR_ACCENT_PRIMARY, COLOR_ACCENT_SECONDARY, COLOR_BG_CARD, COLOR_BG_DARK, COLOR_BG_GLASS,
+    COLOR_BG_SIDEBAR, COLOR_SUCCESS, COLOR_TEXT_MUTED, COLOR_TEXT_PRIMARY, COLOR_TEXT_SECONDARY,
+    as_sprite, draw_gradient_background, draw_rounded_rect, overlay_image_alpha, put_arabic_text,
+)
+
+STAT_LABELS = ["الطول", "الزاوية", "الفك", "الجبهة"]
+
+
+class SidebarCompositor:
+    """
+    يحتفظ بخلفية مخزنة للشريط الجانبي ويحدّث المستطيلات المتغيرة فقط.
+    Keeps a cached sidebar background and patches only the dirty rectangles.
+    """
+    HEADER_H = 80
+    FOOTER_H = 40
+    STATUS_H = 100
+    STATS_H = 130
+    MARGIN = 20
+
+    def __init__(self, glasses_images=None, profiler=NULL_PROFILER):
+        self.glasses_images = glasses_images if glasses_images is not None else {}
+        self.profiler = profiler
+        self._size = None
+        self._chrome = None
+        self._composed = None
+        self._layout = {}
+        self._region_state = {}
+        self._sprites = {}
+
+    # ------------------------------------------
+    # التخطيط والإطار الثابت (Layout & Static Chrome)
+    # ------------------------------------------
+    def _build_layout(self, h, sidebar_w):
+        """حساب مواقع البطاقات (إحداثيات محلية) - Compute card rectangles in sidebar coordinates."""
+        card_x = self.MARGIN
+        card_w = sidebar_w - 2 * self.MARGIN
+        status_y = self.HEADER_H + self.MARGIN
+        rec_y = status_y + self.STATUS_H + self.MARGIN
+        stats_y = h - self.FOOTER_H - self.STATS_H - self.MARGIN
+        rec_h = (stats_y - self.MARGIN) - rec_y
+        return {
+            'center_x': sidebar_w // 2,
+            'card_x': card_x, 'card_w': card_w,
+            'status': (card_x, status_y, card_x + card_w, status_y + self.STATUS_H),
+            'stats': (card_x, stats_y, card_x + card_w, stats_y + self.STATS_H),
+            # بطاقة التوصية تأخذ كل المساحة المتبقية فقط إذا كانت كافية
+            # The recommendation card fills the remaining space only if it is large enough
+            'rec': (card_x, rec_y, card_x + card_w, rec_y + rec_h) if rec_h > 150 else None,
+        }
+
+    def _render_chrome(self, h, sidebar_w):
+        """رسم كل العناصر الثابتة مرة واحدة - Render every static element once."""
+        lay = self._layout
+        chrome = np.zeros((h, sidebar_w, 3), dtype='uint8')
+        cx = lay['center_x']
+
+        draw_gradient_background(chrome, (0, 0, sidebar_w, h), COLOR_BG_SIDEBAR, COLOR_BG_DARK, 'vertical')
+
+        # 1. الهيدر
+        draw_gradient_background(chrome, (0, 0, sidebar_w, self.HEADER_H), (30, 30, 40), COLOR_BG_SIDEBAR, 'horizontal')
+        cv2.line(chrome, (0, self.HEADER_H), (sidebar_w, self.HEADER_H), COLOR_ACCENT_PRIMARY, 2)
+        put_arabic_text(chrome, "نظام التحليل البيومتري", (cx, 25), 22, COLOR_TEXT_PRIMARY, align="center")
+        put_arabic_text(chrome, "Smart Vision Pro", (cx, 55), 12, COLOR_TEXT_MUTED, align="center")
+
+        # 2. بطاقة الحالة
+        x1, y1, x2, y2 = lay['status']
+        draw_rounded_rect(chrome, (x1, y1), (x2, y2), COLOR_BG_CARD, radius=12, fill=True)
+        put_arabic_text(chrome, "الشكل:", (x2 - 20, y1 + 20), 14, COLOR_TEXT_SECONDARY, align="right")
+
+        # 3. بطاقة الإحصائيات
+        x1, y1, x2, y2 = lay['stats']
+        draw_rounded_rect(chrome, (x1, y1), (x2, y2), COLOR_BG_CARD, radius=12, fill=True)
+        put_arabic_text(chrome, "القياسات", (x2 - 15, y1 + 15), 14, COLOR_TEXT_SECONDARY, align="right")
+
+        # 4. بطاقة التوصية
+        if lay['rec'] is not None:
+            x1, y1, x2, y2 = lay['rec']
+            draw_rounded_rect(chrome, (x1, y1), (x2, y2), COLOR_BG_GLASS, radius=12, fill=True)
+            put_arabic_text(chrome, "التوصية", (x2 - 20, y1 + 20), 16, COLOR_ACCENT_SECONDARY, align="right")
+
+        # الفوتر
+        cv2.rectangle(chrome, (0, h - self.FOOTER_H), (sidebar_w, h), (20, 20, 30), -1)
+        put_arabic_text(chrome, "ESC: خروج", (cx, h - 15), 11, COLOR_TEXT_MUTED, align="center")
+        return chrome
+
+    def _ensure_size(self, h, sidebar_w):
+        """إعادة بناء الخلفية عند تغير الحجم فقط - Rebuild the chrome only when the size changes."""
+        if self._size == (h, sidebar_w): return
+        self._size = (h, sidebar_w)
+        self._layout = self._build_layout(h, sidebar_w)
+        t = self.profiler.start()
+        self._chrome = self._render_chrome(h, sidebar_w)
+        self.profiler.lap('sidebar_chrome', t)
+        self._composed = self._chrome.copy()
+        self._region_state = {}
+
+    # ------------------------------------------
+    # المناطق المتغيرة (Dynamic Regions)
+    # ------------------------------------------
+    def _region_canvas(self, rect):
+        """استعادة المنطقة من الخلفية وإرجاع نافذة الرسم - Restore a region from the chrome and return its view."""
+        x1, y1, x2, y2 = rect
+        x2, y2 = x2 + 1, y2 + 1
+        self._composed[y1:y2, x1:x2] = self._chrome[y1:y2, x1:x2]
+        return self._composed[y1:y2, x1:x2]
+
+    def _draw_status(self, display_shape, status_color):
+        roi = self._region_canvas(self._layout['status'])
+        cx = self._layout['center_x'] - self._layout['card_x']
+        cv2.circle(roi, (30, 30), 8, status_color, -1)
+        put_arabic_text(roi, display_shape, (cx, 50), 24, status_color, align="center")
+
+    def _draw_stats(self, stat_texts):
+        roi = self._region_canvas(self._layout['stats'])
+        card_w = self._layout['card_w']
+        for i, (lbl, v) in enumerate(zip(STAT_LABELS, stat_texts)):
+            row, col = i // 2, i % 2
+            cx = 20 + col * (card_w // 2)
+            cy = 45 + row * 35
+            put_arabic_text(roi, f"{lbl}: {v}", (cx, cy), 13, COLOR_ACCENT_PRIMARY, align="left")
+
+    def _draw_recommendation(self, rec_name, rec_img_key):
+        x1, y1, x2, y2 = self._layout['rec']
+        roi = self._region_canvas(self._layout['rec'])
+        cx = self._layout['center_x'] - self._layout['card_x']
+        card_w = self._layout['card_w']
+        rec_card_h = y2 - y1
+
+        if not rec_name:
+            put_arabic_text(roi, "جاري التحليل...", (cx, rec_card_h // 2), 16, COLOR_TEXT_MUTED, align="center")
+            return
+
+        # اسم النظارة
+        put_arabic_text(roi, rec_name, (cx, 50), 20, COLOR_TEXT_PRIMARY, align="center")
+
+        # حساب مساحة الصورة
+        img_area_y = 80
+        img_area_h = rec_card_h - 110 # ترك مسافة للنصوص فوق وتحت
+        if img_area_h > 50 and rec_img_key in self.glasses_images:
+            g_img = self.glasses_images[rec_img_key]
+            # تحجيم الصورة لتناسب المساحة المتاحة
+            scale = min((card_w - 60) / g_img.shape[1], img_area_h / g_img.shape[0])
+            new_w, new_h = int(g_img.shape[1] * scale), int(g_img.shape[0] * scale)
+            g_resized = self._glasses_sprite(rec_img_key, (new_w, new_h))
+
+            g_y_pos = img_area_y + (img_area_h - new_h) // 2
+            g_x_pos = cx - (new_w // 2)
+
+            # خلفية خفيفة للصورة
+            cv2.rectangle(roi, (g_x_pos-5, g_y_pos-5), (g_x_pos+new_w+5, g_y_pos+new_h+5), (255,255,255), -1)
+            overlay_image_alpha(roi, g_resized, g_x_pos, g_y_pos)
+
+        put_arabic_text(roi, "يناسب وجهك", (cx, rec_card_h - 30), 12, COLOR_SUCCESS, align="center")
+
+    def _glasses_sprite(self, img_key, size):
+        """
+        صورة النظارة بالحجم المطلوب، محفوظة حسب (المفتاح، الحجم).
+        Glasses image resized to `size`, cached on (img key, size) so switching
+        back to a previous recommendation does not resize again.
+        """
+        sprite = self._sprites.get((img_key, size))
+        if sprite is None:
+            sprite = as_sprite(self.glasses_images[img_key]).resized(size)
+            self._sprites[(img_key, size)] = sprite
+        return sprite
+
+    def _update_region(self, name, state, draw_fn):
+        """إعادة الرسم فقط إذا تغير المحتوى - Redraw a region only when its contents change."""
+        if self._region_state.get(name) == state: return False
+        t = self.profiler.start()
+        draw_fn(*state)
+        self.profiler.lap(f"sidebar_{name}", t)
+        self._region_state[name] = state
+        return True
+
+    # ------------------------------------------
+    # الواجهة العامة (Public API)
+    # ------------------------------------------
+    def render(self, h, sidebar_w, display_shape, status_color, stats, rec_name="", rec_img_key=None,
+               freeze_stats=False):
+        """
+        إرجاع الشريط الجانبي الكامل بعد تحديث المناطق المتغيرة.
+        Return the composed sidebar (h x sidebar_w) after patching the dirty regions.
+        freeze_stats: إبقاء القياسات المرسومة كما هي (تتغير كل إطار تقريباً)
+                      Keep the measurements already drawn; they change almost every frame.
+        """
+        self._ensure_size(h, sidebar_w)
+        self._update_region('status', (display_shape, tuple(status_color)), self._draw_status)
+        if not (freeze_stats and 'stats' in self._region_state):
+            stat_texts = tuple(f"{v:.0f}" for v in stats)
+            self._update_region('stats', (stat_texts,), self._draw_stats)
+        if self._layout['rec'] is not None:
+            self._update_region('rec', (rec_name, rec_img_key), self._draw_recommendation)
+        return self._composed
+
+    def compose(self, final_img, x_offset, *args, **kwargs):
+        """
+        نسخ الشريط الجانبي إلى الصورة النهائية (نسخة ذاكرة واحدة).
+        Copy the composed sidebar into the final canvas with a single memcpy.
+        """
+        h = final_img.shape[0]
+        sidebar_w = final_img.shape[1] - x_offset
+        final_img[:, x_offset:] = self.render(h, sidebar_w, *args, **kwargs)
+        return final_img
+
+    def draw_debug(self, final_img, x_offset, rows, col_w=52):
+        """
+        لوحة التشخيص (أزمنة المراحل) فوق أسفل بطاقة التوصية؛ خط OpenCV لأنه أسرع من PIL.
+        Debug panel (stage timings) over the bottom of the recommendation card,
+        drawn with OpenCV's font since it is much cheaper than the PIL text path.
+        rows: صفوف من خلايا؛ الأولى يساراً والباقي أعمدة أرقام محاذاة لليمين
+              Tuples of cells; the first is left-aligned, the rest are right-aligned number columns.
+        """
+        if not rows: return final_img
+        h = final_img.shape[0]
+        line_h = 15
+        font = cv2.FONT_HERSHEY_PLAIN
+        x1 = x_offset + self.MARGIN
+        x2 = final_img.shape[1] - self.MARGIN
+        y2 = h - self.FOOTER_H - self.STATS_H - 2 * self.MARGIN
+        y1 = max(self.HEADER_H, y2 - line_h * len(rows) - 10)
+        final_img[y1:y2, x1:x2] //= 4  # تعتيم الخلفية - darken the background
+        for i, row in enumerate(rows):
+            y = y1 + 16 + i * line_h
+            if y > y2: break
+            cv2.putText(final_img, row[0], (x1 + 8, y), font, 1.0, COLOR_TEXT_PRIMARY, 1, cv2.LINE_AA)
+            for j, cell in enumerate(row[1:]):
+                right = x2 - 8 - (len(row) - 2 - j) * col_w
+                (tw, _), _ = cv2.getTextSize(cell, font, 1.0, 1)
+                cv2.putText(final_img, cell, (right - tw, y), font, 1.0, COLOR_TEXT_PRIMARY, 1, cv2.LINE_AA)
+        return final_img
+
+    def invalidate(self):
+        """فرض إعادة بناء كل شيء في الإطار التالي - Force a full rebuild on the next frame."""
+        self._size = None
+        self._sprites.clear()
@@ -1,15 +1,42 @@
 """
 نظام الخبير الذكي لتوصية النظارات بناءً على شكل الوجه.
 Smart Expert System for glasses recommendation based on face shape.
+
+القواعد تُقرأ من ملف تعريفي (expert_rules.json) وتُترجم مرة واحدة إلى مصفوفة
+نقاط (شكل × نظارة) ومتجهات تعديل حسب زاوية الذقن.
+The rules are read from a declarative file (expert_rules.json) and compiled once
+into a shape x glass score matrix plus chin-angle adjustment vectors.
 """
+import json
+import os
+
 import numpy as np
 
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "expert_rules.json")
+
+# كسر التعادل لصالح رقم النظارة الأكبر كما في argsort()[-3:][::-1] الأصلي
+# (أصغر بكثير من أي فرق بين النقاط)
+# Ties go to the higher glass ID, as in the original argsort()[-3:][::-1]
+# (far below any real score difference)
+_TIE_EPS = 1e-9
+
+# حد أقصى لمدخلات ذاكرة التوصيات (الأشكال المعروفة × فئات الزاوية أقل بكثير)
+# Cap on memoized recommendations (known shapes x angle buckets are far fewer)
+MEMO_SIZE = 1024
+
+
+def load_rules(path=RULES_PATH):
+    """قراءة ملف القواعد - Read the declarative rules file."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
 class SmartExpert:
     """
     كلاس الخبير المسؤول عن تحليل بيانات الوجه واقتراح النظارات المناسبة.
     The Expert class responsible for analyzing face data and suggesting suitable glasses.
     """
-    def __init__(self):
+    def __init__(self, rules_path=RULES_PATH):
         # القاموس يحتوي على: الاسم للعرض + اسم ملف الصورة
         # Dictionary containing: Display Name + Image Filename
         self.glass_types = {
@@ -23,44 +50,164 @@ class SmartExpert:
             9:  {'name': 'Wayfarer',            'img': 'wayfarer'},
             12: {'name': 'Rimless (بدون إطار)', 'img': 'rimless'}
         }
+        self.rules_path = rules_path
+        self._compile(load_rules(rules_path))
+
+    # ==========================================
+    # ترجمة القواعد (Rule Compilation)
+    # ==========================================
+    def _glass_vector(self, scores):
+        """{اسم صورة النظارة: نقاط} إلى متجه بطول الكتالوج - {img key: score} -> catalog-length vector."""
+        vec = np.zeros(len(self.glass_ids))
+        for img_key, value in scores.items():
+            if img_key not in self._column:
+                raise ValueError(f"{self.rules_path}: unknown glass '{img_key}'")
+            vec[self._column[img_key]] += value
+        return vec
+
+    def _compile(self, rules):
+        """
+        مصفوفة النقاط (الأشكال + صف محايد للأشكال غير المعروفة) ومتجهات تعديل الزاوية.
+        Score matrix (one row per shape + a neutral row for unknown shapes) and
+        the angle-adjustment vectors with their open (above, below) ranges.
+        """
+        self.glass_ids = np.array(sorted(self.glass_types))
+        self._column = {self.glass_types[gid]['img']: col for col, gid in enumerate(self.glass_ids)}
+        self.default_shape = rules.get('default_shape', 'Oval')
+        self.default_angle = float(rules.get('default_angle', 120))
+        self.min_score = float(rules.get('min_score', 0))
+
+        self.shape_names = [name.lower() for name in rules['shapes']]
+        self.score_matrix = np.vstack([self._glass_vector(s) for s in rules['shapes'].values()] +
+                                      [np.zeros(len(self.glass_ids))])
+        adjustments = rules.get('angle_adjustments', [])
+        self.angle_above = np.array([a.get('above', -np.inf) for a in adjustments], dtype=np.float64)
+        self.angle_below = np.array([a.get('below', np.inf) for a in adjustments], dtype=np.float64)
+        self.angle_vectors = np.array([self._glass_vector(a['scores']) for a in adjustments]).reshape(-1, len(self.glass_ids))
+        self._tie_break = np.arange(len(self.glass_ids)) * _TIE_EPS
+        self._rows = {}
+
+        # جدول التوصيات الجاهز لكل تركيبة (شكل، تعديلات): recommend مجرد بحث في جدول
+        # Ready-made top-3 for every (shape, adjustments) combination: recommend is a table lookup
+        self._ranges = list(zip(self.angle_above.tolist(), self.angle_below.tolist()))
+        ids, _ = self._rank_combos(np.arange(len(self.score_matrix) << len(self._ranges)))
+        self._table = [[self.glass_types[gid] for gid in row if gid >= 0] for row in ids.tolist()]
+        self._memo = {}
+
+    def shape_row(self, shape_name):
+        """
+        صف الشكل في مصفوفة النقاط (نفس مطابقة الأسماء الجزئية القديمة).
+        Score-matrix row for a shape name; keeps the original substring matching
+        (first rule contained in the name wins) and maps unknown names to the neutral row.
+        """
+        key = str(shape_name).lower()
+        row = self._rows.get(key)
+        if row is None:
+            row = next((i for i, name in enumerate(self.shape_names) if name in key), len(self.shape_names))
+            self._rows[key] = row
+        return row
+
+    # ==========================================
+    # التقييم (Scoring)
+    # ==========================================
+    def _columns(self, face_data):
+        """
+        صفوف الأشكال والزوايا من قائمة قواميس أو من قاموس أعمدة.
+        Shape rows and angles from a list of face_data dicts or a dict of columns.
+        """
+        if isinstance(face_data, dict):
+            shapes = np.atleast_1d(np.asarray(face_data.get('shape', self.default_shape)))
+            angles = np.atleast_1d(np.asarray(face_data.get('angle', self.default_angle), dtype=np.float64))
+            angles = np.broadcast_to(angles, shapes.shape)
+        else:
+            shapes = np.array([d.get('shape', self.default_shape) for d in face_data], dtype=object)
+            angles = np.array([d.get('angle', self.default_angle) for d in face_data], dtype=np.float64)
+        # أسماء قليلة مكررة آلاف المرات: نحوّل كل اسم فريد مرة واحدة
+        # A handful of names repeated thousands of times: map each unique name once
+        unique, inverse = np.unique(shapes.astype(str), return_inverse=True)
+        rows = np.array([self.shape_row(s) for s in unique], dtype=np.intp)[inverse.reshape(-1)]
+        return rows, angles.reshape(-1)
+
+    def _active(self, angles):
+        """قناع تعديلات الزاوية المفعّلة (N × عدد التعديلات) - Active angle adjustments mask."""
+        angles = np.asarray(angles, dtype=np.float64)[:, None]
+        return (angles > self.angle_above) & (angles < self.angle_below)
+
+    def score(self, rows, angles):
+        """
+        مصفوفة النقاط (N × عدد النظارات) لصفوف أشكال وزوايا ذقن.
+        (N, n_glasses) scores for shape rows and chin angles.
+        """
+        return self.score_matrix[rows] + self._active(angles) @ self.angle_vectors
+
+    def _rank_combos(self, combos, k=3):
+        """
+        أفضل k أعمدة لكل تركيبة (صف الشكل، التعديلات المفعّلة) بـ argpartition.
+        Top-k columns via argpartition for encoded (shape row << m | adjustment bits) combos.
+        """
+        m = len(self.angle_vectors)
+        bits = (combos[:, None] >> np.arange(m)) & 1
+        scores = self.score_matrix[combos >> m] + bits @ self.angle_vectors
+        k = min(k, scores.shape[1])
+        keys = scores + self._tie_break
+        top = np.argpartition(-keys, k - 1, axis=1)[:, :k]
+        top = np.take_along_axis(top, np.argsort(-np.take_along_axis(keys, top, axis=1), axis=1), axis=1)
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        return np.where(top_scores > self.min_score, self.glass_ids[top], -1), top_scores
+
+    def _top_k(self, rows, angles, k=3):
+        """
+        النقاط تعتمد فقط على صف الشكل والتعديلات المفعّلة، لذا تُرتّب كل تركيبة مرة واحدة.
+        Scores depend only on the shape row and which adjustments fire, so each
+        distinct combination is ranked once and gathered back to N rows.
+        """
+        active = self._active(angles)
+        combo = np.asarray(rows, dtype=np.int64) << active.shape[1]
+        combo |= active @ (1 << np.arange(active.shape[1], dtype=np.int64))
+        combos, inverse = np.unique(combo, return_inverse=True)
+        ids, top_scores = self._rank_combos(combos, k)
+        inverse = inverse.reshape(-1)
+        return ids[inverse], top_scores[inverse]
+
+    def recommend_batch(self, face_data, k=3):
+        """
+        أفضل k نظارات لعدد كبير من الوجوه دفعة واحدة.
+        Top-k glasses for many faces at once.
+
+        face_data  قائمة قواميس {'shape', 'angle'} أو قاموس أعمدة (مصفوفات)
+                   A list of face_data dicts, or a dict of 'shape'/'angle' columns.
+        Returns (glass_ids, scores), both (N, k), best first. Slots without a
+        glass scoring above min_score hold -1.
+        """
+        rows, angles = self._columns(face_data)
+        return self._top_k(rows, angles, k)
+
+    def angle_bucket(self, angle):
+        """
+        رقم فئة الزاوية: أي تعديلات الزاوية تنطبق (كل زاويتين بنفس الفئة لهما نفس التوصية).
+        Angle bucket: a bitmask of the adjustments whose range contains the angle.
+        Two angles in the same bucket always get the same recommendation.
+        """
+        bits = 0
+        for i, (above, below) in enumerate(self._ranges):
+            if above < angle < below: bits |= 1 << i
+        return bits
 
     def recommend(self, face_data):
         """
         يقوم بحساب التوصيات بناءً على بيانات الوجه.
         Calculates recommendations based on face data.
+
+        النتائج محفوظة حسب (الشكل، فئة الزاوية)، فالإطارات التي لا يتغير فيها
+        الشكل المستقر لا تقوم بأي عمل.
+        Results are memoized on (shape, angle bucket), so frames where the stable
+        shape does not change do no recommendation work.
         """
-        # تهيئة متجه النتائج للنظارات المختلفة (بناءً على نظام نقاط)
-        # Initialize score vector for different glasses (based on a scoring system)
-        s_vector = np.zeros(31) 
-        shape_name = face_data.get('shape', 'Oval').lower()
-        chin_angle = face_data.get('angle', 120)
-        
-        # --- تطبيق قواعد النظام الخبير (Expert System Rules) ---
-        if 'oval' in shape_name:
-            s_vector[[0, 1, 4]] += 2.0; s_vector[[9]] += 1.5; s_vector[[12]] += 1.0; s_vector[[3]] += 0.5
-        elif 'round' in shape_name:
-            s_vector[[0, 1]] += 3.0; s_vector[[9]] += 2.0; s_vector[[5]] += 2.0; s_vector[[7]] += 1.5; s_vector[[2, 3]] -= 3.0
-        elif 'square' in shape_name:
-            s_vector[[3]] += 3.0; s_vector[[2, 4]] += 2.5; s_vector[[5]] += 1.0; s_vector[[12]] += 1.0; s_vector[[0, 1]] -= 3.0
-        elif 'heart' in shape_name:
-            s_vector[[9]] += 3.0; s_vector[[4]] += 2.0; s_vector[[7]] += 2.0; s_vector[[12]] += 1.5; s_vector[[2]] += 1.0
-        elif 'diamond' in shape_name:
-            s_vector[[5]] += 3.0; s_vector[[2]] += 2.0; s_vector[[12]] += 2.0; s_vector[[7]] += 1.5; s_vector[[0, 1]] -= 1.0
-        elif 'oblong' in shape_name:
-            s_vector[[4]] += 3.0; s_vector[[1]] += 2.0; s_vector[[9]] += 1.5; s_vector[[0]] -= 1.0
-
-        # تعديل التوصيات بناءً على زوايا محددة للذقن
-        # Adjust recommendations based on specific chin angles
-        if chin_angle < 100:
-            s_vector[[7]] += 1.0; s_vector[[1]] -= 1.0
-
-        # استرجاع أفضل 3 توصيات
-        # Retrieve top 3 recommendations
-        top_indices = s_vector.argsort()[-3:][::-1]
-        
-        recommendations = []
-        for idx in top_indices:
-            if idx in self.glass_types:
-                recommendations.append(self.glass_types[idx])
-        
-        return recommendations
\ No newline at end of file
+        key = (face_data.get('shape', self.default_shape),
+               self.angle_bucket(face_data.get('angle', self.default_angle)))
+        recs = self._memo.get(key)
+        if recs is None:
+            if len(self._memo) >= MEMO_SIZE: self._memo.clear()
+            row = self.shape_row(key[0])
+            recs = self._memo[key] = self._table[(row << len(self._ranges)) | key[1]]
+        return list(recs)
@@ -10,123 +10,41 @@ Smart Glasses Project - Face Shape Analysis and Glasses Recommendation System.
 - arabic-reshaper
 - python-bidi
 """
+from Startup import STARTUP, BackgroundLoader
 import cv2
-from cvzone.FaceMeshModule import FaceMeshDetector
 import numpy as np
-from PIL import ImageFont, ImageDraw, Image
-import tkinter as tk
-import math
-from collections import Counter
 import os
-
-# === مكتبات اللغة العربية (Arabic Support Libraries) ===
-import arabic_reshaper
-from bidi.algorithm import get_display
+import time
 
 # === استيراد كلاس الخبير (Import Expert System) ===
 from SmartExpert import SmartExpert
+from SidebarCompositor import SidebarCompositor
+from VisionPipeline import VisionPipeline
+from FaceInference import ScaledFaceMesh
+from TryOn import GlassesTryOn
+from ShapeVote import ShapeVoter
+from FaceTracker import FaceTracker
+from FrameProfiler import NULL_PROFILER, FrameProfiler
+from AssetBundle import load_sprites
+from QualityGovernor import LandmarkExtrapolator, QualityGovernor
+from FaceGeometry import angle_between, as_landmarks, compute_features, face_features, feature_matrix, is_aligned
+from ShapeClassifier import FEATURE_NAMES, classify_features, features_to_matrix, load_classifier
+# أدوات الرسم والألوان - Drawing helpers & color theme
+from UIDrawing import COLOR_ACCENT_PRIMARY, COLOR_ACCENT_SECONDARY, COLOR_SUCCESS, COLOR_WARNING, put_arabic_text
+
+# المصنّف المدرّب (models/shape_classifier.npz) أو القواعد الأصلية إذا لم يوجد
+# Trained classifier (models/shape_classifier.npz), or the original rules if absent
+shape_classifier = load_classifier()
+
+def classify_face(features):
+    """
+    شكل وجه واحد: القواعد مباشرة بقيم عادية، أو مسار المصفوفة للنماذج المدرّبة.
+    One face's shape: the scalar rules directly, or the matrix path for a trained model.
+    """
+    return classify_features(shape_classifier, features)
 
-# ==========================================
-# إعدادات الألوان (Color Theme)
-# ==========================================
-COLOR_BG_DARK = (15, 15, 20)
-COLOR_BG_SIDEBAR = (25, 25, 32)
-COLOR_BG_CARD = (35, 35, 45)
-COLOR_BG_GLASS = (40, 40, 55)
-COLOR_ACCENT_PRIMARY = (0, 180, 255)
-COLOR_ACCENT_SECONDARY = (255, 180, 50)
-COLOR_TEXT_PRIMARY = (245, 245, 245)
-COLOR_TEXT_SECONDARY = (180, 180, 200)
-COLOR_TEXT_MUTED = (120, 120, 140)
-COLOR_SUCCESS = (50, 220, 100)
-COLOR_WARNING = (255, 100, 100)
-COLOR_BORDER = (60, 60, 80)
 
-# ==========================================
-# دوال مساعدة (رسم وكتابة)
-# ==========================================
-def overlay_image_alpha(img, img_overlay, x, y, scale=1.0):
-    if img_overlay is None: return img
-    
-    if scale != 1.0:
-        h, w = img_overlay.shape[:2]
-        new_w = int(w * scale)
-        new_h = int(h * scale)
-        img_overlay = cv2.resize(img_overlay, (new_w, new_h), interpolation=cv2.INTER_AREA)
-    
-    y1, y2 = max(0, y), min(img.shape[0], y + img_overlay.shape[0])
-    x1, x2 = max(0, x), min(img.shape[1], x + img_overlay.shape[1])
-    y1o, y2o = max(0, -y), min(img_overlay.shape[0], img.shape[0] - y)
-    x1o, x2o = max(0, -x), min(img_overlay.shape[1], img.shape[1] - x)
-
-    if y1 >= y2 or x1 >= x2 or y1o >= y2o or x1o >= x2o: return img
-
-    if img_overlay.shape[2] == 4:
-        alpha_mask = img_overlay[y1o:y2o, x1o:x2o, 3] / 255.0
-        alpha_inv = 1.0 - alpha_mask
-        for c in range(3):
-            img[y1:y2, x1:x2, c] = (alpha_mask * img_overlay[y1o:y2o, x1o:x2o, c] + 
-                                   alpha_inv * img[y1:y2, x1:x2, c])
-    else:
-        img[y1:y2, x1:x2] = img_overlay[y1o:y2o, x1o:x2o, :3]
-    return img
-
-def put_arabic_text(img, text, position, font_size=30, color=(255, 255, 255), align="right"):
-    reshaped_text = arabic_reshaper.reshape(text)
-    bidi_text = get_display(reshaped_text)
-    img_pil = Image.fromarray(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
-    draw = ImageDraw.Draw(img_pil)
-    
-    try:
-        font = ImageFont.truetype("arial.ttf", font_size)
-    except:
-        font = ImageFont.load_default()
-    
-    text_bbox = draw.textbbox((0, 0), bidi_text, font=font)
-    text_width = text_bbox[2] - text_bbox[0]
-    
-    x, y = position
-    if align == "center": x -= text_width // 2
-    elif align == "right": x -= text_width
-    
-    draw.text((x+1, y+1), bidi_text, font=font, fill=(0,0,0))
-    draw.text((x, y), bidi_text, font=font, fill=color)
-    return cv2.cvtColor(np.array(img_pil), cv2.COLOR_RGB2BGR)
-
-def draw_rounded_rect(img, pt1, pt2, color, radius=10, thickness=1, fill=False):
-    x1, y1 = pt1
-    x2, y2 = pt2
-    if fill:
-        overlay = img.copy()
-        cv2.rectangle(overlay, (x1+radius, y1), (x2-radius, y2), color, -1)
-        cv2.rectangle(overlay, (x1, y1+radius), (x2, y2-radius), color, -1)
-        cv2.circle(overlay, (x1+radius, y1+radius), radius, color, -1)
-        cv2.circle(overlay, (x2-radius, y1+radius), radius, color, -1)
-        cv2.circle(overlay, (x1+radius, y2-radius), radius, color, -1)
-        cv2.circle(overlay, (x2-radius, y2-radius), radius, color, -1)
-        cv2.addWeighted(overlay, 0.7, img, 0.3, 0, img)
-    else:
-        cv2.line(img, (x1+radius, y1), (x2-radius, y1), color, thickness)
-        cv2.line(img, (x1+radius, y2), (x2-radius, y2), color, thickness)
-        cv2.line(img, (x1, y1+radius), (x1, y2-radius), color, thickness)
-        cv2.line(img, (x2, y1+radius), (x2, y2-radius), color, thickness)
-        cv2.ellipse(img, (x1+radius, y1+radius), (radius, radius), 180, 0, 90, color, thickness)
-        cv2.ellipse(img, (x2-radius, y1+radius), (radius, radius), 270, 0, 90, color, thickness)
-        cv2.ellipse(img, (x1+radius, y2-radius), (radius, radius), 90, 0, 90, color, thickness)
-        cv2.ellipse(img, (x2-radius, y2-radius), (radius, radius), 0, 0, 90, color, thickness)
-
-def draw_gradient_background(img, rect, color1, color2, direction='horizontal'):
-    x1, y1, x2, y2 = rect
-    if direction == 'horizontal':
-        for i in range(x1, x2):
-            ratio = (i - x1) / (x2 - x1)
-            color = tuple(int(color1[j] * (1 - ratio) + color2[j] * ratio) for j in range(3))
-            cv2.line(img, (i, y1), (i, y2), color, 1)
-    else:
-        for i in range(y1, y2):
-            ratio = (i - y1) / (y2 - y1)
-            color = tuple(int(color1[j] * (1 - ratio) + color2[j] * ratio) for j in range(3))
-            cv2.line(img, (x1, i), (x2, i), color, 1)
+STARTUP.mark("imports")
 
 # ==========================================
 # المنطق الهندسي وتحديد شكل الوجه
@@ -134,260 +52,556 @@ def draw_gradient_background(img, rect, color1, color2, direction='horizontal'):
 # ==========================================
 def calculate_angle(p1, p2, p3):
     """حساب الزاوية بين ثلاث نقاط."""
-    x1, y1 = p1; x2, y2 = p2; x3, y3 = p3
-    angle = math.degrees(math.atan2(y3 - y2, x3 - x2) - math.atan2(y1 - y2, x1 - x2))
-    if angle < 0: angle += 360
-    if angle > 180: angle = 360 - angle
-    return angle
+    return float(angle_between(p1, p2, p3))
 
-def is_head_aligned(detector, face):
+def is_head_aligned(detector, face, features=None):
     """
     التحقق من أن الرأس ينظر للأمام مباشرة.
     Check if head is aligned (looking forward).
+
+    detector محفوظ للتوافق فقط؛ الحساب يتم في FaceGeometry.
+    detector is kept for compatibility; the maths lives in FaceGeometry.
     """
-    pt_nose = face[4]; pt_ear_L = face[234]; pt_ear_R = face[454]
-    dist_L, _ = detector.findDistance(pt_nose, pt_ear_L)
-    dist_R, _ = detector.findDistance(pt_nose, pt_ear_R)
-    yaw_ratio = dist_L / (dist_R + 1e-5)
-    return 0.60 < yaw_ratio < 1.60
+    if features is None: features = face_features(face)
+    return bool(is_aligned(features))
 
-def get_geometric_shape(detector, face):
+def get_geometric_shape(detector, face, features=None):
     """
     تحليل المقاييس الهندسية للوجه وتحديد الشكل بناءً على القواعد.
     Analyze face geometric metrics and determine shape based on rules.
     """
-    pt_cheek_L, pt_cheek_R = face[234], face[454]
-    pt_jaw_L, pt_jaw_R = face[132], face[361]
-    pt_head_top, pt_chin_bottom = face[10], face[152]
-    pt_fore_L, pt_fore_R = face[103], face[332]
-    chin_angle = calculate_angle(face[132], face[152], face[361])
-    h_face, _ = detector.findDistance(pt_head_top, pt_chin_bottom)
-    w_cheeks, _ = detector.findDistance(pt_cheek_L, pt_cheek_R)
-    w_jaw, _ = detector.findDistance(pt_jaw_L, pt_jaw_R)
-    w_forehead, _ = detector.findDistance(pt_fore_L, pt_fore_R)
-    
-    face_ratio = (h_face / w_cheeks) * 100
-    jaw_ratio = (w_jaw / w_cheeks) * 100
-    forehead_ratio = (w_forehead / w_cheeks) * 100
-    
-    shape_eng = "Oval"
+    if features is None: features = face_features(face)
     # الخوارزمية لتصنيف شكل الوجه
     # Face Shape Classification Algorithm
-    if face_ratio >= 128: shape_eng = "Oblong"
-    elif face_ratio <= 123:
-        if chin_angle >= 89.2: shape_eng = "Square"
-        else: shape_eng = "Round"
-    else:
-        if jaw_ratio > 94: shape_eng = "Oval"
-        elif chin_angle < 84:
-            if forehead_ratio > 70: shape_eng = "Heart"
-            else: shape_eng = "Diamond"
-        else: shape_eng = "Oval"
-    data = {'shape': shape_eng, 'jaw_width': w_jaw, 'cheek_width': w_cheeks, 'angle': chin_angle}
+    shape_eng = classify_face(features)
+    face_ratio, chin_angle, jaw_ratio, forehead_ratio = (
+        float(features[k]) for k in ('face_ratio', 'chin_angle', 'jaw_ratio', 'forehead_ratio'))
+    data = {'shape': shape_eng, 'jaw_width': float(features['w_jaw']),
+            'cheek_width': float(features['w_cheeks']), 'angle': chin_angle}
     stats = (face_ratio, chin_angle, jaw_ratio, forehead_ratio)
     return data, shape_eng, stats
 
 # ==========================================
-# النظام الرئيسي 
-# Main System Logic
+# تحليل الإطار والعرض
+# Frame Analysis & Rendering
 # ==========================================
-def start_system():
-    window_name = "Smart Vision Pro"
-    # إعداد النافذة بملء الشاشة
-    cv2.namedWindow(window_name, cv2.WND_PROP_FULLSCREEN)
-    cv2.setWindowProperty(window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+SHAPE_AR_MAP = {
+    "Oval": "بيضاوي", "Round": "دائري", "Square": "مربع",
+    "Oblong": "مستطيل/طويل", "Heart": "قلب", "Diamond": "ماسي"
+}
+TARGET_H = 720
+SIDEBAR_RATIO = 0.6
+
+def prepare_frame(img, target_h=TARGET_H):
+    """
+    عكس الصورة وفرض دقة عالية للنافذة.
+    Mirror the camera frame and force the UI resolution.
+    """
+    img = cv2.flip(img, 1)
+    aspect_ratio = img.shape[1] / img.shape[0]
+    target_w = int(target_h * aspect_ratio)
+    return cv2.resize(img, (target_w, target_h))
 
-    cap = cv2.VideoCapture(0) 
-    detector = FaceMeshDetector(maxFaces=1)
-    expert_engine = SmartExpert()
-    
-    shape_ar_map = {
-        "Oval": "بيضاوي", "Round": "دائري", "Square": "مربع",
-        "Oblong": "مستطيل/طويل", "Heart": "قلب", "Diamond": "ماسي"
+def load_glasses_images(expert_engine, assets_dir="assets"):
+    """
+    تحميل صور النظارات من حزمة الأصول المربوطة بالذاكرة (مفكوكة ومضروبة مسبقاً في الشفافية).
+    Load the glasses sprites from the memory-mapped asset bundle (decoded and
+    premultiplied ahead of time; rebuilt from the PNGs when they change).
+    """
+    if not os.path.exists(assets_dir): os.makedirs(assets_dir, exist_ok=True)
+    names = [val['img'] for val in expert_engine.glass_types.values()]
+    glasses_images = load_sprites(assets_dir, names)
+    for img_name in names:
+        if img_name not in glasses_images:
+            print(f"Warning: Image not found {os.path.join(assets_dir, f'{img_name}.png')}")
+    return glasses_images
+
+def create_detector(max_faces=1, warm=False):
+    """
+    إنشاء FaceMeshDetector؛ cvzone و MediaPipe يُستوردان هنا فقط لأنهما الأبطأ في الاستيراد.
+    Build the FaceMeshDetector. cvzone and MediaPipe are imported here only,
+    as they dominate import time. warm=True also runs one inference on a
+    blank frame so the first real frame does not pay for graph initialisation.
+    """
+    from cvzone.FaceMeshModule import FaceMeshDetector
+    detector = FaceMeshDetector(maxFaces=max_faces)
+    if warm: detector.findFaceMesh(np.zeros((TARGET_H, TARGET_H * 16 // 9, 3), dtype=np.uint8), draw=False)
+    return detector
+
+def empty_result():
+    """نتيجة افتراضية قبل توفر أي تحليل - Default result before any analysis is available."""
+    return {
+        'display_shape': "...", 'status_color': COLOR_ACCENT_SECONDARY, 'warning_msg': "",
+        'stats': (0, 0, 0, 0), 'rec_name': "", 'rec_desc': "", 'rec_img_key': None, 'face_box': None,
+        'landmarks': None, 'faces': (), 'raw_shape': None, 'shape': None, 'recommendations': (),
+        'freeze_stats': False,
     }
 
-    # تحميل الصور من مجلد الأصول
-    # Load images from assets folder
-    glasses_images = {}
-    assets_dir = "assets"
-    if not os.path.exists(assets_dir): os.makedirs(assets_dir, exist_ok=True)
-    
-    for key, val in expert_engine.glass_types.items():
-        img_name = val['img']
-        img_path = os.path.join(assets_dir, f"{img_name}.png")
-        if os.path.exists(img_path):
-            img = cv2.imread(img_path, cv2.IMREAD_UNCHANGED)
-            glasses_images[img_name] = img
-        else:
-            print(f"Warning: Image not found {img_path}")
+def face_box(landmarks):
+    """
+    مستطيل الوجه المعروض (الخدان، الجبهة، الذقن) لوجه (468×2) أو دفعة (N×468×2).
+    Displayed face box (cheeks, forehead, chin) for one face or an (N, 468, 2) batch.
+    """
+    lm = np.asarray(landmarks)
+    return np.stack([lm[..., 234, 0], lm[..., 10, 1] - 30, lm[..., 454, 0], lm[..., 152, 1] + 30], axis=-1)
 
-    shapes_buffer = [] 
+class FaceAnalyzer:
+    """
+    تشغيل FaceMesh والمنطق الهندسي والخبير على إطار واحد مع التنعيم الزمني.
+    Runs FaceMesh, geometry and the expert on one frame, with temporal smoothing.
+    """
     BUFFER_SIZE = 15
+    MAX_MISSES = 5
+
+    def __init__(self, detector, expert_engine, buffer_size=BUFFER_SIZE, inference_h=None, use_roi=False,
+                 max_misses=MAX_MISSES, ratio_alpha=None, profiler=NULL_PROFILER):
+        self.detector = detector
+        self.expert_engine = expert_engine
+        self.buffer_size = buffer_size
+        self.max_misses = max_misses
+        self.ratio_alpha = ratio_alpha
+        self.profiler = profiler
+        self.voter = self._new_voter()
+        # الاستدلال بدقة مخفضة (أو على منطقة الوجه) مع إعادة النقاط لإحداثيات العرض
+        # Reduced-resolution (or face-ROI) inference, landmarks rescaled to display coordinates
+        self.face_mesh = ScaledFaceMesh(detector, inference_h, use_roi)
+
+    def _new_voter(self):
+        """
+        تصويت متدفق؛ ratio_alpha يفعّل تصنيف النسب المنعّمة أسياً بدل الأغلبية.
+        Streaming vote; ratio_alpha classifies exponentially smoothed ratios instead of the majority.
+        """
+        return ShapeVoter(self.buffer_size, self.max_misses, self.ratio_alpha,
+                          classify=lambda r: classify_face(dict(zip(FEATURE_NAMES, r))))
+
+    def _update_vote(self, voter, result, aligned, raw_shape=None, face_data=None, ratios=None):
+        """تحديث تصويت وجه واحد وتعبئة حقول النتيجة - Update one face's vote and fill its result fields."""
+        if aligned:
+            voter.push(raw_shape, ratios if voter.ratio_alpha is not None else None)
+            result['raw_shape'] = raw_shape
+
+            if voter.full:
+                most_common = voter.shape
+                face_data['shape'] = most_common
+                recs = self.expert_engine.recommend(face_data)
+                result['shape'] = most_common
+                result['recommendations'] = tuple(r['img'] for r in recs)
+                result['display_shape'] = SHAPE_AR_MAP.get(most_common, most_common)
+                if recs:
+                    result['rec_name'] = recs[0]['name']
+                    result['rec_desc'] = recs[0].get('desc', 'تتناسب مع شكل وجهك')
+                    result['rec_img_key'] = recs[0]['img']
+                result['status_color'] = COLOR_SUCCESS
+            else:
+                progress = voter.progress * 100
+                result['display_shape'] = f"تحليل {progress:.0f}%"
+                result['status_color'] = COLOR_ACCENT_PRIMARY
+        else:
+            result['warning_msg'] = "انظر للأمام"
+            result['status_color'] = COLOR_WARNING
+            # الإطارات القليلة غير المستقيمة لا تمسح التقدم - Brief misalignments keep the progress
+            voter.miss()
+
+    def analyze(self, img):
+        """تحليل إطار وإرجاع قاموس النتيجة - Analyze one frame and return a result dict."""
+        prof = self.profiler
+        result = empty_result()
+        t = prof.start()
+        faces = self.face_mesh.find(img)
+        t = prof.lap('facemesh', t)
+        if not faces: return result
+
+        face = faces[0]
+        # وجه واحد: حساب عددي على النقاط التسع فقط، بدون تحويل الـ 468 نقطة
+        # One face: plain float maths on the nine points used, no 468-point conversion
+        features = face_features(face)
+        if is_head_aligned(self.detector, face, features):
+            face_data, raw_shape, result['stats'] = get_geometric_shape(self.detector, face, features)
+            t = prof.lap('geometry', t)
+            # النسب للمتوسط الأسي فقط عند تفعيله - Ratios only when the EW mode needs them
+            ratios = [features[k] for k in FEATURE_NAMES] if self.voter.ratio_alpha is not None else None
+            self._update_vote(self.voter, result, True, raw_shape, face_data, ratios)
+        else:
+            t = prof.lap('geometry', t)
+            self._update_vote(self.voter, result, False)
+        prof.lap('expert', t)
 
-    while True:
-        success, img = cap.read()
-        if not success: break
-        
-        img = cv2.flip(img, 1)
-
-        # === [الحل] فرض دقة عالية للنافذة ===
-        # Force high resolution for the window UI
-        target_h = 720
-        aspect_ratio = img.shape[1] / img.shape[0]
-        target_w = int(target_h * aspect_ratio)
-        img = cv2.resize(img, (target_w, target_h))
-        # ====================================
-        
-        h, w, _ = img.shape
-        sidebar_w = int(target_h * 0.6) # عرض الشريط نسبي للطول
-        
-        # إنشاء الصورة النهائية (Canvas)
-        final_img = np.zeros((h, w + sidebar_w, 3), dtype='uint8')
-        final_img[0:h, 0:w] = img
-        
-        draw_gradient_background(final_img, (w, 0, w+sidebar_w, h), COLOR_BG_SIDEBAR, COLOR_BG_DARK, 'vertical')
-
-        img_mesh, faces = detector.findFaceMesh(img, draw=False)
-        final_img[0:h, 0:w] = img_mesh
-
-        # متغيرات الحالة
-        display_shape = "..."
-        display_rec_name = ""
-        display_rec_desc = ""
-        display_rec_img_key = None
-        status_color = COLOR_ACCENT_SECONDARY
-        warning_msg = ""
-        stats = (0, 0, 0, 0)
-        sidebar_center_x = w + (sidebar_w // 2)
-
-        # التحليل
-        if faces:
-            face = faces[0]
-            if is_head_aligned(detector, face):
-                face_data, raw_shape, stats = get_geometric_shape(detector, face)
-                shapes_buffer.append(raw_shape)
-                if len(shapes_buffer) > BUFFER_SIZE: shapes_buffer.pop(0)
-                
-                if len(shapes_buffer) == BUFFER_SIZE:
-                    most_common = Counter(shapes_buffer).most_common(1)[0][0]
-                    face_data['shape'] = most_common
-                    recs = expert_engine.recommend(face_data)
-                    display_shape = shape_ar_map.get(most_common, most_common)
-                    if recs:
-                        display_rec_name = recs[0]['name']
-                        display_rec_desc = recs[0].get('desc', 'تتناسب مع شكل وجهك')
-                        display_rec_img_key = recs[0]['img']
-                    status_color = COLOR_SUCCESS
-                else:
-                    progress = len(shapes_buffer) / BUFFER_SIZE * 100
-                    display_shape = f"تحليل {progress:.0f}%"
-                    status_color = COLOR_ACCENT_PRIMARY
+        result['face_box'] = (face[234][0], face[10][1] - 30, face[454][0], face[152][1] + 30)
+        # قائمة cvzone كما هي؛ المستهلكون (التجربة الافتراضية، المنظّم) ينتقون ما يحتاجونه
+        # The cvzone list as-is; consumers (try-on, governor) pick what they need
+        result['landmarks'] = face
+        return result
+
+class MultiFaceAnalyzer(FaceAnalyzer):
+    """
+    عدة عملاء أمام الكاميرا: تتبع كل وجه برقم ثابت مع تصويت وتوصية مستقلة لكل مسار.
+    Several customers at once: faces are tracked with stable IDs, each track
+    keeping its own ShapeVoter and recommendation. Geometry, alignment and
+    classification run as one batched (N, 468, 2) computation per frame.
+
+    النتيجة هي نتيجة الوجه الأكبر (للشريط الجانبي) مع قائمة 'faces' لكل الوجوه.
+    The result is the largest (closest) face's result, for the sidebar, plus a
+    'faces' list with one result per face (including its 'track_id').
+    """
+    TRACK_MAX_MISSES = 15
+
+    def __init__(self, detector, expert_engine, buffer_size=FaceAnalyzer.BUFFER_SIZE, inference_h=None,
+                 max_misses=FaceAnalyzer.MAX_MISSES, ratio_alpha=None, track_max_misses=TRACK_MAX_MISSES,
+                 profiler=NULL_PROFILER):
+        # قص منطقة الوجه يخص وجهاً واحداً، لذا لا يُستخدم هنا - ROI cropping follows one face, so it is off
+        super().__init__(detector, expert_engine, buffer_size, inference_h, False, max_misses, ratio_alpha,
+                         profiler)
+        self.tracker = FaceTracker(max_misses=track_max_misses)
+
+    def analyze(self, img):
+        """تحليل كل الوجوه في الإطار - Analyze every face in the frame."""
+        prof = self.profiler
+        t = prof.start()
+        faces = self.face_mesh.find(img)
+        t = prof.lap('facemesh', t)
+        if not faces:
+            self.tracker.update(())
+            return empty_result()
+
+        # كل الوجوه في تمريرة واحدة - Every face in one batched pass
+        landmarks = as_landmarks(faces)
+        features = compute_features(landmarks)
+        aligned = is_aligned(features)
+        ratios = features_to_matrix(features)
+        raw_shapes = shape_classifier.predict(ratios)
+        stats = feature_matrix(features)
+        boxes = face_box(landmarks)
+        # المسارات تحتاج مستطيلات مرتبة (الصورة معكوسة) - Tracking needs ordered boxes (the frame is mirrored)
+        track_boxes = np.concatenate([np.minimum(boxes[:, :2], boxes[:, 2:]),
+                                      np.maximum(boxes[:, :2], boxes[:, 2:])], axis=1)
+        tracks = self.tracker.update(track_boxes)
+        t = prof.lap('geometry', t)
+
+        per_face = []
+        for i, track in enumerate(tracks):
+            voter = track.state.get('voter')
+            if voter is None: voter = track.state['voter'] = self._new_voter()
+            face_result = empty_result()
+            if aligned[i]:
+                face_result['stats'] = tuple(float(v) for v in stats[i])
+                face_data = {'shape': str(raw_shapes[i]), 'jaw_width': float(features['w_jaw'][i]),
+                             'cheek_width': float(features['w_cheeks'][i]), 'angle': float(stats[i, 1])}
+                self._update_vote(voter, face_result, True, str(raw_shapes[i]), face_data, ratios[i])
             else:
-                warning_msg = "انظر للأمام"
-                status_color = COLOR_WARNING
-                shapes_buffer = []
-
-            # رسم الإطار
-            x1, y1 = face[234][0], face[10][1] - 30
-            x2, y2 = face[454][0], face[152][1] + 30
-            overlay = img_mesh.copy()
-            cv2.rectangle(overlay, (x1, y1), (x2, y2), status_color, 2)
-            cv2.addWeighted(overlay, 0.3, final_img[0:h, 0:w], 0.7, 0, final_img[0:h, 0:w])
-
-        # === بناء الواجهة ديناميكياً (بدون تداخل) ===
-        
-        card_x = w + 20
-        card_w = sidebar_w - 40
-        
-        # 1. الهيدر
-        header_h = 80
-        draw_gradient_background(final_img, (w, 0, w+sidebar_w, header_h), (30, 30, 40), COLOR_BG_SIDEBAR, 'horizontal')
-        cv2.line(final_img, (w, header_h), (w+sidebar_w, header_h), COLOR_ACCENT_PRIMARY, 2)
-        final_img = put_arabic_text(final_img, "نظام التحليل البيومتري", (sidebar_center_x, 25), 22, COLOR_TEXT_PRIMARY, align="center")
-        final_img = put_arabic_text(final_img, "Smart Vision Pro", (sidebar_center_x, 55), 12, COLOR_TEXT_MUTED, align="center")
-
-        # 2. بطاقة الحالة (ثابتة في الأعلى)
-        y_cursor = header_h + 20
-        status_h = 100
-        draw_rounded_rect(final_img, (card_x, y_cursor), (card_x + card_w, y_cursor + status_h), COLOR_BG_CARD, radius=12, fill=True)
-        cv2.circle(final_img, (card_x + 30, y_cursor + 30), 8, status_color, -1)
-        final_img = put_arabic_text(final_img, "الشكل:", (card_x + card_w - 20, y_cursor + 20), 14, COLOR_TEXT_SECONDARY, align="right")
-        final_img = put_arabic_text(final_img, display_shape, (sidebar_center_x, y_cursor + 50), 24, status_color, align="center")
-        
-        y_cursor += status_h + 20
-
-        # 3. بطاقة الإحصائيات (نثبتها في الأسفل ونحسب مكانها)
-        footer_h = 40
-        stats_h = 130
-        y_stats = h - footer_h - stats_h - 20 # مكانها قبل الفوتر
-        
-        # رسم بطاقة الإحصائيات
-        draw_rounded_rect(final_img, (card_x, y_stats), (card_x + card_w, y_stats + stats_h), COLOR_BG_CARD, radius=12, fill=True)
-        final_img = put_arabic_text(final_img, "القياسات", (card_x + card_w - 15, y_stats + 15), 14, COLOR_TEXT_SECONDARY, align="right")
-        
-        labels = ["الطول", "الزاوية", "الفك", "الجبهة"]
-        vals = stats
-        grid_start_y = y_stats + 45
-        for i, (lbl, v) in enumerate(zip(labels, vals)):
-            row, col = i // 2, i % 2
-            cx = card_x + 20 + col * (card_w // 2)
-            cy = grid_start_y + row * 35
-            final_img = put_arabic_text(final_img, f"{lbl}: {v:.0f}", (cx, cy), 13, COLOR_ACCENT_PRIMARY, align="left")
-
-        # 4. بطاقة التوصية (تأخذ كل المساحة المتبقية في الوسط) !!
-        # هذا هو الحل السحري لمنع التداخل
-        rec_card_h = (y_stats - 20) - y_cursor 
-        
-        if rec_card_h > 150: # فقط إذا كانت هناك مساحة كافية
-            draw_rounded_rect(final_img, (card_x, y_cursor), (card_x + card_w, y_cursor + rec_card_h), COLOR_BG_GLASS, radius=12, fill=True)
-            final_img = put_arabic_text(final_img, "التوصية", (card_x + card_w - 20, y_cursor + 20), 16, COLOR_ACCENT_SECONDARY, align="right")
-            
-            if display_rec_name:
-                # اسم النظارة
-                final_img = put_arabic_text(final_img, display_rec_name, (sidebar_center_x, y_cursor + 50), 20, COLOR_TEXT_PRIMARY, align="center")
-                
-                # حساب مساحة الصورة
-                img_area_y = y_cursor + 80
-                img_area_h = rec_card_h - 110 # ترك مسافة للنصوص فوق وتحت
-                
-                if img_area_h > 50 and display_rec_img_key in glasses_images:
-                    g_img = glasses_images[display_rec_img_key]
-                    # تحجيم الصورة لتناسب المساحة المتاحة
-                    scale = min((card_w - 60) / g_img.shape[1], img_area_h / g_img.shape[0])
-                    new_w, new_h = int(g_img.shape[1] * scale), int(g_img.shape[0] * scale)
-                    g_resized = cv2.resize(g_img, (new_w, new_h))
-                    
-                    g_y_pos = img_area_y + (img_area_h - new_h) // 2
-                    g_x_pos = sidebar_center_x - (new_w // 2)
-                    
-                    # خلفية خفيفة للصورة
-                    cv2.rectangle(final_img, (g_x_pos-5, g_y_pos-5), (g_x_pos+new_w+5, g_y_pos+new_h+5), (255,255,255), -1)
-                    final_img = overlay_image_alpha(final_img, g_resized, g_x_pos, g_y_pos)
-
-                final_img = put_arabic_text(final_img, "يناسب وجهك", (sidebar_center_x, y_cursor + rec_card_h - 30), 12, COLOR_SUCCESS, align="center")
+                self._update_vote(voter, face_result, False)
+            face_result['track_id'] = track.track_id
+            face_result['face_box'] = tuple(int(v) for v in boxes[i])
+            face_result['landmarks'] = landmarks[i]
+            per_face.append(face_result)
+
+        areas = (track_boxes[:, 2] - track_boxes[:, 0]) * (track_boxes[:, 3] - track_boxes[:, 1])
+        result = dict(per_face[int(np.argmax(areas))])
+        result['faces'] = per_face
+        prof.lap('expert', t)
+        return result
+
+class GovernedAnalyzer:
+    """
+    التحليل تحت إشراف منظّم الجودة: FaceMesh يعمل فقط في الإطارات التي يختارها
+    المنظّم وبدقته، وفي بقية الإطارات تُعاد آخر نتيجة مع نقاط ومستطيلات مستقرأة.
+    Analysis under the quality governor: FaceMesh runs only on the frames it
+    picks, at its inference height; the other frames reuse the last result with
+    extrapolated landmarks and face boxes.
+    """
+    def __init__(self, analyzer, governor):
+        self.analyzer = analyzer
+        self.governor = governor
+        self.extrapolator = LandmarkExtrapolator()
+        # الدقة التي اختارها المستخدم هي الحد الأعلى - The configured inference height is the ceiling
+        self.base_h = analyzer.face_mesh.inference_h
+        self._last = None
+
+    def _inference_h(self, level_h):
+        if self.base_h is None: return level_h
+        return self.base_h if level_h is None else min(level_h, self.base_h)
+
+    def _moved(self, face, key, now):
+        """نسخة من نتيجة وجه بنقاطه المتوقعة - A face result copy at its predicted position."""
+        moved = dict(face)
+        landmarks = self.extrapolator.predict(key, now)
+        if landmarks is not None:
+            moved['landmarks'] = landmarks
+            moved['face_box'] = tuple(int(v) for v in face_box(landmarks))
+        return moved
+
+    def analyze(self, img):
+        settings = self.governor.settings
+        self.analyzer.face_mesh.inference_h = self._inference_h(settings.inference_h)
+        now = time.perf_counter()
+        if self._last is None or self.governor.should_infer():
+            result = self._last = self.analyzer.analyze(img)
+            faces = result['faces'] or ((result,) if result['landmarks'] is not None else ())
+            keys = [face.get('track_id', 0) for face in faces]
+            for key, face in zip(keys, faces): self.extrapolator.update(key, face['landmarks'], now)
+            self.extrapolator.retain(keys)
+        else:
+            last = self._last
+            if last['landmarks'] is None:
+                result = dict(last)
             else:
-                 final_img = put_arabic_text(final_img, "جاري التحليل...", (sidebar_center_x, y_cursor + rec_card_h // 2), 16, COLOR_TEXT_MUTED, align="center")
+                result = self._moved(last, last.get('track_id', 0), now)
+                if last['faces']: result['faces'] = [self._moved(f, f['track_id'], now) for f in last['faces']]
+        # القياسات تتوقف عن التحديث بعد ثبات الشكل - Measurements stop updating once the shape is locked
+        result['freeze_stats'] = settings.freeze_sidebar and result['shape'] is not None
+        return result
+
+def render_frame(img, result, sidebar, tryon=None, profiler=NULL_PROFILER):
+    """
+    بناء الصورة النهائية (الكاميرا + الشريط الجانبي) من نتيجة التحليل.
+    Build the final canvas (camera + sidebar) from an analysis result.
+    tryon: GlassesTryOn لرسم النظارة المقترحة على الوجه (اختياري).
+    profiler: FrameProfiler لقياس مراحل الرسم ولوحة التشخيص (اختياري).
+    """
+    t = profiler.start()
+    h, w, _ = img.shape
+    sidebar_w = int(h * SIDEBAR_RATIO) # عرض الشريط نسبي للطول
+
+    # إنشاء الصورة النهائية (Canvas)
+    final_img = np.empty((h, w + sidebar_w, 3), dtype='uint8')
+    final_img[0:h, 0:w] = img
+    status_color = result['status_color']
+
+    # رسم الإطار (لكل وجه في وضع الوجوه المتعددة)
+    # Face boxes (one per tracked face in multi-face mode)
+    faces = result['faces'] or ((result,) if result['face_box'] is not None else ())
+    if faces:
+        overlay = img.copy()
+        for face in faces:
+            x1, y1, x2, y2 = face['face_box']
+            cv2.rectangle(overlay, (x1, y1), (x2, y2), face['status_color'], 2)
+        cv2.addWeighted(overlay, 0.3, final_img[0:h, 0:w], 0.7, 0, final_img[0:h, 0:w])
+    if len(result['faces']) > 1:
+        for face in result['faces']:
+            x1, y1, x2, _ = face['face_box']
+            put_arabic_text(final_img, f"#{face['track_id']} {face['display_shape']}", (min(x1, x2), y1 - 8),
+                            14, face['status_color'], align="left")
+    t = profiler.lap('face_boxes', t)
+
+    # تجربة النظارة على الوجه (بعد الإطار حتى لا يخفّفها الدمج)
+    # Virtual try-on, drawn after the face box so its blend does not fade the glasses
+    if tryon is not None:
+        tryon.draw(final_img[0:h, 0:w], result['landmarks'], result['rec_img_key'])
+        t = profiler.lap('tryon', t)
+
+    # === بناء الواجهة: خلفية مخزنة + تحديث المناطق المتغيرة فقط ===
+    # Cached sidebar chrome + dirty-region redraw
+    sidebar.compose(final_img, w, result['display_shape'], status_color, result['stats'],
+                    result['rec_name'], result['rec_img_key'], freeze_stats=result['freeze_stats'])
+    t = profiler.lap('sidebar', t)
+
+    # التحذيرات
+    warning_msg = result['warning_msg']
+    if warning_msg:
+        cv2.rectangle(final_img, (w//2-100, h//2-30), (w//2+100, h//2+30), COLOR_WARNING, -1)
+        final_img = put_arabic_text(final_img, warning_msg, (w//2, h//2+10), 20, (255,255,255), align="center")
+        t = profiler.lap('warning', t)
+
+    if profiler.show_panel:
+        sidebar.draw_debug(final_img, w, profiler.panel_lines())
+        profiler.lap('debug_panel', t)
+    return final_img
 
-        # الفوتر والتحذيرات
-        cv2.rectangle(final_img, (w, h - footer_h), (w + sidebar_w, h), (20, 20, 30), -1)
-        final_img = put_arabic_text(final_img, "ESC: خروج", (sidebar_center_x, h - 15), 11, COLOR_TEXT_MUTED, align="center")
+# ==========================================
+# النظام الرئيسي 
+# Main System Logic
+# ==========================================
+DEBUG_KEY = ord('d')
 
-        if warning_msg:
-             cv2.rectangle(final_img, (w//2-100, h//2-30), (w//2+100, h//2+30), COLOR_WARNING, -1)
-             final_img = put_arabic_text(final_img, warning_msg, (w//2, h//2+10), 20, (255,255,255), align="center")
+def handle_key(key, profiler):
+    """
+    مفاتيح التحكم؛ يرجع True للخروج. D تُظهر/تخفي لوحة التشخيص.
+    Keyboard controls; returns True to quit. D toggles the debug panel.
+    """
+    if key == DEBUG_KEY and profiler.enabled: profiler.show_panel = not profiler.show_panel
+    return key == 27
 
+def run_sequential(cap, analyzer, sidebar, window_name, tryon=None, profiler=NULL_PROFILER, governor=None):
+    """
+    الحلقة التسلسلية الأصلية - The original single-threaded loop.
+    governor: QualityGovernor يُعطى زمن معالجة كل إطار (بدون انتظار الكاميرا).
+    governor: a QualityGovernor fed each frame's processing time, excluding the camera wait.
+    """
+    while True:
+        t = profiler.start()
+        success, img = cap.read()
+        if not success: break
+        t = profiler.lap('capture', t)
+        t_work = time.perf_counter()
+        img = prepare_frame(img)
+        profiler.lap('prepare', t)
+        result = analyzer.analyze(img)
+        final_img = render_frame(img, result, sidebar, tryon, profiler)
+
+        t = profiler.start()
         cv2.imshow(window_name, final_img)
-        if cv2.waitKey(1) & 0xFF == 27: break
+        key = cv2.waitKey(1) & 0xFF
+        STARTUP.frame_shown()
+        profiler.lap('display', t)
+        profiler.tick()
+        if governor is not None: governor.frame_done((time.perf_counter() - t_work) * 1000.0)
+        if handle_key(key, profiler): break
+
+def run_pipelined(cap, analyzer, sidebar, window_name, tryon=None, profiler=NULL_PROFILER, governor=None):
+    """
+    الالتقاط والتحليل في خيوط منفصلة؛ العرض يستخدم أحدث إطار وأحدث نتيجة.
+    Capture and inference run on worker threads; rendering uses the newest frame and result.
+    governor يُعطى الأبطأ من العرض والتحليل - governor is fed the slower of render and inference.
+    """
+    pipeline = VisionPipeline(cap, analyzer.analyze, preprocess=prepare_frame, profiler=profiler).start()
+    idle = empty_result()
+    try:
+        while True:
+            img, t_capture = pipeline.next_frame()
+            if img is None:
+                if not pipeline.running: break
+                continue
+            t0 = time.perf_counter()
+            result, _ = pipeline.latest_result()
+            final_img = render_frame(img, result or idle, sidebar, tryon, profiler)
+            t = profiler.start()
+            cv2.imshow(window_name, final_img)
+            key = cv2.waitKey(1) & 0xFF
+            STARTUP.frame_shown()
+            profiler.lap('display', t)
+            profiler.tick()
+            t1 = time.perf_counter()
+            pipeline.timer.add('render', (t1 - t0) * 1000.0)
+            pipeline.timer.add('latency', (t1 - t_capture) * 1000.0)
+            if governor is not None: governor.frame_done(max((t1 - t0) * 1000.0, pipeline.last_inference_ms))
+            if handle_key(key, profiler): break
+    finally:
+        pipeline.stop()
+        print(pipeline.report())
+
+WARM_MAX_FACES = 1
+
+def warm_start(max_faces=WARM_MAX_FACES):
+    """
+    بناء الموارد الثقيلة في الخلفية (أثناء ظهور المُشغّل) - Build the heavy resources in the background.
+    """
+    def sidebar(res):
+        compositor = SidebarCompositor(res['glasses'])
+        # نفس حالة أول إطار (لا نتيجة بعد) - Same state as the first frame (no result yet)
+        idle = empty_result()
+        compositor.render(TARGET_H, int(TARGET_H * SIDEBAR_RATIO), idle['display_shape'], idle['status_color'],
+                          idle['stats'], idle['rec_name'], idle['rec_img_key'])
+        return compositor
+
+    return (BackgroundLoader()
+            .add('expert', lambda res: SmartExpert())
+            .add('glasses', lambda res: load_glasses_images(res['expert']))
+            .add('sidebar', sidebar)
+            .add('detector', lambda res: create_detector(max_faces, warm=True)))
+
+def start_system(pipeline=False, inference_h=None, face_roi=False, tryon=False, max_faces=1,
+                 profile=False, profile_dump=None, warm=None, target_fps=None):
+    """
+    تشغيل النظام. inference_h يحدد ارتفاع صورة FaceMesh (مثل 320 أو 480)،
+    و face_roi يقص منطقة الوجه من الإطار السابق قبل الاستدلال،
+    و tryon يرسم النظارة المقترحة على الوجه مباشرة،
+    و max_faces > 1 يفعّل تتبع عدة عملاء في نفس الوقت،
+    و profile يقيس زمن كل مرحلة مع لوحة تشخيص (مفتاح D) وحفظ دوري في profile_dump.
+    Run the system. inference_h sets the FaceMesh input height (e.g. 320 or 480);
+    face_roi crops around the previous frame's face before inference; tryon
+    draws the recommended glasses on the live face; max_faces > 1 tracks and
+    analyzes several customers at once; profile times every stage, shows the
+    debug panel (toggled with D) and periodically dumps to profile_dump (.csv/.json).
+    warm: BackgroundLoader من warm_start() لاستخدام الموارد المحمّلة مسبقاً.
+    warm: a BackgroundLoader from warm_start() whose resources are reused.
+    target_fps: تفعيل منظّم الجودة التكيفي بهذا الهدف - enables the adaptive quality governor.
+    """
+    window_name = "Smart Vision Pro"
+    # إعداد النافذة بملء الشاشة
+    cv2.namedWindow(window_name, cv2.WND_PROP_FULLSCREEN)
+    cv2.setWindowProperty(window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+
+    cap = cv2.VideoCapture(0) 
+    STARTUP.mark("camera")
+    profiler = FrameProfiler(dump_path=profile_dump, show_panel=True) if profile else NULL_PROFILER
+    if warm is not None:
+        # الموارد جاهزة غالباً (بُنيت أثناء ظهور المُشغّل) - Usually ready: built while the launcher was up
+        expert_engine = warm.get('expert')
+        glasses_images = warm.get('glasses')
+        sidebar = warm.get('sidebar')
+        sidebar.profiler = profiler
+        detector = warm.get('detector') if max_faces == WARM_MAX_FACES else create_detector(max_faces)
+    else:
+        detector = create_detector(max_faces)
+        expert_engine = SmartExpert()
+        # تحميل الصور من مجلد الأصول
+        # Load images from assets folder
+        glasses_images = load_glasses_images(expert_engine)
+        sidebar = SidebarCompositor(glasses_images, profiler)
+    STARTUP.mark("resources ready")
+    if max_faces > 1:
+        analyzer = MultiFaceAnalyzer(detector, expert_engine, inference_h=inference_h, profiler=profiler)
+    else:
+        analyzer = FaceAnalyzer(detector, expert_engine, inference_h=inference_h, use_roi=face_roi,
+                                profiler=profiler)
+    glasses_tryon = GlassesTryOn(glasses_images) if tryon else None
+    governor = QualityGovernor(target_fps) if target_fps else None
+    if governor is not None: analyzer = GovernedAnalyzer(analyzer, governor)
+
+    if pipeline: run_pipelined(cap, analyzer, sidebar, window_name, glasses_tryon, profiler, governor)
+    else: run_sequential(cap, analyzer, sidebar, window_name, glasses_tryon, profiler, governor)
+
+    if governor is not None: print(f"quality governor: {governor.state()}")
 
+    if profiler.enabled:
+        profiler.dump()
+        print(profiler.report())
     cap.release()
     cv2.destroyAllWindows()
 
+MULTI_FACE_MAX = 4
+PROFILE_DUMP = "profile_stats.csv"
+ADAPTIVE_FPS = 24
+
 def start_launcher():
+    # التحميل الثقيل يبدأ فوراً في الخلفية بينما يختار المستخدم الخيارات
+    # Heavy loading starts right away in the background while the user picks options
+    warm = warm_start().start()
+    # Tk فقط للمُشغّل، فلا يحتاجه الوضع بدون واجهة - Tk is only needed by the launcher, not headless runs
+    import tkinter as tk
+
     root = tk.Tk()
     root.title("Launcher")
-    root.geometry("400x300")
-    tk.Button(root, text="ابدأ النظام", font=("Arial", 20), command=lambda: [root.destroy(), start_system()]).pack(expand=True)
+    root.geometry("400x420")
+    # وضع المعالجة المتوازية (خيوط منفصلة للالتقاط والتحليل)
+    # Pipeline mode: separate capture and inference threads
+    use_pipeline = tk.BooleanVar(value=False)
+    # تجربة النظارة المقترحة على الوجه - Try the recommended glasses on the live face
+    use_tryon = tk.BooleanVar(value=False)
+    # عدة عملاء في نفس الوقت - Several customers at once
+    use_multi = tk.BooleanVar(value=False)
+    # قياس أزمنة المراحل (لوحة تشخيص + ملف CSV) - Stage timings (debug panel + CSV dump)
+    use_profile = tk.BooleanVar(value=False)
+    # تخفيض الجودة تلقائياً على الأجهزة الضعيفة - Shed work automatically on slow machines
+    use_adaptive = tk.BooleanVar(value=False)
+
+    def launch():
+        pipeline, tryon, multi, profile = use_pipeline.get(), use_tryon.get(), use_multi.get(), use_profile.get()
+        adaptive = use_adaptive.get()
+        STARTUP.mark("launch pressed")
+        root.destroy()
+        start_system(pipeline, tryon=tryon, max_faces=MULTI_FACE_MAX if multi else 1,
+                     profile=profile, profile_dump=PROFILE_DUMP if profile else None, warm=warm,
+                     target_fps=ADAPTIVE_FPS if adaptive else None)
+
+    tk.Button(root, text="ابدأ النظام", font=("Arial", 20), command=launch).pack(expand=True)
+    tk.Checkbutton(root, text="Pipeline (multi-core)", variable=use_pipeline).pack(pady=10)
+    tk.Checkbutton(root, text="Virtual try-on", variable=use_tryon).pack(pady=10)
+    tk.Checkbutton(root, text=f"Multi-face (up to {MULTI_FACE_MAX})", variable=use_multi).pack(pady=10)
+    tk.Checkbutton(root, text="Profiling (debug panel, D to toggle)", variable=use_profile).pack(pady=10)
+    tk.Checkbutton(root, text=f"Adaptive quality ({ADAPTIVE_FPS} FPS target)", variable=use_adaptive).pack(pady=10)
+    root.update_idletasks()
+    STARTUP.mark("launcher shown")
     root.mainloop()
 
 if __name__ == "__main__":
-    start_launcher()
\ No newline at end of file
+    start_launcher()
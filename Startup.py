@@ -0,0 +1,104 @@
+"""
+تسريع بدء التشغيل: تحميل الموارد الثقيلة في الخلفية وتقرير زمن البدء البارد.
+Startup helpers: background warm-up of heavy resources and a cold-start timing report.
+
+بينما نافذة المُشغّل (Tk) ظاهرة ينتظر المستخدم عادةً ثانية أو أكثر قبل الضغط،
+لذا تُبنى في هذا الوقت كل الموارد الثقيلة (الخبير، صور النظارات، خلفية الشريط
+الجانبي، ورسم FaceMesh) في خيط منفصل.
+The Tk launcher usually sits on screen for a second or more before the button
+is pressed, so the heavy resources (expert, glasses sprites, sidebar chrome,
+FaceMesh graph) are built on a background thread in the meantime.
+"""
+import sys
+import threading
+import time
+
+# بداية العدّ: أول استيراد لهذه الوحدة (قبل المكتبات الثقيلة)
+# Time zero: the first import of this module, before the heavy libraries
+_T0 = time.perf_counter()
+
+
+class StartupTimer:
+    """
+    علامات زمنية منذ بدء التشغيل، تُطبع مرة واحدة عند عرض أول إطار.
+    Timestamps since launch, printed once when the first frame is shown.
+    """
+    def __init__(self, t0=_T0):
+        self.t0 = t0
+        self.marks = []
+        self._lock = threading.Lock()
+        self.done = False
+
+    def mark(self, name, since=None):
+        """
+        تسجيل علامة؛ since يجعلها مدة (مهمة في الخلفية) بدل لحظة.
+        Record a mark. With `since` (a perf_counter value) it is stored as a
+        duration, for background tasks, instead of a point in time.
+        """
+        now = time.perf_counter()
+        with self._lock:
+            self.marks.append((name, now - self.t0, None if since is None else now - since))
+
+    def frame_shown(self, out=sys.stdout):
+        """أول إطار ظاهر: طباعة التقرير (مرة واحدة) - First frame on screen: print the report once."""
+        if self.done: return
+        self.done = True
+        self.mark("first frame")
+        print(self.report(), file=out)
+
+    def report(self):
+        """سطر واحد: اللحظة (والمدة للمهام الخلفية) - One line: time of each mark (and duration of background tasks)."""
+        with self._lock:
+            parts = [f"{name} {t:.2f}s" + (f" ({d:.2f}s)" if d is not None else "") for name, t, d in self.marks]
+        return "cold start: " + " | ".join(parts)
+
+    def as_dict(self):
+        with self._lock:
+            return {name: {'at_s': round(t, 4), 'took_s': None if d is None else round(d, 4)}
+                    for name, t, d in self.marks}
+
+
+STARTUP = StartupTimer()
+
+
+class BackgroundLoader:
+    """
+    تشغيل مهام التحميل بالترتيب في خيط واحد؛ get(name) ينتظر مهمة واحدة فقط.
+    Runs named loading tasks in order on one thread; get(name) waits for that
+    task only. Each task is fn(results) -> value, where results holds the
+    values of the tasks before it. A failing task re-raises in get().
+    """
+    def __init__(self, timer=STARTUP):
+        self.timer = timer
+        self._tasks = []
+        self._results = {}
+        self._errors = {}
+        self._events = {}
+        self._thread = None
+
+    def add(self, name, fn):
+        self._tasks.append((name, fn))
+        self._events[name] = threading.Event()
+        return self
+
+    def _run(self):
+        for name, fn in self._tasks:
+            t0 = time.perf_counter()
+            try:
+                self._results[name] = fn(self._results)
+            except Exception as e:  # يُعاد رفعه في get() - re-raised by get()
+                self._errors[name] = e
+            self.timer.mark(f"{name} (bg)", since=t0)
+            self._events[name].set()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+        self._thread.start()
+        return self
+
+    def get(self, name, timeout=None):
+        """نتيجة مهمة بعد انتظار انتهائها - A task's value, waiting for it to finish."""
+        if not self._events[name].wait(timeout):
+            raise TimeoutError(f"warm-up task {name!r} did not finish")
+        if name in self._errors: raise self._errors[name]
+        return self._results[name]
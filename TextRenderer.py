@@ -0,0 +1,138 @@
+"""
+محرك رسم النصوص مع التخزين المؤقت.
+Cached text rendering engine.
+
+بدلاً من تحويل الإطار بالكامل إلى PIL في كل استدعاء، يتم رسم كل نص مرة واحدة
+كـ Sprite صغير ثم دمجه داخل مستطيل النص فقط.
+Instead of round-tripping the whole frame through PIL on every call, each label
+is rendered once as a small sprite and alpha-blitted into its own rectangle only.
+"""
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+
+# PIL و arabic_reshaper و bidi تُستورد عند أول نص فقط (تسريع بدء التشغيل)
+# PIL, arabic_reshaper and bidi are imported on the first label only (faster startup)
+
+FONT_PATH = "arial.ttf"
+SHADOW_OFFSET = 1
+
+
+@lru_cache(maxsize=512)
+def shape_text(text):
+    """
+    تشكيل النص العربي وترتيبه (bidi) مع التخزين المؤقت.
+    Reshape and bidi-order a string, cached.
+    """
+    import arabic_reshaper
+    from bidi.algorithm import get_display
+    return get_display(arabic_reshaper.reshape(text))
+
+
+class TextRenderer:
+    """
+    يرسم النصوص كـ Sprites مخزنة مؤقتاً (LRU) ويدمجها على الصورة.
+    Renders labels as LRU-cached sprites and blends them onto the canvas.
+    """
+    def __init__(self, font_path=FONT_PATH, max_sprites=256):
+        self.font_path = font_path
+        self.max_sprites = max_sprites
+        self._fonts = {}
+        self._sprites = OrderedDict()
+
+    def get_font(self, font_size):
+        """تحميل الخط مرة واحدة لكل حجم - Load each font size once."""
+        font = self._fonts.get(font_size)
+        if font is None:
+            from PIL import ImageFont
+            try:
+                font = ImageFont.truetype(self.font_path, font_size)
+            except Exception:
+                font = ImageFont.load_default()
+            self._fonts[font_size] = font
+        return font
+
+    def _render_sprite(self, text, font_size, color):
+        """
+        رسم النص مع ظله في صورة صغيرة (alpha + لون مضروب مسبقاً).
+        Render text and its drop shadow into a small premultiplied sprite.
+        """
+        from PIL import Image, ImageDraw
+        bidi_text = shape_text(text)
+        font = self.get_font(font_size)
+        bbox = font.getbbox(bidi_text)
+        width = bbox[2] - bbox[0]
+        sw = max(1, width + SHADOW_OFFSET)
+        sh = max(1, bbox[3] - bbox[1] + SHADOW_OFFSET)
+        origin = (-bbox[0], -bbox[1])
+
+        mask_shadow = Image.new("L", (sw, sh), 0)
+        ImageDraw.Draw(mask_shadow).text((origin[0] + SHADOW_OFFSET, origin[1] + SHADOW_OFFSET),
+                                         bidi_text, font=font, fill=255)
+        mask_text = Image.new("L", (sw, sh), 0)
+        ImageDraw.Draw(mask_text).text(origin, bidi_text, font=font, fill=255)
+
+        a_shadow = np.asarray(mask_shadow, dtype=np.uint16)
+        a_text = np.asarray(mask_text, dtype=np.uint16)
+        # الظل أسود ثم النص فوقه: alpha = 1 - (1 - a_s)(1 - a_t)
+        # Black shadow under the text: alpha = 1 - (1 - a_s)(1 - a_t)
+        alpha = 255 - ((255 - a_shadow) * (255 - a_text) + 127) // 255
+        # اللون مُعطى بترتيب RGB كما في PIL ويُخزن بترتيب BGR
+        # Colour is given as RGB (PIL convention) and stored as BGR
+        bgr = np.array(color[:3][::-1], dtype=np.uint16)
+        premult = (a_text[..., None] * bgr + 127) // 255
+
+        sprite = {
+            'alpha': alpha.astype(np.uint16)[..., None],
+            'color': premult.astype(np.uint16),
+            'offset': (bbox[0], bbox[1]),
+            'width': width,
+        }
+        return sprite
+
+    def get_sprite(self, text, font_size, color):
+        """جلب Sprite من الذاكرة المؤقتة أو رسمه - Fetch a cached sprite or render it."""
+        key = (text, font_size, tuple(color))
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self._sprites.move_to_end(key)
+            return sprite
+        sprite = self._render_sprite(text, font_size, color)
+        self._sprites[key] = sprite
+        if len(self._sprites) > self.max_sprites:
+            self._sprites.popitem(last=False)
+        return sprite
+
+    def draw(self, img, text, position, font_size=30, color=(255, 255, 255), align="right"):
+        """
+        رسم النص مباشرة على الصورة (in-place) وإرجاعها.
+        Draw text onto the image in place and return it.
+        """
+        if not text: return img
+        sprite = self.get_sprite(text, font_size, color)
+
+        x, y = position
+        if align == "center": x -= sprite['width'] // 2
+        elif align == "right": x -= sprite['width']
+        x += sprite['offset'][0]
+        y += sprite['offset'][1]
+
+        alpha = sprite['alpha']
+        sh, sw = alpha.shape[:2]
+        y1, y2 = max(0, y), min(img.shape[0], y + sh)
+        x1, x2 = max(0, x), min(img.shape[1], x + sw)
+        if y1 >= y2 or x1 >= x2: return img
+
+        sy, sx = y1 - y, x1 - x
+        a = alpha[sy:sy + (y2 - y1), sx:sx + (x2 - x1)]
+        c = sprite['color'][sy:sy + (y2 - y1), sx:sx + (x2 - x1)]
+        roi = img[y1:y2, x1:x2]
+        # c <= a لذا يبقى الناتج ضمن uint16 - c <= a keeps the sum within uint16
+        roi[...] = (roi * (255 - a) + c * 255 + 127) // 255
+        return img
+
+    def clear(self):
+        """تفريغ الذاكرة المؤقتة - Drop all cached sprites and fonts."""
+        self._sprites.clear()
+        self._fonts.clear()
@@ -0,0 +1,214 @@
+"""
+تجربة النظارة افتراضياً: تثبيت صورة النظارة المقترحة على الوجه في كل إطار.
+Virtual try-on: warps the recommended glasses onto the live face every frame.
+
+التحويل (affine) يُبنى من نقاط FaceMesh: زاويتا العينين (33، 263) لموضع النظارة،
+والصدغان (234، 454) للعرض والميلان. الدمج يتم داخل منطقة النظارة فقط، وكل
+المخازن المؤقتة تُحجز مرة واحدة.
+The affine transform comes from FaceMesh landmarks: the outer eye corners
+(33, 263) anchor the frame, the temples (234, 454) give its width and roll.
+Blending touches only the warped glasses' bounding box, and every buffer is
+allocated once and reused.
+"""
+import cv2
+import numpy as np
+
+from UIDrawing import AlphaSprite, as_sprite
+
+EYE_L, EYE_R = 33, 263
+TEMPLE_L, TEMPLE_R = 234, 454
+ANCHORS = np.array([EYE_L, EYE_R, TEMPLE_L, TEMPLE_R])
+
+# BGRA -> (A, A, A) + (B, G, R) في استدعاء واحد - one mixChannels call
+_SPLIT = [3, 0, 3, 1, 3, 2, 0, 3, 1, 4, 2, 5]
+
+
+class GlassesTryOn:
+    """
+    رسم النظارة على الوجه مع تنعيم اهتزاز النقاط.
+    Draws glasses on the face with landmark jitter smoothing.
+
+    glasses_images  {img key: AlphaSprite أو BGRA} - the app's glasses images
+    width_scale     عرض النظارة نسبة إلى المسافة بين الصدغين - Frame width relative to the temple distance.
+    eye_y           موضع خط العينين في صورة النظارة (نسبة من الارتفاع) - Eye line in the sprite, as a fraction of its height.
+    smoothing       وزن الإطار الجديد عند الثبات (0-1) - Weight of the new frame when the face is still.
+    still_tol       الحركة (بالبكسل) التي لا يُعاد تحتها التحويل - Motion (px) under which the last warp is reused.
+    """
+    MAX_ROI = (720, 1280)
+
+    def __init__(self, glasses_images, width_scale=1.0, eye_y=0.5, smoothing=0.35, still_tol=0.3):
+        self.glasses_images = glasses_images
+        self.width_scale = width_scale
+        self.eye_y = eye_y
+        self.smoothing = smoothing
+        self.still_tol = still_tol
+        self._sprites = {}
+
+        # حالة التنعيم والتحويل (تُحجز مرة واحدة) - Smoothing / warp state, allocated once
+        self._raw = np.zeros((len(ANCHORS), 2), dtype=np.float64)
+        self._pts = np.zeros_like(self._raw)
+        self._warped_pts = np.full_like(self._raw, np.nan)
+        self._M = np.zeros((2, 3), dtype=np.float64)
+        self._corners = np.ones((3, 4), dtype=np.float64)
+        self._has_pts = False
+        self._key = None
+        self._roi = None
+
+        # مخازن الدمج بأكبر حجم ممكن، تُستخدم منها شرائح - Blend buffers at max size, used through slices
+        h, w = self.MAX_ROI
+        self._warp = np.zeros((h, w, 4), dtype=np.uint8)
+        self._a3 = np.zeros((h, w, 3), dtype=np.uint8)
+        self._c3 = np.zeros((h, w, 3), dtype=np.uint8)
+        self._acc = np.zeros((h, w, 3), dtype=np.uint16)
+        self._tmp = np.zeros((h, w, 3), dtype=np.uint16)
+
+    # ------------------------------------------
+    # صور النظارات (Sprites)
+    # ------------------------------------------
+    def _base_sprite(self, key):
+        """
+        صورة النظارة مقصوصة على الجزء غير الشفاف (مرة واحدة لكل صورة).
+        Glasses sprite cropped to its opaque bounding box, once per asset.
+        """
+        levels = self._sprites.get(key)
+        if levels is None:
+            sprite = as_sprite(self.glasses_images[key])
+            ys, xs = np.nonzero(sprite.premultiplied[..., 3])
+            if len(xs):
+                sprite = AlphaSprite(sprite.premultiplied[ys.min():ys.max() + 1, xs.min():xs.max() + 1],
+                                     premultiplied=True)
+            levels = self._sprites[key] = [sprite]
+        return levels
+
+    def _sprite(self, key, target_w):
+        """
+        أصغر مستوى من هرم الصورة لا يقل عرضه عن العرض المطلوب (يقلل التشويش عند التصغير).
+        Smallest pyramid level at least target_w wide; warpAffine has no area
+        filter, so large downscales go through cached pyrDown levels instead.
+        """
+        levels = self._base_sprite(key)
+        level = 0
+        while True:
+            if level + 1 == len(levels):
+                w = levels[level].shape[1]
+                if w // 2 < max(target_w, 8): break
+                levels.append(AlphaSprite(cv2.pyrDown(levels[level].premultiplied), premultiplied=True))
+            if levels[level + 1].shape[1] < target_w: break
+            level += 1
+        return levels[level]
+
+    # ------------------------------------------
+    # التنعيم والتحويل (Smoothing & Warp)
+    # ------------------------------------------
+    def _smooth(self, landmarks):
+        """
+        متوسط متحرك أسي تكيفي في المكان: ثابت عند الثبات وسريع عند الحركة.
+        In-place adaptive exponential smoothing: steady when still, responsive when moving.
+        """
+        if isinstance(landmarks, np.ndarray):
+            np.take(np.asarray(landmarks, dtype=np.float64), ANCHORS, axis=0, out=self._raw)
+        else:
+            # قائمة cvzone: انتقاء نقاط الارتكاز قبل التحويل - cvzone list: pick the anchors before converting
+            self._raw[...] = [landmarks[i] for i in ANCHORS]
+        if not self._has_pts:
+            self._pts[...] = self._raw
+            self._has_pts = True
+            return
+        face_w = np.hypot(*(self._raw[3] - self._raw[2])) + 1e-6
+        motion = np.abs(self._raw - self._pts).max() / face_w
+        # حركة كبيرة (أكثر من 8% من عرض الوجه) = نتبع الوجه مباشرة
+        # Large motion (over 8% of the face width) follows the face directly
+        alpha = min(1.0, self.smoothing + motion / 0.08)
+        self._pts *= 1.0 - alpha
+        self._pts += alpha * self._raw
+
+    def _update_matrix(self, sprite_shape):
+        """التحويل من صورة النظارة إلى الإطار - Affine map from sprite pixels to the frame."""
+        eye_l, eye_r, temple_l, temple_r = self._pts
+        ux, uy = temple_r - temple_l
+        # الصورة معكوسة (مرآة)، لذا نجعل المحور الأفقي يشير دائماً لليمين
+        # The frame is mirrored, so keep the horizontal axis pointing right
+        if ux < 0: ux, uy = -ux, -uy
+        width = np.hypot(ux, uy) + 1e-6
+        ux, uy = ux / width, uy / width
+        sh, sw = sprite_shape[:2]
+        s = width * self.width_scale / sw
+        ax, ay = (eye_l + eye_r) / 2
+        u0, v0 = sw / 2, sh * self.eye_y
+        self._M[0] = (s * ux, -s * uy, ax - s * (u0 * ux - v0 * uy))
+        self._M[1] = (s * uy, s * ux, ay - s * (u0 * uy + v0 * ux))
+
+    def _warp_roi(self, sprite, frame_shape):
+        """
+        المستطيل المحيط بالنظارة بعد التحويل (مقصوص على الإطار)، أو None.
+        Bounding box of the warped sprite, clipped to the frame (None if empty).
+        """
+        sh, sw = sprite.shape[:2]
+        self._corners[0] = (0, sw, 0, sw)
+        self._corners[1] = (0, 0, sh, sh)
+        xy = self._M @ self._corners
+        x1, y1 = np.floor(xy.min(axis=1)).astype(int)
+        x2, y2 = np.ceil(xy.max(axis=1)).astype(int) + 1
+        x1, y1 = max(x1, 0), max(y1, 0)
+        x2, y2 = min(x2, frame_shape[1], x1 + self.MAX_ROI[1]), min(y2, frame_shape[0], y1 + self.MAX_ROI[0])
+        if x2 - x1 < 2 or y2 - y1 < 2: return None
+        return x1, y1, x2, y2
+
+    # ------------------------------------------
+    # الواجهة العامة (Public API)
+    # ------------------------------------------
+    def draw(self, img, landmarks, img_key):
+        """
+        رسم النظارة img_key على الوجه في img (في المكان).
+        Draw the glasses `img_key` onto the face in img, in place.
+        landmarks: نقاط الوجه (468×2) بإحداثيات img، أو None لإيقاف الرسم.
+        """
+        if landmarks is None or img_key not in self.glasses_images:
+            self.reset()
+            return img
+        self._smooth(landmarks)
+
+        # الوجه ثابت ونفس النظارة: نعيد استخدام الصورة المحوّلة ونعيد الدمج فقط
+        # Face still and same glasses: reuse the warped sprite, only re-blend
+        still = (self._key == img_key and self._roi is not None and
+                 np.abs(self._pts - self._warped_pts).max() < self.still_tol)
+        if not still:
+            face_w = np.hypot(*(self._pts[3] - self._pts[2]))
+            sprite = self._sprite(img_key, face_w * self.width_scale)
+            self._update_matrix(sprite.shape)
+            self._roi = self._warp_roi(sprite, img.shape)
+            self._key = img_key
+            self._warped_pts[...] = self._pts
+            if self._roi is None: return img
+            x1, y1, x2, y2 = self._roi
+            self._M[:, 2] -= (x1, y1)
+            cv2.warpAffine(sprite.premultiplied, self._M, (x2 - x1, y2 - y1), dst=self._warp[:y2 - y1, :x2 - x1],
+                           flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT, borderValue=0)
+        if self._roi is None: return img
+
+        x1, y1, x2, y2 = self._roi
+        h, w = y2 - y1, x2 - x1
+        warp, a3, c3 = self._warp[:h, :w], self._a3[:h, :w], self._c3[:h, :w]
+        acc, tmp = self._acc[:h, :w], self._tmp[:h, :w]
+        roi = img[y1:y2, x1:x2]
+        # نفس معادلة AlphaSprite: (dst * (255 - a) + c * 255 + 127) // 255 - Same fixed-point formula
+        cv2.mixChannels([warp], [a3, c3], _SPLIT)
+        cv2.bitwise_not(a3, dst=a3)
+        np.multiply(roi, a3, out=acc, dtype=np.uint16)
+        np.multiply(c3, 255, out=tmp, dtype=np.uint16)
+        acc += tmp
+        acc += 127
+        np.floor_divide(acc, 255, out=acc)
+        roi[...] = acc
+        return img
+
+    def reset(self):
+        """نسيان الوجه السابق (فقدان الوجه أو تغيّر المشهد) - Forget the previous face."""
+        self._has_pts = False
+        self._key = None
+        self._roi = None
+
+    def clear(self):
+        """تفريغ صور النظارات المخزنة - Drop the cached sprites (e.g. after reloading assets)."""
+        self._sprites.clear()
+        self.reset()
@@ -0,0 +1,250 @@
+"""
+أدوات الرسم والواجهة المشتركة (الألوان، النصوص، البطاقات، الخلفيات).
+Shared UI drawing helpers (colour theme, text, cards, gradients).
+"""
+from functools import lru_cache
+
+import cv2
+import numpy as np
+
+# === محرك النصوص العربية (Arabic Text Rendering) ===
+from TextRenderer import TextRenderer
+
+# ==========================================
+# إعدادات الألوان (Color Theme)
+# ==========================================
+COLOR_BG_DARK = (15, 15, 20)
+COLOR_BG_SIDEBAR = (25, 25, 32)
+COLOR_BG_CARD = (35, 35, 45)
+COLOR_BG_GLASS = (40, 40, 55)
+COLOR_ACCENT_PRIMARY = (0, 180, 255)
+COLOR_ACCENT_SECONDARY = (255, 180, 50)
+COLOR_TEXT_PRIMARY = (245, 245, 245)
+COLOR_TEXT_SECONDARY = (180, 180, 200)
+COLOR_TEXT_MUTED = (120, 120, 140)
+COLOR_SUCCESS = (50, 220, 100)
+COLOR_WARNING = (255, 100, 100)
+COLOR_BORDER = (60, 60, 80)
+
+text_renderer = TextRenderer()
+
+# ==========================================
+# دوال مساعدة (رسم وكتابة)
+# ==========================================
+class AlphaSprite:
+    """
+    صورة BGRA مضروبة مسبقاً في الشفافية (premultiplied) وجاهزة للدمج.
+    A BGRA image premultiplied by its alpha once, ready for blending.
+
+    يحتفظ بحدّي الدمج بدقة ثابتة uint16 بحيث يكون الدمج عملية واحدة لكل القنوات:
+    Keeps the two fixed-point uint16 blend terms, so blending every channel is one operation:
+        dst = (dst * inv_alpha + color_term) // 255
+    inv_alpha = 255 - a, color_term = c * 255 + 127 حيث c اللون المضروب (c <= a).
+    """
+    __slots__ = ('premultiplied', 'shape', '_inv_alpha', '_color_term', '_scaled')
+
+    def __init__(self, image, premultiplied=False):
+        if image.shape[2] == 3:
+            image = np.dstack([image, np.full(image.shape[:2], 255, dtype=np.uint8)])
+        if premultiplied:
+            # بدون نسخ (قد تكون نافذة على ملف مربوط بالذاكرة) - No copy; may be a view into a memory-mapped bundle
+            self.premultiplied = np.ascontiguousarray(image)
+        else:
+            a = image[..., 3:4].astype(np.uint16)
+            color = (image[..., :3].astype(np.uint16) * a + 127) // 255
+            self.premultiplied = np.dstack([color.astype(np.uint8), image[..., 3]])
+        self.shape = image.shape
+        self._inv_alpha = None
+        self._color_term = None
+        self._scaled = {}
+
+    # حدّا الدمج يُحسبان عند أول دمج فقط؛ الصور التي تُحجَّم أولاً (الشريط الجانبي،
+    # تجربة النظارة) لا تحتاجهما أبداً بالحجم الكامل.
+    # The blend terms are built on first blend only; sprites that are always
+    # resized first (sidebar, try-on) never need them at full size.
+    @property
+    def inv_alpha(self):
+        if self._inv_alpha is None:
+            # مكررة على القنوات الثلاث لأن البث على بُعد بطول 1 بطيء في NumPy
+            # Repeated over the three channels: NumPy broadcasting over a length-1 axis is slow
+            self._inv_alpha = np.repeat(255 - self.premultiplied[..., 3:4].astype(np.uint16), 3, axis=2)
+        return self._inv_alpha
+
+    @property
+    def color_term(self):
+        if self._color_term is None:
+            self._color_term = self.premultiplied[..., :3].astype(np.uint16) * 255 + 127
+        return self._color_term
+
+    def resized(self, size, interpolation=cv2.INTER_LINEAR):
+        """
+        نسخة بحجم (w, h)؛ التحجيم يتم على الصورة المضروبة فلا تتسرب ألوان الحواف.
+        Copy resized to (w, h). Resizing the premultiplied image keeps transparent
+        pixels from bleeding colour into the edges.
+        """
+        return AlphaSprite(cv2.resize(self.premultiplied, size, interpolation=interpolation), premultiplied=True)
+
+    def scaled(self, scale):
+        """نسخة مكبّرة/مصغّرة محفوظة لكل معامل - Scaled copy, cached per scale factor."""
+        sprite = self._scaled.get(scale)
+        if sprite is None:
+            h, w = self.shape[:2]
+            sprite = self.resized((int(w * scale), int(h * scale)), cv2.INTER_AREA)
+            self._scaled[scale] = sprite
+        return sprite
+
+
+def as_sprite(image):
+    """تحويل صورة BGRA إلى AlphaSprite (أو إرجاعه كما هو) - Wrap a BGRA image unless it already is a sprite."""
+    return image if isinstance(image, AlphaSprite) else AlphaSprite(image)
+
+
+def overlay_image_alpha(img, img_overlay, x, y, scale=1.0):
+    """
+    دمج صورة شفافة على img في المكان (in-place) بعملية uint16 واحدة لكل القنوات.
+    Alpha-blend an overlay onto img in place with a single fixed-point uint16
+    operation over all channels.
+
+    img_overlay: AlphaSprite (مُجهّز مسبقاً - prepared once at load time) أو صورة
+    BGRA/BGR عادية. Plain BGRA/BGR arrays still work (same fixed-point formula on
+    straight alpha), but sprites skip the per-call alpha arithmetic and resize.
+    """
+    if img_overlay is None: return img
+    if isinstance(img_overlay, AlphaSprite):
+        if scale != 1.0: img_overlay = img_overlay.scaled(scale)
+    elif scale != 1.0:
+        h, w = img_overlay.shape[:2]
+        img_overlay = cv2.resize(img_overlay, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+
+    clip = _clip(img.shape, img_overlay.shape, x, y)
+    if clip is None: return img
+    (y1, y2, x1, x2), (y1o, y2o, x1o, x2o) = clip
+    roi = img[y1:y2, x1:x2]
+    if isinstance(img_overlay, AlphaSprite):
+        # c <= a لذا يبقى الناتج ضمن uint16 - c <= a keeps the sum within uint16
+        acc = np.multiply(roi, img_overlay.inv_alpha[y1o:y2o, x1o:x2o], dtype=np.uint16)
+        acc += img_overlay.color_term[y1o:y2o, x1o:x2o]
+    elif img_overlay.shape[2] == 4:
+        # قنوات متصلة بالذاكرة (البث على بُعد بطول 1 بطيء في NumPy)
+        # Contiguous 3-channel planes (NumPy broadcasting over a length-1 axis is slow)
+        ov = img_overlay[y1o:y2o, x1o:x2o]
+        a3 = cv2.cvtColor(cv2.extractChannel(ov, 3), cv2.COLOR_GRAY2BGR)
+        acc = np.multiply(roi, 255 - a3, dtype=np.uint16)
+        acc += np.multiply(cv2.cvtColor(ov, cv2.COLOR_BGRA2BGR), a3, dtype=np.uint16)
+        acc += 127
+    else:
+        roi[...] = img_overlay[y1o:y2o, x1o:x2o, :3]
+        return img
+    np.floor_divide(acc, 255, out=acc)
+    roi[...] = acc
+    return img
+
+
+def _clip(img_shape, overlay_shape, x, y):
+    """قص منطقة الدمج على حدود الصورة - Destination and overlay slices clipped to the image, or None."""
+    y1, y2 = max(0, y), min(img_shape[0], y + overlay_shape[0])
+    x1, x2 = max(0, x), min(img_shape[1], x + overlay_shape[1])
+    y1o, y2o = max(0, -y), min(overlay_shape[0], img_shape[0] - y)
+    x1o, x2o = max(0, -x), min(overlay_shape[1], img_shape[1] - x)
+    if y1 >= y2 or x1 >= x2 or y1o >= y2o or x1o >= x2o: return None
+    return (y1, y2, x1, x2), (y1o, y2o, x1o, x2o)
+
+
+def put_arabic_text(img, text, position, font_size=30, color=(255, 255, 255), align="right"):
+    """
+    كتابة نص عربي على الصورة باستخدام Sprites مخزنة مؤقتاً.
+    Draw Arabic text onto the image using cached sprites (in place).
+    """
+    return text_renderer.draw(img, text, position, font_size, color, align)
+
+@lru_cache(maxsize=64)
+def _rounded_rect_mask(w, h, radius):
+    """
+    قناع البطاقة المستديرة (يُحسب مرة واحدة لكل حجم) مع هامش الحواف.
+    Cached rounded-card mask for a (w, h, radius) box and its padding.
+
+    يُرسم القناع بنفس أوامر OpenCV الأصلية لضمان تطابق البكسلات.
+    The mask is rasterised with the same OpenCV primitives as before, so the
+    blended output stays pixel-identical to the full-frame version.
+    """
+    pad = max(0, 2 * radius - min(w, h))
+    mask = np.zeros((h + 1 + 2 * pad, w + 1 + 2 * pad), dtype=np.uint8)
+    x1, y1, x2, y2 = pad, pad, w + pad, h + pad
+    cv2.rectangle(mask, (x1+radius, y1), (x2-radius, y2), 255, -1)
+    cv2.rectangle(mask, (x1, y1+radius), (x2, y2-radius), 255, -1)
+    cv2.circle(mask, (x1+radius, y1+radius), radius, 255, -1)
+    cv2.circle(mask, (x2-radius, y1+radius), radius, 255, -1)
+    cv2.circle(mask, (x1+radius, y2-radius), radius, 255, -1)
+    cv2.circle(mask, (x2-radius, y2-radius), radius, 255, -1)
+    mask.flags.writeable = False
+    return mask, pad
+
+@lru_cache(maxsize=16)
+def _solid_tile(h, w, color):
+    """بلاطة بلون ثابت مخزنة مؤقتاً - Cached solid-colour tile used as the blend source."""
+    tile = np.empty((h, w, 3), dtype=np.uint8)
+    tile[:] = color
+    tile.flags.writeable = False
+    return tile
+
+def draw_rounded_rect(img, pt1, pt2, color, radius=10, thickness=1, fill=False):
+    x1, y1 = pt1
+    x2, y2 = pt2
+    if fill:
+        # الدمج داخل حدود البطاقة فقط بدلاً من نسخ الصورة كاملة
+        # Blend inside the card's bounding box only instead of copying the whole image
+        mask, pad = _rounded_rect_mask(x2 - x1, y2 - y1, radius)
+        bx, by = x1 - pad, y1 - pad
+        rx1, ry1 = max(0, bx), max(0, by)
+        rx2, ry2 = min(img.shape[1], bx + mask.shape[1]), min(img.shape[0], by + mask.shape[0])
+        if rx1 >= rx2 or ry1 >= ry2: return
+        roi = img[ry1:ry2, rx1:rx2]
+        roi_mask = mask[ry1 - by:ry2 - by, rx1 - bx:rx2 - bx]
+        fill_color = _solid_tile(ry2 - ry1, rx2 - rx1, tuple(int(c) for c in color[:3]))
+        blended = cv2.addWeighted(fill_color, 0.7, roi, 0.3, 0)
+        cv2.copyTo(blended, roi_mask, roi)
+    else:
+        cv2.line(img, (x1+radius, y1), (x2-radius, y1), color, thickness)
+        cv2.line(img, (x1+radius, y2), (x2-radius, y2), color, thickness)
+        cv2.line(img, (x1, y1+radius), (x1, y2-radius), color, thickness)
+        cv2.line(img, (x2, y1+radius), (x2, y2-radius), color, thickness)
+        cv2.ellipse(img, (x1+radius, y1+radius), (radius, radius), 180, 0, 90, color, thickness)
+        cv2.ellipse(img, (x2-radius, y1+radius), (radius, radius), 270, 0, 90, color, thickness)
+        cv2.ellipse(img, (x1+radius, y2-radius), (radius, radius), 90, 0, 90, color, thickness)
+        cv2.ellipse(img, (x2-radius, y2-radius), (radius, radius), 0, 0, 90, color, thickness)
+
+def draw_gradient_background(img, rect, color1, color2, direction='horizontal'):
+    """
+    رسم خلفية متدرجة دفعة واحدة باستخدام NumPy بدلاً من خط لكل بكسل.
+    Fill a linear gradient with NumPy broadcasting instead of one cv2.line per row/column.
+
+    يُحافظ على نفس الحدود (الطرف الثاني شامل في الاتجاه العمودي على التدرج).
+    Keeps the original extents: the span across the ramp includes its end point.
+    """
+    x1, y1, x2, y2 = rect
+    horizontal = direction == 'horizontal'
+    start, end = (x1, x2) if horizontal else (y1, y2)
+    n = end - start
+    if n <= 0: return
+    # نفس حساب النسبة الأصلي (i / n) حتى تتطابق قيم الألوان تماماً
+    # Same ratio arithmetic as the per-line loop (i / n) so colours match exactly
+    ratio = (np.arange(n) / n)[:, None]
+    colors = (np.asarray(color1[:3], dtype=np.float64) * (1 - ratio) +
+              np.asarray(color2[:3], dtype=np.float64) * ratio).astype(np.uint8)
+
+    img_h, img_w = img.shape[:2]
+    if horizontal:
+        c1, c2 = max(0, x1), min(img_w, x2)
+        r1, r2 = max(0, y1), min(img_h, y2 + 1)
+        if c1 >= c2 or r1 >= r2: return
+        # كل صف متطابق ومتصل في الذاكرة، فالبث المباشر هو الأسرع
+        # Rows are identical and contiguous, so plain broadcasting is fastest
+        img[r1:r2, c1:c2] = colors[None, c1 - x1:c2 - x1]
+    else:
+        r1, r2 = max(0, y1), min(img_h, y2)
+        c1, c2 = max(0, x1), min(img_w, x2 + 1)
+        if r1 >= r2 or c1 >= c2: return
+        # تمديد العمود (N×1) أفقياً مباشرة داخل الصورة
+        # Stretch the N x 1 ramp across the ROI, writing straight into the image
+        cv2.resize(np.ascontiguousarray(colors[r1 - y1:r2 - y1, None]), (c2 - c1, r2 - r1),
+                   dst=img[r1:r2, c1:c2], interpolation=cv2.INTER_NEAREST)
@@ -0,0 +1,185 @@
+"""
+خط معالجة متوازٍ: التقاط الصورة، التحليل، والعرض في خيوط منفصلة.
+Threaded capture / inference / render pipeline.
+
+- خيط الالتقاط يحتفظ بآخر إطار فقط ويتخلص من الإطارات القديمة.
+  The capture thread keeps only the latest frame and drops stale ones.
+- خيط التحليل يعمل دائماً على أحدث إطار متاح.
+  The inference worker always runs on the newest available frame.
+- مرحلة العرض (الخيط الرئيسي) تستخدم أحدث نتيجة متاحة.
+  The render stage (main thread) always uses the newest available result.
+"""
+import threading
+import time
+from collections import deque
+
+from FrameProfiler import NULL_PROFILER
+
+
+class LatestFrameQueue:
+    """
+    طابور بخانة واحدة: الكتابة تستبدل العنصر السابق غير المقروء.
+    Single-slot queue: a put overwrites any unread item (counted as dropped).
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._seq = 0
+        self._read_seq = 0
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if self._seq > self._read_seq: self.dropped += 1
+            self._item = item
+            self._seq += 1
+            self._cond.notify_all()
+
+    def get(self, last_seq=0, timeout=None):
+        """
+        انتظار عنصر أحدث من last_seq وإرجاع (seq, item).
+        Wait for an item newer than last_seq; returns (seq, item) or (last_seq, None)
+        on timeout/close.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > last_seq or self._closed, timeout):
+                return last_seq, None
+            if self._seq <= last_seq: return last_seq, None
+            self._read_seq = self._seq
+            return self._seq, self._item
+
+    def peek(self):
+        """قراءة آخر عنصر بدون انتظار - Return the latest (seq, item) without waiting."""
+        with self._cond:
+            return self._seq, self._item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+class StageTimer:
+    """
+    متوسط متحرك لزمن كل مرحلة (بالملي ثانية).
+    Rolling per-stage timings in milliseconds.
+    """
+    def __init__(self, window=60):
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._window = window
+
+    def add(self, stage, ms):
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self._window)
+            samples.append(ms)
+
+    def summary(self):
+        """{stage: (mean_ms, max_ms)}"""
+        with self._lock:
+            return {k: (sum(v) / len(v), max(v)) for k, v in self._samples.items() if v}
+
+
+class VisionPipeline:
+    """
+    يدير خيط الالتقاط وخيط التحليل ويوفر آخر إطار وآخر نتيجة لمرحلة العرض.
+    Runs the capture thread and inference worker; the caller renders in its own loop.
+
+    preprocess(frame) -> frame    يُنفذ في خيط الالتقاط - runs on the capture thread
+    analyze(frame) -> result      يُنفذ في خيط التحليل - runs on the inference worker
+    profiler                      FrameProfiler لمراحل الالتقاط (اختياري) - optional, gets the capture stages
+    """
+    def __init__(self, cap, analyze, preprocess=None, profiler=NULL_PROFILER):
+        self.cap = cap
+        self.analyze = analyze
+        self.preprocess = preprocess
+        self.frames = LatestFrameQueue()
+        self.results = LatestFrameQueue()
+        self.timer = StageTimer()
+        self.last_inference_ms = 0.0
+        self.profiler = profiler
+        self._stop = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="inference", daemon=True),
+        ]
+        self._last_frame_seq = 0
+
+    # ------------------------------------------
+    # الخيوط (Worker Threads)
+    # ------------------------------------------
+    def _capture_loop(self):
+        while not self._stop.is_set():
+            t0 = time.perf_counter()
+            t = self.profiler.start()
+            success, frame = self.cap.read()
+            if not success: break
+            t = self.profiler.lap('capture', t)
+            if self.preprocess is not None:
+                frame = self.preprocess(frame)
+                self.profiler.lap('prepare', t)
+            t1 = time.perf_counter()
+            self.timer.add('capture', (t1 - t0) * 1000.0)
+            self.frames.put((frame, t1))
+        self.frames.close()
+
+    def _inference_loop(self):
+        seq = 0
+        while not self._stop.is_set():
+            seq, item = self.frames.get(seq, timeout=0.5)
+            if item is None:
+                if self.frames.closed: break
+                continue
+            frame, t_capture = item
+            t0 = time.perf_counter()
+            result = self.analyze(frame)
+            t1 = time.perf_counter()
+            self.last_inference_ms = (t1 - t0) * 1000.0
+            self.timer.add('inference', self.last_inference_ms)
+            self.results.put((result, t_capture))
+        self.results.close()
+
+    # ------------------------------------------
+    # الواجهة العامة (Public API)
+    # ------------------------------------------
+    def start(self):
+        for t in self._threads: t.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        self.frames.close()
+        self.results.close()
+        for t in self._threads: t.join(timeout)
+
+    def next_frame(self, timeout=1.0):
+        """
+        انتظار إطار جديد لمرحلة العرض وإرجاع (frame, t_capture).
+        Wait for a frame newer than the last rendered one; (None, None) once capture ends.
+        """
+        seq, item = self.frames.get(self._last_frame_seq, timeout)
+        if item is None: return None, None
+        self._last_frame_seq = seq
+        return item
+
+    def latest_result(self):
+        """أحدث نتيجة تحليل مع زمن التقاط إطارها - Newest (result, t_capture) or (None, None)."""
+        _, item = self.results.peek()
+        return item if item is not None else (None, None)
+
+    @property
+    def running(self):
+        return not self._stop.is_set() and not self.frames.closed
+
+    def report(self):
+        """نص مختصر لأزمنة المراحل - One-line summary of stage timings."""
+        parts = [f"{k}: {mean:.1f}ms (max {mx:.1f})" for k, (mean, mx) in sorted(self.timer.summary().items())]
+        parts.append(f"dropped frames: {self.frames.dropped}")
+        return " | ".join(parts)
@@ -0,0 +1,108 @@
+"""
+مقارنة دمج الشفافية بالدقة الثابتة (uint16) مع النسخة الأصلية (float64).
+Accuracy and timing benchmark for the premultiplied fixed-point overlay_image_alpha
+against the original float64 per-channel loop.
+
+الفرق المتوقع: بكسل واحد على الأكثر بسبب التقريب بدل القطع.
+Expected difference: at most 1 level per channel (rounding instead of truncation).
+
+Usage: python benchmarks/bench_alpha_blend.py [--repeat N]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from UIDrawing import AlphaSprite, overlay_image_alpha
+
+
+def legacy_overlay_image_alpha(img, img_overlay, x, y, scale=1.0):
+    """النسخة الأصلية - The original float64 per-channel blend."""
+    if img_overlay is None: return img
+    if scale != 1.0:
+        h, w = img_overlay.shape[:2]
+        img_overlay = cv2.resize(img_overlay, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+    y1, y2 = max(0, y), min(img.shape[0], y + img_overlay.shape[0])
+    x1, x2 = max(0, x), min(img.shape[1], x + img_overlay.shape[1])
+    y1o, y2o = max(0, -y), min(img_overlay.shape[0], img.shape[0] - y)
+    x1o, x2o = max(0, -x), min(img_overlay.shape[1], img.shape[1] - x)
+    if y1 >= y2 or x1 >= x2 or y1o >= y2o or x1o >= x2o: return img
+    if img_overlay.shape[2] == 4:
+        alpha_mask = img_overlay[y1o:y2o, x1o:x2o, 3] / 255.0
+        alpha_inv = 1.0 - alpha_mask
+        for c in range(3):
+            img[y1:y2, x1:x2, c] = (alpha_mask * img_overlay[y1o:y2o, x1o:x2o, c] +
+                                   alpha_inv * img[y1:y2, x1:x2, c])
+    else:
+        img[y1:y2, x1:x2] = img_overlay[y1o:y2o, x1o:x2o, :3]
+    return img
+
+
+def load_assets():
+    """صور الأصول أو صورة اصطناعية إن لم توجد - Asset PNGs, or a synthetic one if none exist."""
+    images = [cv2.imread(p, cv2.IMREAD_UNCHANGED) for p in sorted(glob.glob(os.path.join(ROOT, "assets", "*.png")))]
+    images = [img for img in images if img is not None and img.ndim == 3 and img.shape[2] == 4]
+    if not images:
+        rng = np.random.default_rng(0)
+        img = rng.integers(0, 256, (500, 500, 4), dtype=np.uint8)
+        img[..., 3] = rng.choice([0, 128, 255], (500, 500))
+        images = [img]
+    return images
+
+
+def timeit(fn, base, repeat):
+    img = base.copy()
+    fn(img)
+    t0 = time.perf_counter()
+    for _ in range(repeat): fn(img)
+    return (time.perf_counter() - t0) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    base = rng.integers(0, 256, (720, 1280, 3), dtype=np.uint8)
+    images = load_assets()
+
+    # الدقة: نفس الموضع، بما في ذلك القص عند الحواف - Accuracy, including clipping at the borders
+    max_diff = 0
+    for image in images:
+        sprite = AlphaSprite(image)
+        for x, y in ((100, 80), (-120, -60), (1000, 500)):
+            old = legacy_overlay_image_alpha(base.copy(), image, x, y)
+            for overlay in (sprite, image):
+                new = overlay_image_alpha(base.copy(), overlay, x, y)
+                max_diff = max(max_diff, int(np.abs(old.astype(np.int16) - new).max()))
+    assert max_diff <= 1, max_diff
+    print(f"max difference vs float64 blend: {max_diff} ({len(images)} images x 3 positions, sprite and raw input)")
+
+    image = images[0]
+    sprite = AlphaSprite(image)
+    rows = [
+        ("overlay 1:1",
+         lambda img: legacy_overlay_image_alpha(img, image, 100, 80),
+         lambda img: overlay_image_alpha(img, sprite, 100, 80)),
+        ("overlay scale=0.5",
+         lambda img: legacy_overlay_image_alpha(img, image, 100, 80, scale=0.5),
+         lambda img: overlay_image_alpha(img, sprite, 100, 80, scale=0.5)),
+        ("overlay 1:1 (raw BGRA input)",
+         lambda img: legacy_overlay_image_alpha(img, image, 100, 80),
+         lambda img: overlay_image_alpha(img, image, 100, 80)),
+    ]
+    print(f"{'case':30s} {'legacy ms':>10s} {'new ms':>10s} {'speed-up':>9s}")
+    for name, legacy, new in rows:
+        t_old, t_new = timeit(legacy, base, args.repeat), timeit(new, base, args.repeat)
+        print(f"{name:30s} {t_old:10.3f} {t_new:10.3f} {t_old / t_new:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+التحقق من تطابق التوصيات وقياس أداء الخبير المترجم إلى جداول.
+Equivalence check and timing benchmark for the table-driven SmartExpert against
+the original if/elif implementation.
+
+عند تعادل النقاط يفوز رقم النظارة الأكبر كما في argsort()[-3:][::-1] الأصلي؛ المرجع
+يستخدم argsort الثابت لأن ترتيب التعادل في الافتراضي يختلف حسب تعليمات SIMD في NumPy.
+Ties go to the higher glass ID, as with the original argsort()[-3:][::-1]. The
+reference uses the stable argsort, since the default sort's tie order depends on
+the SIMD path NumPy picks (AVX-512 builds differ). The check compares glass IDs.
+
+Usage: python benchmarks/bench_recommend.py [--faces N]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from SmartExpert import SmartExpert
+
+SHAPE_NAMES = ["Oval", "Round", "Square", "Heart", "Diamond", "Oblong", "Unknown"]
+
+
+def legacy_scores(face_data):
+    """متجه النقاط الأصلي (31 عنصراً) - The original 31-element score vector."""
+    s_vector = np.zeros(31)
+    shape_name = face_data.get('shape', 'Oval').lower()
+    chin_angle = face_data.get('angle', 120)
+    if 'oval' in shape_name:
+        s_vector[[0, 1, 4]] += 2.0; s_vector[[9]] += 1.5; s_vector[[12]] += 1.0; s_vector[[3]] += 0.5
+    elif 'round' in shape_name:
+        s_vector[[0, 1]] += 3.0; s_vector[[9]] += 2.0; s_vector[[5]] += 2.0; s_vector[[7]] += 1.5; s_vector[[2, 3]] -= 3.0
+    elif 'square' in shape_name:
+        s_vector[[3]] += 3.0; s_vector[[2, 4]] += 2.5; s_vector[[5]] += 1.0; s_vector[[12]] += 1.0; s_vector[[0, 1]] -= 3.0
+    elif 'heart' in shape_name:
+        s_vector[[9]] += 3.0; s_vector[[4]] += 2.0; s_vector[[7]] += 2.0; s_vector[[12]] += 1.5; s_vector[[2]] += 1.0
+    elif 'diamond' in shape_name:
+        s_vector[[5]] += 3.0; s_vector[[2]] += 2.0; s_vector[[12]] += 2.0; s_vector[[7]] += 1.5; s_vector[[0, 1]] -= 1.0
+    elif 'oblong' in shape_name:
+        s_vector[[4]] += 3.0; s_vector[[1]] += 2.0; s_vector[[9]] += 1.5; s_vector[[0]] -= 1.0
+    if chin_angle < 100:
+        s_vector[[7]] += 1.0; s_vector[[1]] -= 1.0
+    return s_vector
+
+
+def legacy_recommend(expert, face_data):
+    """التوصية الأصلية - The original recommend()."""
+    s_vector = legacy_scores(face_data)
+    top_indices = s_vector.argsort(kind='stable')[-3:][::-1]
+    return [expert.glass_types[idx] for idx in top_indices if idx in expert.glass_types]
+
+
+def check_equivalence(expert, records):
+    """نفس النظارات بنفس الترتيب (recommend و recommend_batch) - Same glasses in the same order."""
+    ids, _ = expert.recommend_batch(records)
+    by_img = {v['img']: k for k, v in expert.glass_types.items()}
+    for face_data, batch_ids in zip(records, ids.tolist()):
+        old = [by_img[g['img']] for g in legacy_recommend(expert, face_data)]
+        new = [by_img[g['img']] for g in expert.recommend(face_data)]
+        assert old == new == [gid for gid in batch_ids if gid >= 0], (face_data, old, new, batch_ids)
+    print(f"recommendation equivalence: OK ({len(records)} faces)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--faces", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    shapes = rng.choice(SHAPE_NAMES, args.faces)
+    angles = rng.uniform(70, 130, args.faces)
+    records = [{'shape': str(s), 'angle': float(a)} for s, a in zip(shapes, angles)]
+
+    expert = SmartExpert()
+    check_equivalence(expert, records[:2000])
+
+    n_loop = min(args.faces, 20_000)
+    t0 = time.perf_counter()
+    for face_data in records[:n_loop]: legacy_recommend(expert, face_data)
+    t_legacy = (time.perf_counter() - t0) / n_loop
+    t0 = time.perf_counter()
+    for face_data in records[:n_loop]: expert.recommend(face_data)
+    t_single = (time.perf_counter() - t0) / n_loop
+    t0 = time.perf_counter()
+    expert.recommend_batch(records)
+    t_records = (time.perf_counter() - t0) / args.faces
+    t0 = time.perf_counter()
+    expert.recommend_batch({'shape': shapes, 'angle': angles})
+    t_columns = (time.perf_counter() - t0) / args.faces
+
+    print(f"{'path':32s} {'us/face':>10s} {'faces/s':>14s}")
+    for name, t in (("legacy recommend (loop)", t_legacy), ("recommend (loop)", t_single),
+                    ("recommend_batch (list of dicts)", t_records), ("recommend_batch (columns)", t_columns)):
+        print(f"{name:32s} {t * 1e6:10.3f} {1 / t:14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+تقرير زمن البدء البارد: كل قياس في عملية Python جديدة.
+Cold-start timing report; every measurement runs in a fresh Python process.
+
+- استيراد الوحدة الرئيسية (MediaPipe أصبح كسولاً) - importing the main module (MediaPipe is now lazy)
+- تحميل صور النظارات: فك PNG مقابل الحزمة المربوطة بالذاكرة - PNG decode vs the memory-mapped bundle
+- بناء FaceMesh مع أول استدلال - building FaceMesh plus its first inference
+- كل الموارد جاهزة عبر warm_start (كما في المُشغّل) - every resource ready through warm_start
+
+Usage: python benchmarks/bench_startup.py [--runs N] [--json out.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# كل مقتطف يطبع الزمن بالثواني في آخر سطر - Every snippet prints seconds on its last line
+SNIPPETS = {
+    'import Smart_Glasses_Project': """
+import time; t = time.perf_counter()
+import Smart_Glasses_Project
+print(time.perf_counter() - t)
+""",
+    'import + cvzone/mediapipe (old eager import)': """
+import time; t = time.perf_counter()
+import Smart_Glasses_Project
+from cvzone.FaceMeshModule import FaceMeshDetector
+print(time.perf_counter() - t)
+""",
+    'glasses: decode PNGs': """
+import glob, time, cv2
+from UIDrawing import AlphaSprite
+t = time.perf_counter()
+sprites = [AlphaSprite(cv2.imread(p, cv2.IMREAD_UNCHANGED)) for p in sorted(glob.glob('assets/*.png'))]
+print(time.perf_counter() - t)
+""",
+    'glasses: memory-mapped bundle': """
+import os, time
+from AssetBundle import load_sprites
+names = [f[:-4] for f in os.listdir('assets') if f.endswith('.png')]
+load_sprites('assets', names)  # يبني الحزمة إن لزم - builds the bundle if needed
+import AssetBundle
+t = time.perf_counter()
+sprites = AssetBundle.load_bundle('assets', names)
+assert sprites is not None
+print(time.perf_counter() - t)
+""",
+    'detector: build + first inference': """
+import time
+from Smart_Glasses_Project import create_detector
+t = time.perf_counter()
+create_detector(1, warm=True)
+print(time.perf_counter() - t)
+""",
+    'all resources ready (warm_start, from process start)': """
+import time; t = time.perf_counter()
+from Smart_Glasses_Project import warm_start
+w = warm_start().start()
+for name in ('expert', 'glasses', 'sidebar', 'detector'): w.get(name)
+print(time.perf_counter() - t)
+""",
+}
+
+
+def run_snippet(code):
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", help="also write the results here")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'step':55s} {'median ms':>10s} {'min ms':>9s}")
+    for name, code in SNIPPETS.items():
+        times = np.array([run_snippet(code) for _ in range(args.runs)])
+        results[name] = {'median_s': round(float(np.median(times)), 4), 'min_s': round(float(times.min()), 4)}
+        print(f"{name:55s} {np.median(times) * 1e3:10.1f} {times.min() * 1e3:9.1f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
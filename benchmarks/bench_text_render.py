@@ -0,0 +1,97 @@
+"""
+مقارنة أداء رسم النصوص قبل وبعد التخزين المؤقت.
+Micro-benchmark: legacy PIL round-trip text vs. cached sprite renderer.
+
+Usage: python benchmarks/bench_text_render.py [--frames N]
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+from PIL import ImageFont, ImageDraw, Image
+import arabic_reshaper
+from bidi.algorithm import get_display
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from TextRenderer import TextRenderer
+
+# نفس النصوص التي تُرسم في كل إطار داخل start_system
+# Same labels drawn on every frame of start_system
+LABELS = [
+    ("نظام التحليل البيومتري", (1496, 25), 22, (245, 245, 245), "center"),
+    ("Smart Vision Pro", (1496, 55), 12, (120, 120, 140), "center"),
+    ("الشكل:", (1672, 120), 14, (180, 180, 200), "right"),
+    ("بيضاوي", (1496, 150), 24, (50, 220, 100), "center"),
+    ("القياسات", (1677, 545), 14, (180, 180, 200), "right"),
+    ("الطول: 125", (1320, 575), 13, (0, 180, 255), "left"),
+    ("الزاوية: 88", (1516, 575), 13, (0, 180, 255), "left"),
+    ("الفك: 90", (1320, 610), 13, (0, 180, 255), "left"),
+    ("الجبهة: 72", (1516, 610), 13, (0, 180, 255), "left"),
+    ("التوصية", (1672, 240), 16, (255, 180, 50), "right"),
+    ("Aviator (طيار)", (1496, 270), 20, (245, 245, 245), "center"),
+    ("يناسب وجهك", (1496, 480), 12, (50, 220, 100), "center"),
+    ("ESC: خروج", (1496, 705), 11, (120, 120, 140), "center"),
+    ("انظر للأمام", (640, 370), 20, (255, 255, 255), "center"),
+    ("جاري التحليل...", (1496, 380), 16, (120, 120, 140), "center"),
+]
+
+
+def legacy_put_arabic_text(img, text, position, font_size=30, color=(255, 255, 255), align="right"):
+    """النسخة الأصلية (تحويل الإطار كاملاً إلى PIL) - The original full-frame PIL round-trip."""
+    reshaped_text = arabic_reshaper.reshape(text)
+    bidi_text = get_display(reshaped_text)
+    img_pil = Image.fromarray(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+    draw = ImageDraw.Draw(img_pil)
+    try:
+        font = ImageFont.truetype("arial.ttf", font_size)
+    except:
+        font = ImageFont.load_default()
+    text_bbox = draw.textbbox((0, 0), bidi_text, font=font)
+    text_width = text_bbox[2] - text_bbox[0]
+    x, y = position
+    if align == "center": x -= text_width // 2
+    elif align == "right": x -= text_width
+    draw.text((x+1, y+1), bidi_text, font=font, fill=(0,0,0))
+    draw.text((x, y), bidi_text, font=font, fill=color)
+    return cv2.cvtColor(np.array(img_pil), cv2.COLOR_RGB2BGR)
+
+
+def synthetic_frame(h=720, w=1280, sidebar_w=432, seed=0):
+    """إطار اصطناعي بحجم واجهة النظام - Synthetic frame with the UI's canvas size."""
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 255, (h, w + sidebar_w, 3), dtype=np.uint8)
+
+
+def run(draw_fn, base, frames):
+    start = time.perf_counter()
+    for _ in range(frames):
+        img = base.copy()
+        for text, pos, size, color, align in LABELS:
+            img = draw_fn(img, text, pos, size, color, align)
+    return frames / (time.perf_counter() - start), img
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--frames", type=int, default=30)
+    args = parser.parse_args()
+
+    base = synthetic_frame()
+    renderer = TextRenderer()
+
+    fps_old, img_old = run(legacy_put_arabic_text, base, args.frames)
+    fps_new, img_new = run(renderer.draw, base, args.frames)
+
+    diff = np.abs(img_old.astype(np.int16) - img_new.astype(np.int16))
+    print(f"labels/frame:      {len(LABELS)}")
+    print(f"legacy (PIL):      {fps_old:8.1f} FPS")
+    print(f"cached sprites:    {fps_new:8.1f} FPS")
+    print(f"speed-up:          {fps_new / fps_old:8.1f}x")
+    print(f"max pixel diff:    {diff.max()}  (mean {diff.mean():.4f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+التحقق من تطابق البكسلات وقياس أداء التدرج والبطاقات المستديرة.
+Pixel-equivalence check and timing benchmark for the vectorized gradient and
+rounded-card primitives against the original implementations.
+
+Usage: python benchmarks/bench_ui_primitives.py [--repeat N]
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from UIDrawing import draw_gradient_background, draw_rounded_rect
+
+
+def legacy_draw_rounded_rect(img, pt1, pt2, color, radius=10, thickness=1, fill=False):
+    """النسخة الأصلية (نسخ الصورة كاملة) - Original full-canvas copy + addWeighted."""
+    x1, y1 = pt1
+    x2, y2 = pt2
+    overlay = img.copy()
+    cv2.rectangle(overlay, (x1+radius, y1), (x2-radius, y2), color, -1)
+    cv2.rectangle(overlay, (x1, y1+radius), (x2, y2-radius), color, -1)
+    cv2.circle(overlay, (x1+radius, y1+radius), radius, color, -1)
+    cv2.circle(overlay, (x2-radius, y1+radius), radius, color, -1)
+    cv2.circle(overlay, (x1+radius, y2-radius), radius, color, -1)
+    cv2.circle(overlay, (x2-radius, y2-radius), radius, color, -1)
+    cv2.addWeighted(overlay, 0.7, img, 0.3, 0, img)
+
+
+def legacy_draw_gradient_background(img, rect, color1, color2, direction='horizontal'):
+    """النسخة الأصلية (خط لكل بكسل) - Original one cv2.line per column/row."""
+    x1, y1, x2, y2 = rect
+    if direction == 'horizontal':
+        for i in range(x1, x2):
+            ratio = (i - x1) / (x2 - x1)
+            color = tuple(int(color1[j] * (1 - ratio) + color2[j] * ratio) for j in range(3))
+            cv2.line(img, (i, y1), (i, y2), color, 1)
+    else:
+        for i in range(y1, y2):
+            ratio = (i - y1) / (y2 - y1)
+            color = tuple(int(color1[j] * (1 - ratio) + color2[j] * ratio) for j in range(3))
+            cv2.line(img, (x1, i), (x2, i), color, 1)
+
+
+# حالات تغطي الاستخدام الفعلي والحواف - Real UI calls plus clipping/degenerate cases
+GRADIENT_CASES = [
+    ((1280, 0, 1712, 720), (25, 25, 32), (15, 15, 20), 'vertical'),
+    ((1280, 0, 1712, 80), (30, 30, 40), (25, 25, 32), 'horizontal'),
+    ((-20, -10, 300, 200), (0, 180, 255), (255, 180, 50), 'horizontal'),
+    ((1600, 600, 1800, 900), (255, 0, 0), (0, 0, 255), 'vertical'),
+    ((10, 10, 11, 50), (200, 10, 90), (3, 250, 7), 'horizontal'),
+]
+
+CARD_CASES = [
+    ((1300, 100), (1692, 200), (35, 35, 45), 12),
+    ((1300, 220), (1692, 510), (40, 40, 55), 12),
+    ((1300, 530), (1692, 660), (35, 35, 45), 12),
+    ((-15, -15), (60, 40), (0, 180, 255), 10),
+    ((1690, 700), (1800, 760), (255, 100, 100), 10),
+    ((100, 100), (110, 104), (50, 220, 100), 12),
+]
+
+
+def synthetic_frame(h=720, w=1712, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 255, (h, w, 3), dtype=np.uint8)
+
+
+def check_equivalence(base):
+    """مقارنة الناتج بالنسخة الأصلية بكسلاً ببكسل - Compare against the original output pixel by pixel."""
+    for rect, c1, c2, direction in GRADIENT_CASES:
+        a, b = base.copy(), base.copy()
+        legacy_draw_gradient_background(a, rect, c1, c2, direction)
+        draw_gradient_background(b, rect, c1, c2, direction)
+        assert np.array_equal(a, b), f"gradient mismatch for {rect} {direction}"
+    for pt1, pt2, color, radius in CARD_CASES:
+        a, b = base.copy(), base.copy()
+        legacy_draw_rounded_rect(a, pt1, pt2, color, radius=radius, fill=True)
+        draw_rounded_rect(b, pt1, pt2, color, radius=radius, fill=True)
+        assert np.array_equal(a, b), f"rounded card mismatch for {pt1}-{pt2} r={radius}"
+    print(f"pixel equivalence: OK ({len(GRADIENT_CASES)} gradients, {len(CARD_CASES)} cards)")
+
+
+def timeit(fn, base, repeat):
+    img = base.copy()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(img)
+    return (time.perf_counter() - start) / repeat * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    base = synthetic_frame()
+    check_equivalence(base)
+
+    rect, c1, c2, _ = GRADIENT_CASES[0]
+    pt1, pt2, color, radius = CARD_CASES[1]
+    rows = [
+        ("gradient (vertical sidebar)",
+         lambda img: legacy_draw_gradient_background(img, rect, c1, c2, 'vertical'),
+         lambda img: draw_gradient_background(img, rect, c1, c2, 'vertical')),
+        ("gradient (horizontal header)",
+         lambda img: legacy_draw_gradient_background(img, GRADIENT_CASES[1][0], c1, c2, 'horizontal'),
+         lambda img: draw_gradient_background(img, GRADIENT_CASES[1][0], c1, c2, 'horizontal')),
+        ("rounded card (fill)",
+         lambda img: legacy_draw_rounded_rect(img, pt1, pt2, color, radius=radius, fill=True),
+         lambda img: draw_rounded_rect(img, pt1, pt2, color, radius=radius, fill=True)),
+    ]
+    print(f"{'primitive':30s} {'legacy ms':>10s} {'new ms':>10s} {'speed-up':>9s}")
+    for name, legacy, new in rows:
+        t_old, t_new = timeit(legacy, base, args.repeat), timeit(new, base, args.repeat)
+        print(f"{name:30s} {t_old:10.3f} {t_new:10.3f} {t_old / t_new:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
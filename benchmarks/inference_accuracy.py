@@ -0,0 +1,123 @@
+"""
+تقرير دقة الاستدلال بدقة مخفضة مقارنة بالدقة الكاملة على مقاطع مسجلة.
+Accuracy report: reduced-resolution / face-ROI inference vs. full-resolution
+inference on recorded clips (shape-label agreement, ratio drift, timing).
+
+agree = per-frame raw label agreement; voted = agreement of the 15-frame
+majority label that the UI displays (both majorities over the same frames); d_* = mean absolute ratio drift;
+lm_px = mean landmark displacement in display pixels.
+
+يحتاج مقاطع حقيقية فيها وجوه (FaceMesh يعمل على الصور)؛ نقاط benchmarks/fixtures لا تكفي،
+ولا توجد نتائج محفوظة في المستودع لعدم وجود مقاطع مسجلة فيه.
+Needs real clips with faces (FaceMesh runs on pixels); the landmark fixtures in
+benchmarks/fixtures cannot drive it, and no results are committed because the
+repository ships no recorded clips.
+
+Usage:
+    python benchmarks/inference_accuracy.py clip1.mp4 clip2.mp4 [--heights 480 320] [--roi]
+"""
+import argparse
+from collections import Counter, deque
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cvzone.FaceMeshModule import FaceMeshDetector
+from FaceInference import ScaledFaceMesh
+from Smart_Glasses_Project import get_geometric_shape, is_head_aligned, prepare_frame
+
+
+def iter_frames(path):
+    """قراءة الإطارات من فيديو أو مجلد صور - Yield frames from a video file or an image folder."""
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.lower().endswith(('.jpg', '.png', '.jpeg')):
+                img = cv2.imread(os.path.join(path, name))
+                if img is not None: yield img
+        return
+    cap = cv2.VideoCapture(path)
+    while True:
+        success, img = cap.read()
+        if not success: break
+        yield img
+    cap.release()
+
+
+def analyze(mesh, img):
+    """(shape, stats, landmarks, ms) أو None إذا لم يُكتشف وجه مستقيم."""
+    t0 = time.perf_counter()
+    faces = mesh.find(img)
+    ms = (time.perf_counter() - t0) * 1000.0
+    if not faces or not is_head_aligned(mesh.detector, faces[0]): return None, ms
+    _, shape, stats = get_geometric_shape(mesh.detector, faces[0])
+    return (shape, np.array(stats), np.array(faces[0], dtype=np.float32)), ms
+
+
+VOTE_WINDOW = 15  # نفس BUFFER_SIZE في الواجهة - Same as the UI's smoothing window
+
+
+def majority(labels):
+    return Counter(labels).most_common(1)[0][0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("clips", nargs="+", help="video files or image folders")
+    parser.add_argument("--heights", type=int, nargs="+", default=[480, 320])
+    parser.add_argument("--roi", action="store_true", help="also evaluate face-ROI cropping")
+    args = parser.parse_args()
+
+    configs = [(f"{h}px", h, False) for h in args.heights]
+    if args.roi: configs += [(f"{h}px+roi", h, True) for h in args.heights]
+
+    print(f"{'clip':24s} {'config':12s} {'frames':>6s} {'agree':>7s} {'voted':>7s} "
+          f"{'d_face':>7s} {'d_angle':>7s} {'d_jaw':>6s} {'d_fore':>7s} {'lm_px':>6s} {'ms':>6s} {'full ms':>7s}")
+    for clip in args.clips:
+        # كاشف مستقل لكل إعداد حتى لا تختلط حالة التتبع
+        # One detector per configuration so tracking state never leaks between them
+        reference = ScaledFaceMesh(FaceMeshDetector(maxFaces=1))
+        meshes = [(name, ScaledFaceMesh(FaceMeshDetector(maxFaces=1), h, roi)) for name, h, roi in configs]
+        # نافذة مرجعية لكل إعداد على نفس الإطارات التي يصوّت فيها الإعداد
+        # One reference window per configuration, fed the same frames as its own window
+        rows = {name: {'n': 0, 'agree': 0, 'voted': 0, 'd_stats': [], 'lm': [], 'ms': [],
+                       'window': deque(maxlen=VOTE_WINDOW), 'ref_window': deque(maxlen=VOTE_WINDOW)}
+                for name, _, _ in configs}
+        ref_ms = []
+
+        for frame in iter_frames(clip):
+            img = prepare_frame(frame)
+            ref, ms = analyze(reference, img)
+            ref_ms.append(ms)
+            for name, mesh in meshes:
+                res, ms = analyze(mesh, img)
+                row = rows[name]
+                row['ms'].append(ms)
+                if ref is None or res is None: continue
+                row['n'] += 1
+                row['agree'] += res[0] == ref[0]
+                row['window'].append(res[0])
+                row['ref_window'].append(ref[0])
+                # التسمية المعروضة فعلياً (تصويت آخر 15 إطاراً) - The label the UI actually shows
+                row['voted'] += majority(row['window']) == majority(row['ref_window'])
+                row['d_stats'].append(np.abs(res[1] - ref[1]))
+                row['lm'].append(np.linalg.norm(res[2] - ref[2], axis=1).mean())
+
+        label = os.path.basename(clip.rstrip(os.sep))[:24]
+        for name, _, _ in configs:
+            row = rows[name]
+            if row['n'] == 0:
+                print(f"{label:24s} {name:12s} {0:6d}  (no aligned faces)")
+                continue
+            d = np.mean(row['d_stats'], axis=0)
+            print(f"{label:24s} {name:12s} {row['n']:6d} {row['agree'] / row['n'] * 100:6.1f}% "
+                  f"{row['voted'] / row['n'] * 100:6.1f}% "
+                  f"{d[0]:7.2f} {d[1]:7.2f} {d[2]:6.2f} {d[3]:7.2f} {np.mean(row['lm']):6.2f} "
+                  f"{np.mean(row['ms']):6.1f} {np.mean(ref_ms):7.1f}")
+
+
+if __name__ == "__main__":
+    main()
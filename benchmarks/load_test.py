@@ -0,0 +1,215 @@
+"""
+اختبار حمل لخدمة التوصيات: عدة عملاء متزامنين مع تقرير الإنتاجية ونسب زمن الاستجابة.
+Load test for RecommendationService: concurrent keep-alive clients, reporting
+throughput and latency percentiles.
+
+بدون --port أو --unix يُشغَّل خادم محلي مؤقت على منفذ حر ويُغلق في النهاية.
+Without --port / --unix a temporary local server is started on a free port and
+stopped at the end.
+
+- landmarks: نقاط الوجوه من benchmarks/fixtures/landmarks.npz (JSON أو npy)
+  landmarks: faces from benchmarks/fixtures/landmarks.npz (JSON or npy bodies)
+- frame: صور JPEG من --images، أو إطارات اصطناعية (بدون وجوه: تقيس الفك و FaceMesh فقط)
+  frame: JPEGs from --images, or synthetic frames (no faces: decode + FaceMesh cost only)
+
+Usage:
+    python benchmarks/load_test.py --concurrency 32 --duration 10
+    python benchmarks/load_test.py --mode frame --images shots/ --workers 2
+    python benchmarks/load_test.py --port 8765 --faces 4 --encoding npy
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import cv2
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+FIXTURE_PATH = os.path.join(BENCH_DIR, "fixtures", "landmarks.npz")
+
+
+# ==========================================
+# الطلبات (Request Bodies)
+# ==========================================
+def landmark_bodies(faces_per_request, encoding, count=64):
+    """أجسام طلبات جاهزة بالتناوب على وجوه الـ fixture - Pre-built bodies cycling through the fixture."""
+    lm = np.load(FIXTURE_PATH)['landmarks'].astype(np.float64)
+    bodies = []
+    for i in range(count):
+        faces = lm[(np.arange(faces_per_request) + i * faces_per_request) % len(lm)]
+        if encoding == "npy":
+            buf = io.BytesIO()
+            np.save(buf, faces.astype(np.float32))
+            bodies.append(("/v1/landmarks", "application/x-npy", buf.getvalue()))
+        else:
+            bodies.append(("/v1/landmarks", "application/json",
+                           json.dumps({'faces': np.round(faces, 1).tolist()}).encode()))
+    return bodies
+
+
+def frame_bodies(images_dir=None, count=8):
+    """JPEG من مجلد أو إطارات اصطناعية - JPEGs from a folder, or seeded synthetic frames."""
+    if images_dir:
+        names = sorted(f for f in os.listdir(images_dir) if f.lower().endswith(('.jpg', '.jpeg')))
+        datas = [open(os.path.join(images_dir, f), "rb").read() for f in names]
+    else:
+        rng = np.random.default_rng(0)
+        datas = [cv2.imencode(".jpg", rng.integers(0, 256, (480, 640, 3), dtype=np.uint8))[1].tobytes()
+                 for _ in range(count)]
+    if not datas: raise SystemExit(f"no JPEG files in {images_dir}")
+    return [("/v1/frame", "image/jpeg", d) for d in datas]
+
+
+# ==========================================
+# العميل (Client)
+# ==========================================
+async def open_connection(args):
+    if args.unix: return await asyncio.open_unix_connection(args.unix, limit=1 << 24)
+    return await asyncio.open_connection(args.host, args.port, limit=1 << 24)
+
+
+async def http_request(reader, writer, method, path, content_type=None, body=b""):
+    """طلب واحد على اتصال مفتوح (keep-alive) - One request on an open keep-alive connection."""
+    head = f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n"
+    if content_type: head += f"Content-Type: {content_type}\r\n"
+    writer.write((head + "\r\n").encode("latin-1") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""): break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length": length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def client(args, bodies, offset, deadline, stats):
+    reader, writer = await open_connection(args)
+    i = offset
+    try:
+        while time.perf_counter() < deadline and stats['sent'] < args.requests:
+            stats['sent'] += 1
+            path, content_type, body = bodies[i % len(bodies)]
+            i += 1
+            t0 = time.perf_counter()
+            status, payload = await http_request(reader, writer, "POST", path, content_type, body)
+            ms = (time.perf_counter() - t0) * 1000.0
+            if status == 200:
+                stats['latency'].append(ms)
+                stats['faces'] += len(json.loads(payload)['faces'])
+            elif status == 503:
+                stats['rejected'] += 1
+                await asyncio.sleep(0.01)
+            else:
+                stats['errors'] += 1
+    finally:
+        writer.close()
+
+
+async def get_health(args):
+    reader, writer = await open_connection(args)
+    try:
+        status, payload = await http_request(reader, writer, "GET", "/v1/health")
+        return json.loads(payload) if status == 200 else None
+    finally:
+        writer.close()
+
+
+async def run_load(args, bodies):
+    stats = {'sent': 0, 'faces': 0, 'rejected': 0, 'errors': 0, 'latency': []}
+    t0 = time.perf_counter()
+    deadline = t0 + args.duration
+    await asyncio.gather(*(client(args, bodies, c * 7, deadline, stats) for c in range(args.concurrency)))
+    stats['seconds'] = time.perf_counter() - t0
+    stats['server'] = await get_health(args)
+    return stats
+
+
+# ==========================================
+# الخادم المحلي (Local Server)
+# ==========================================
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(args, timeout=120.0):
+    """تشغيل خادم مؤقت وانتظار جاهزيته - Start a temporary server and wait until it answers."""
+    args.port = free_port()
+    cmd = [sys.executable, os.path.join(ROOT, "RecommendationService.py"), "--port", str(args.port),
+           "--workers", str(args.workers if args.mode == "frame" else 0),
+           "--max-batch", str(args.max_batch), "--max-delay-ms", str(args.max_delay_ms)]
+    proc = subprocess.Popen(cmd, cwd=ROOT)
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < timeout:
+        if proc.poll() is not None: raise SystemExit("server exited during startup")
+        try:
+            if asyncio.run(get_health(args)) is not None: return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit("server did not start")
+
+
+def report(stats):
+    lat = np.array(stats['latency'])
+    ok = len(lat)
+    print(f"{ok} ok, {stats['rejected']} rejected (503), {stats['errors']} errors in {stats['seconds']:.2f}s")
+    print(f"throughput: {ok / stats['seconds']:,.0f} req/s, {stats['faces'] / stats['seconds']:,.0f} faces/s")
+    if ok:
+        p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+        print(f"latency ms: p50 {p50:.2f}  p95 {p95:.2f}  p99 {p99:.2f}  max {lat.max():.2f}")
+    server = stats['server'] or {}
+    for name in ("landmarks", "frames"):
+        s = server.get(name)
+        if s and s['batches']: print(f"server {name}: {s['batches']} batches, mean batch {s['mean_batch']}")
+    return {'ok': ok, 'rejected': stats['rejected'], 'errors': stats['errors'],
+            'seconds': round(stats['seconds'], 3), 'req_per_s': round(ok / stats['seconds'], 1),
+            'faces_per_s': round(stats['faces'] / stats['seconds'], 1),
+            'latency_ms': {} if not ok else {k: round(float(v), 3) for k, v in
+                                             zip(("p50", "p95", "p99", "max"), (*np.percentile(lat, [50, 95, 99]), lat.max()))},
+            'server': server}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="use a running server (default: start a local one)")
+    parser.add_argument("--unix", help="use a running server on this Unix socket")
+    parser.add_argument("--mode", choices=("landmarks", "frame"), default="landmarks")
+    parser.add_argument("--encoding", choices=("json", "npy"), default="json", help="landmark body format")
+    parser.add_argument("--faces", type=int, default=1, help="faces per landmark request")
+    parser.add_argument("--images", help="folder of JPEGs for --mode frame")
+    parser.add_argument("--concurrency", type=int, default=32, help="simultaneous client connections")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--requests", type=int, default=10 ** 9, help="stop after this many requests")
+    parser.add_argument("--workers", type=int, default=1, help="FaceMesh workers of the local server")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-delay-ms", type=float, default=2.0)
+    parser.add_argument("--json", help="also write the results here")
+    args = parser.parse_args()
+
+    bodies = landmark_bodies(args.faces, args.encoding) if args.mode == "landmarks" else frame_bodies(args.images)
+    proc = None if args.port or args.unix else start_server(args)
+    try:
+        results = report(asyncio.run(run_load(args, bodies)))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+إنشاء ملف نقاط الوجه المسجلة (fixtures) لحزمة القياس، بدون كاميرا أو MediaPipe عند القياس.
+Builds the landmark fixture used by the benchmark suite, so the suite itself
+needs no camera and no MediaPipe model.
+
+- مع --video: تسجيل نقاط FaceMesh الحقيقية من مقطع (وجه واحد كل --every إطارات).
+  With --video: record real FaceMesh landmarks from a clip (one face every --every frames).
+- بدون مقطع: وجوه اصطناعية محددة بالبذرة؛ النقاط التي تستخدمها FaceGeometry و TryOn
+  تُبنى من نسب تغطي كل الأشكال، وبعض الوجوه ملتفتة (غير مستقيمة).
+  Without a clip: seeded synthetic faces. The landmarks FaceGeometry and TryOn
+  read are placed from ratios spanning every shape class, and some faces are
+  turned away (misaligned); the remaining points fill the face ellipse.
+
+Usage:
+    python benchmarks/make_fixtures.py                       # synthetic (the shipped file)
+    python benchmarks/make_fixtures.py --video clip.mp4 --every 5
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from FaceGeometry import (CHEEK_L, CHEEK_R, CHIN_BOTTOM, FORE_L, FORE_R, HEAD_TOP, JAW_L, JAW_R, NOSE,
+                          score_batch)
+from TryOn import EYE_L, EYE_R
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "landmarks.npz")
+N_POINTS = 468
+
+
+def synthetic_faces(n, seed=0, frame=(720, 1280), misaligned=0.15):
+    """
+    (N×468×2) نقاط اصطناعية بإحداثيات إطار العرض - Synthetic landmarks in display coordinates.
+    """
+    rng = np.random.default_rng(seed)
+    faces = np.empty((n, N_POINTS, 2), dtype=np.float64)
+    for i in range(n):
+        w = 1.0
+        h = rng.uniform(1.10, 1.40) * w               # face_ratio 110-140
+        jaw_w = rng.uniform(0.80, 1.00) * w           # jaw_ratio 80-100
+        fore_w = rng.uniform(0.60, 0.85) * w          # forehead_ratio 60-85
+        chin = np.radians(rng.uniform(78, 96))        # chin angle 78-96
+        top, bottom = -0.55 * h, 0.45 * h
+
+        # باقي النقاط داخل قطع ناقص الوجه - Remaining points fill the face ellipse
+        r = np.sqrt(rng.uniform(0, 1, N_POINTS))
+        t = rng.uniform(0, 2 * np.pi, N_POINTS)
+        pts = np.stack([r * np.cos(t) * w / 2, r * np.sin(t) * h / 2 + (top + bottom) / 2], axis=1)
+
+        nose_x = rng.uniform(0.25, 0.40) * w * rng.choice([-1, 1]) if rng.random() < misaligned \
+            else rng.uniform(-0.05, 0.05) * w
+        pts[NOSE] = (nose_x, 0.1 * h)
+        pts[HEAD_TOP] = (0, top)
+        pts[CHIN_BOTTOM] = (0, bottom)
+        pts[CHEEK_L], pts[CHEEK_R] = (-w / 2, 0), (w / 2, 0)
+        jaw_y = bottom - (jaw_w / 2) / np.tan(chin / 2)
+        pts[JAW_L], pts[JAW_R] = (-jaw_w / 2, jaw_y), (jaw_w / 2, jaw_y)
+        pts[FORE_L], pts[FORE_R] = (-fore_w / 2, 0.6 * top), (fore_w / 2, 0.6 * top)
+        pts[EYE_L], pts[EYE_R] = (0.3 * w, -0.1 * h), (-0.3 * w, -0.1 * h)   # mirrored frame
+
+        # ميلان وحجم وموضع عشوائي (النسب لا تتغير) - Random roll, size and position (ratios unchanged)
+        roll = np.radians(rng.uniform(-8, 8))
+        rot = np.array([[np.cos(roll), -np.sin(roll)], [np.sin(roll), np.cos(roll)]])
+        size = rng.uniform(180, 320)
+        center = (rng.uniform(0.3, 0.7) * frame[1], rng.uniform(0.4, 0.6) * frame[0])
+        faces[i] = pts @ rot.T * size + center
+    return faces
+
+
+def recorded_faces(video, every=5, limit=64):
+    """نقاط FaceMesh الحقيقية من مقطع مسجل - Real FaceMesh landmarks from a recorded clip."""
+    import cv2
+    from cvzone.FaceMeshModule import FaceMeshDetector
+    from Smart_Glasses_Project import prepare_frame
+
+    detector = FaceMeshDetector(maxFaces=1)
+    cap = cv2.VideoCapture(video)
+    faces, index = [], 0
+    while len(faces) < limit:
+        success, img = cap.read()
+        if not success: break
+        if index % every == 0:
+            _, found = detector.findFaceMesh(prepare_frame(img), draw=False)
+            if found: faces.append(found[0])
+        index += 1
+    cap.release()
+    return np.asarray(faces, dtype=np.float64)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--video", help="record real landmarks from this clip instead of synthesizing")
+    parser.add_argument("--every", type=int, default=5)
+    parser.add_argument("--faces", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=FIXTURE_PATH)
+    args = parser.parse_args()
+
+    if args.video:
+        faces, source = recorded_faces(args.video, args.every, args.faces), os.path.basename(args.video)
+    else:
+        faces, source = synthetic_faces(args.faces, args.seed), f"synthetic seed={args.seed}"
+    if not len(faces): sys.exit("no faces found")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    np.savez_compressed(args.output, landmarks=faces.astype(np.float32), source=source)
+    _, shapes, aligned = score_batch(faces)
+    labels, counts = np.unique(shapes[aligned], return_counts=True)
+    print(f"{args.output}: {len(faces)} faces ({source}), {int(aligned.sum())} aligned, "
+          + ", ".join(f"{l} {c}" for l, c in zip(labels, counts)))
+
+
+if __name__ == "__main__":
+    main()
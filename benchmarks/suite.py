@@ -0,0 +1,307 @@
+"""
+حزمة قياس قابلة للتكرار لأجزاء النظام، مع مقارنة بخط أساس محفوظ.
+Reproducible benchmark suite for the app's hot paths, compared against a stored baseline.
+
+لا تحتاج كاميرا أو نموذج MediaPipe: نقاط الوجه من benchmarks/fixtures/landmarks.npz
+(انظر make_fixtures.py) والإطارات اصطناعية ببذرة ثابتة. عينات الحالات متداخلة،
+ويُكتب الناتج JSON؛ مع --baseline تُعلَّم الحالات الأبطأ من الحد كتراجع (exit code 1).
+Needs no camera or MediaPipe model: landmarks come from
+benchmarks/fixtures/landmarks.npz (see make_fixtures.py) and frames are seeded
+synthetic images. Cases are timed with interleaved samples and the results are
+written as JSON; with --baseline, cases slower than the tolerance are flagged as
+regressions and the exit code is 1.
+
+خط الأساس خاص بكل جهاز ولا يُحفظ في المستودع: أنشئه على جهاز الكشك نفسه بـ --save-baseline.
+المقارنة بأقل زمن (أقل تأثراً بالضوضاء من الوسيط)، وعلى الأجهزة الافتراضية المشتركة
+يُفضّل --repeat أكبر و --tolerance أوسع.
+Baselines are per machine and are not committed: create one on the kiosk
+hardware with --save-baseline. Comparisons use the best (min) sample, which
+noise can only inflate, so it is steadier than the median; on shared VMs use
+a larger --repeat and --tolerance.
+
+Usage:
+    python benchmarks/suite.py                                  # print + benchmarks/results/latest.json
+    python benchmarks/suite.py --save-baseline                  # store benchmarks/baseline.json
+    python benchmarks/suite.py --baseline benchmarks/baseline.json --tolerance 0.25
+    python benchmarks/suite.py --filter sidebar --repeat 50
+"""
+import argparse
+import hashlib
+import json
+import os
+import platform
+import sys
+import time
+from time import perf_counter_ns
+
+import cv2
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.append(ROOT)
+os.chdir(ROOT)  # الأصول والخطوط بمسارات نسبية - assets and fonts use relative paths
+
+from FaceGeometry import score_batch
+from SidebarCompositor import SidebarCompositor
+from SmartExpert import SmartExpert
+from Smart_Glasses_Project import get_geometric_shape, load_glasses_images
+from UIDrawing import (AlphaSprite, COLOR_BG_CARD, COLOR_BG_DARK, COLOR_BG_SIDEBAR, COLOR_SUCCESS,
+                       draw_gradient_background, draw_rounded_rect, overlay_image_alpha, put_arabic_text)
+
+FIXTURE_PATH = os.path.join(BENCH_DIR, "fixtures", "landmarks.npz")
+RESULTS_PATH = os.path.join(BENCH_DIR, "results", "latest.json")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+FRAME_H, FRAME_W, SIDEBAR_W = 720, 1280, 432
+
+
+# ==========================================
+# البيانات الثابتة (Fixtures)
+# ==========================================
+def load_fixture(path=FIXTURE_PATH):
+    """(النقاط، بصمة الملف) - (landmarks, sha256 prefix of the fixture file)."""
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:16]
+    return np.load(path)['landmarks'].astype(np.float64), digest
+
+
+def synthetic_frame(h=FRAME_H, w=FRAME_W, seed=0):
+    """إطار اصطناعي ببذرة ثابتة - Seeded synthetic camera frame."""
+    return np.random.default_rng(seed).integers(0, 256, (h, w, 3), dtype=np.uint8)
+
+
+def glasses_assets(expert):
+    """صور النظارات، أو صورة اصطناعية إن لم توجد الأصول - Glasses sprites, or a synthetic one."""
+    images = load_glasses_images(expert)
+    if not images:
+        rng = np.random.default_rng(0)
+        img = rng.integers(0, 256, (300, 600, 4), dtype=np.uint8)
+        img[..., 3] = rng.choice([0, 128, 255], (300, 600))
+        images = {expert.glass_types[0]['img']: AlphaSprite(img)}
+    return images
+
+
+# ==========================================
+# القياس (Timing)
+# ==========================================
+def measure(cases, repeat, warmup=3):
+    """
+    زمن الاستدعاء الواحد (ميكروثانية) لكل عينة؛ كل عينة = number استدعاءات.
+    عينات الحالات متداخلة (دورة على كل الحالات لكل عينة) فتتوزع عينات كل حالة
+    على مدة التشغيل كلها ولا تقع كلها في فترة بطء واحدة للجهاز.
+    Per-call time in microseconds for each of `repeat` samples of `number`
+    calls, per case. Samples are interleaved round-robin across the cases, so
+    each case's samples are spread over the whole run instead of all landing in
+    one slow spell of the machine.
+    """
+    for fn, _ in cases.values():
+        for _ in range(warmup): fn()
+    samples = {name: np.empty(repeat) for name in cases}
+    for r in range(repeat):
+        for name, (fn, number) in cases.items():
+            t0 = perf_counter_ns()
+            for _ in range(number): fn()
+            samples[name][r] = (perf_counter_ns() - t0) / number / 1e3
+    return samples
+
+
+def build_cases(landmarks):
+    """
+    {الاسم: (الدالة، عدد الاستدعاءات لكل عينة)} - {name: (callable, calls per sample)}.
+    كل دالة تعمل على نسخها الخاصة حتى لا تتأثر الحالات ببعضها.
+    Every callable owns its inputs so cases do not affect each other.
+    """
+    expert = SmartExpert()
+    glasses = glasses_assets(expert)
+    key = next(iter(glasses))
+    sprite = glasses[key]
+    raw_bgra = sprite.premultiplied.copy()
+    # نفس صيغة cvzone في الحلقة الحية (قوائم أعداد صحيحة) - cvzone's format in the live loop (int lists)
+    faces = [[[int(x), int(y)] for x, y in face] for face in landmarks]
+    batch = np.tile(landmarks, (max(1, 256 // len(landmarks)), 1, 1))
+    features, shapes, aligned = score_batch(landmarks)
+    face_data = [{'shape': str(s), 'angle': float(a)} for s, a in zip(shapes, features['chin_angle'])]
+    frame = synthetic_frame()
+    canvas = np.empty((FRAME_H, FRAME_W + SIDEBAR_W, 3), dtype=np.uint8)
+    sidebar_img = np.zeros((FRAME_H, SIDEBAR_W, 3), dtype=np.uint8)
+
+    state = {'i': 0}
+
+    def next_face():
+        state['i'] = (state['i'] + 1) % len(faces)
+        return state['i']
+
+    def geometry():
+        get_geometric_shape(None, faces[next_face()])
+
+    def recommend_memo():
+        expert.recommend(face_data[next_face()])
+
+    # خبير مستقل حتى لا يمسح ذاكرة recommend_memo - Own expert, so it never clears recommend_memo's memo
+    cold_expert = SmartExpert()
+
+    def recommend_cold():
+        cold_expert._memo.clear()
+        cold_expert.recommend(face_data[next_face()])
+
+    def overlay(src):
+        def fn():
+            overlay_image_alpha(frame, src, 100, 80)
+        return fn
+
+    def text_cached():
+        put_arabic_text(frame, "بيضاوي", (640, 360), 24, COLOR_SUCCESS, align="center")
+
+    def gradient():
+        draw_gradient_background(sidebar_img, (0, 0, SIDEBAR_W, FRAME_H), COLOR_BG_SIDEBAR, COLOR_BG_DARK, 'vertical')
+
+    def rounded_rect():
+        draw_rounded_rect(sidebar_img, (20, 100), (SIDEBAR_W - 20, 200), COLOR_BG_CARD, radius=12, fill=True)
+
+    steady = SidebarCompositor(glasses)
+    changing = SidebarCompositor(glasses)
+    cold = SidebarCompositor(glasses)
+    names = [expert.glass_types[g]['name'] for g in expert.glass_types if expert.glass_types[g]['img'] in glasses]
+    keys = [expert.glass_types[g]['img'] for g in expert.glass_types if expert.glass_types[g]['img'] in glasses]
+    stats = [tuple(float(v) for v in row) for row in np.stack([features['face_ratio'], features['chin_angle'],
+                                                               features['jaw_ratio'], features['forehead_ratio']], 1)]
+
+    def sidebar_steady():
+        steady.compose(canvas, FRAME_W, "بيضاوي", COLOR_SUCCESS, stats[0], names[0], keys[0])
+
+    def sidebar_changing():
+        # كل إطار شكل وإحصائيات وتوصية مختلفة - every frame changes shape, stats and recommendation
+        i = next_face()
+        changing.compose(canvas, FRAME_W, f"تحليل {i}%", COLOR_SUCCESS, stats[i], names[i % len(names)],
+                         keys[i % len(keys)])
+
+    def sidebar_cold():
+        cold.invalidate()
+        cold.compose(canvas, FRAME_W, "بيضاوي", COLOR_SUCCESS, stats[0], names[0], keys[0])
+
+    return {
+        'geometry.get_geometric_shape': (geometry, 100),
+        'geometry.score_batch_256': (lambda: score_batch(batch), 10),
+        'expert.recommend': (recommend_memo, 1000),
+        'expert.recommend_uncached': (recommend_cold, 100),
+        'expert.recommend_batch_256': (lambda: expert.recommend_batch(
+            [face_data[i % len(face_data)] for i in range(256)]), 10),
+        'ui.overlay_image_alpha': (overlay(sprite), 20),
+        'ui.overlay_image_alpha_raw': (overlay(raw_bgra), 20),
+        'ui.put_arabic_text': (text_cached, 100),
+        'ui.draw_gradient_background': (gradient, 20),
+        'ui.draw_rounded_rect': (rounded_rect, 50),
+        'sidebar.compose_steady': (sidebar_steady, 20),
+        'sidebar.compose_changing': (sidebar_changing, 10),
+        'sidebar.compose_cold': (sidebar_cold, 2),
+    }
+
+
+def run_suite(cases, repeat):
+    """تشغيل كل الحالات - Time every case; returns {name: stats}."""
+    results = {}
+    for name, us in measure(cases, repeat).items():
+        number = cases[name][1]
+        results[name] = {
+            'median_us': round(float(np.median(us)), 3),
+            'p95_us': round(float(np.percentile(us, 95)), 3),
+            'mean_us': round(float(us.mean()), 3),
+            'min_us': round(float(us.min()), 3),
+            'number': number, 'repeat': repeat,
+        }
+        print(f"{name:34s} {results[name]['median_us']:12.2f} us  (min {results[name]['min_us']:.2f}, "
+              f"p95 {results[name]['p95_us']:.2f})",
+              file=sys.stderr)
+    return results
+
+
+def metadata(fixture_hash, threads):
+    """معلومات الجهاز والإصدارات - Host and library versions, stored with the results."""
+    return {
+        'time': time.strftime("%Y-%m-%dT%H:%M:%S"), 'host': platform.node(),
+        'platform': platform.platform(), 'processor': platform.processor(), 'python': platform.python_version(),
+        'numpy': np.__version__, 'opencv': cv2.__version__, 'cv2_threads': threads,
+        'fixture_sha256': fixture_hash,
+    }
+
+
+# ==========================================
+# المقارنة بخط الأساس (Baseline Comparison)
+# ==========================================
+def compare(results, baseline, tolerance, stat="min_us"):
+    """
+    نسبة الإحصاء الجديد (الأقل افتراضياً) إلى خط الأساس لكل حالة؛ ما يزيد عن 1 + tolerance تراجع.
+    Ratio of the new to the baseline statistic (min by default) per case; above
+    1 + tolerance is a regression. Returns (rows, regressions).
+    """
+    rows, regressions = [], []
+    for name, new in results.items():
+        old = baseline['results'].get(name)
+        if old is None:
+            rows.append((name, None, new[stat], None, "new"))
+            continue
+        ratio = new[stat] / max(old[stat], 1e-9)
+        status = "REGRESSION" if ratio > 1 + tolerance else ("faster" if ratio < 1 - tolerance else "ok")
+        if status == "REGRESSION": regressions.append(name)
+        rows.append((name, old[stat], new[stat], ratio, status))
+    return rows, regressions
+
+
+def machine_mismatch(meta, baseline_meta):
+    """مفاتيح الجهاز والإصدارات المختلفة عن خط الأساس - Host/version keys that differ from the baseline."""
+    keys = ('host', 'platform', 'processor', 'python', 'numpy', 'opencv', 'cv2_threads')
+    return [k for k in keys if meta.get(k) != baseline_meta.get(k)]
+
+
+def print_comparison(rows, stat="min_us"):
+    print(f"{'case':34s} {'baseline ' + stat[:-3]:>12s} {'now':>12s} {'ratio':>7s}  status")
+    for name, old, new, ratio, status in rows:
+        old_s = f"{old:12.2f}" if old is not None else f"{'-':>12s}"
+        ratio_s = f"{ratio:7.2f}" if ratio is not None else f"{'-':>7s}"
+        print(f"{name:34s} {old_s} {new:12.2f} {ratio_s}  {status}")
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=30, help="samples per case")
+    parser.add_argument("--filter", default="", help="only cases whose name contains this text")
+    parser.add_argument("--output", default=RESULTS_PATH, help="machine-readable results (JSON)")
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before a regression")
+    parser.add_argument("--stat", choices=("min_us", "median_us"), default="min_us",
+                        help="statistic compared with the baseline")
+    parser.add_argument("--save-baseline", nargs="?", const=BASELINE_PATH, help="also store results as a baseline")
+    parser.add_argument("--threads", type=int, default=1, help="OpenCV threads (fixed for repeatable numbers)")
+    args = parser.parse_args()
+
+    cv2.setNumThreads(args.threads)
+    landmarks, fixture_hash = load_fixture()
+    cases = {k: v for k, v in build_cases(landmarks).items() if args.filter in k}
+    data = {'meta': metadata(fixture_hash, args.threads), 'results': run_suite(cases, args.repeat)}
+    write_json(args.output, data)
+    if args.save_baseline: write_json(args.save_baseline, data)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline['meta'].get('fixture_sha256') != fixture_hash:
+            print("warning: baseline was recorded with a different fixture file", file=sys.stderr)
+        mismatch = machine_mismatch(data['meta'], baseline['meta'])
+        if mismatch:
+            print(f"warning: baseline is from another machine or setup ({', '.join(mismatch)} differ); "
+                  "re-create it here with --save-baseline", file=sys.stderr)
+        rows, regressions = compare(data['results'], baseline, args.tolerance, args.stat)
+        print_comparison(rows, args.stat)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+اختبارات تطابق المسار العددي (وجه واحد) مع المسار المتجه في FaceGeometry.
+Parity tests: the scalar single-face path against the vectorized batch path.
+"""
+import itertools
+import math
+import os
+
+import numpy as np
+import pytest
+
+import FaceGeometry as fg
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            "benchmarks", "fixtures", "landmarks.npz")
+FEATURE_KEYS = ('h_face', 'w_cheeks', 'w_jaw', 'w_forehead', 'face_ratio', 'jaw_ratio',
+                'forehead_ratio', 'chin_angle', 'yaw_ratio')
+
+
+def fixture_faces():
+    lm = np.load(FIXTURE_PATH)['landmarks'].astype(np.float64)
+    rng = np.random.default_rng(0)
+    # تشويش يعبر حدود القواعد - jitter that crosses the rule thresholds
+    return np.concatenate([lm] + [lm + rng.normal(0, 4, lm.shape) for _ in range(10)])
+
+
+def degenerate_faces():
+    base = np.load(FIXTURE_PATH)['landmarks'][0].astype(np.float64)
+    faces = []
+    face = base.copy(); face[fg.CHEEK_R] = face[fg.CHEEK_L]; faces.append(face)    # zero cheek width
+    face = base.copy(); face[fg.FORE_R] = face[fg.FORE_L]; faces.append(face)      # zero forehead width
+    face = base.copy(); face[fg.JAW_L] = face[fg.CHIN_BOTTOM]; faces.append(face)  # collapsed chin angle
+    faces.append(np.zeros_like(base))                                               # every point equal
+    face = base.copy(); face[fg.CHEEK_L] = np.nan; faces.append(face)              # NaN cheek
+    face = base.copy(); face[fg.CHIN_BOTTOM] = np.nan; faces.append(face)          # NaN chin
+    return np.stack(faces)
+
+
+def assert_features_match(face, batch_features, i):
+    scalar = fg.face_features(face)
+    for key in FEATURE_KEYS:
+        np.testing.assert_allclose(scalar[key], batch_features[key][i], rtol=1e-9, atol=1e-9,
+                                   equal_nan=True, err_msg=key)
+    return scalar
+
+
+# ==========================================
+# الخصائص (Features)
+# ==========================================
+@pytest.mark.parametrize("faces", [fixture_faces(), degenerate_faces()], ids=["fixtures", "degenerate"])
+def test_face_features_match_compute_features(faces):
+    batch = fg.compute_features(faces)
+    shapes = fg.classify_shapes(batch)
+    with np.errstate(invalid='ignore'):
+        for i, face in enumerate(faces):
+            scalar = assert_features_match(face, batch, i)
+            assert fg.classify_shape(scalar) == shapes[i]
+
+
+def test_cvzone_lists_match_arrays():
+    faces = fixture_faces()[:64]
+    lists = [[[int(x), int(y)] for x, y in face] for face in faces]
+    batch = fg.compute_features(lists)
+    np.testing.assert_allclose(fg.compute_features(np.array(lists, dtype=np.float64))['face_ratio'],
+                               batch['face_ratio'])
+    for i, face in enumerate(lists):
+        assert_features_match(face, batch, i)
+
+
+def test_zero_cheek_width_gives_inf_or_nan():
+    features = fg.face_features(degenerate_faces()[0])
+    assert features['w_cheeks'] == 0
+    assert math.isinf(features['face_ratio'])
+    assert fg.classify_shape(features) == "Oblong"
+
+
+# ==========================================
+# القواعد (Shape Rules)
+# ==========================================
+def test_classify_shape_matches_classify_shapes_on_thresholds():
+    # كل قيمة حدية وما يجاورها لكل خاصية - every threshold and its neighbours for every feature
+    rules = fg.SHAPE_RULES
+    values = {
+        'face_ratio': [rules['oblong_face_ratio'], rules['short_face_ratio']],
+        'chin_angle': [rules['square_chin_angle'], rules['pointed_chin_angle']],
+        'jaw_ratio': [rules['oval_jaw_ratio']],
+        'forehead_ratio': [rules['heart_forehead_ratio']],
+    }
+    values = {k: sorted({v + d for v in vs for d in (-0.5, 0.0, 0.5)} | {math.nan, math.inf})
+              for k, vs in values.items()}
+    combos = list(itertools.product(*values.values()))
+    columns = {k: np.array(col) for k, col in zip(values, zip(*combos))}
+    shapes = fg.classify_shapes(columns)
+    for i, combo in enumerate(combos):
+        assert fg.classify_shape(dict(zip(values, combo))) == shapes[i], combo
+
+
+def test_both_paths_follow_the_rule_table(monkeypatch):
+    features = {'face_ratio': 125.0, 'chin_angle': 80.0, 'jaw_ratio': 90.0, 'forehead_ratio': 75.0}
+    assert fg.classify_shape(features) == fg.classify_shapes(features) == "Heart"
+    monkeypatch.setitem(fg.SHAPE_RULES, 'short_face_ratio', 126.0)
+    assert fg.classify_shape(features) == fg.classify_shapes(features) == "Round"
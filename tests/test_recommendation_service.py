@@ -0,0 +1,153 @@
+"""
+اختبارات خدمة التوصيات: تحليل جسم الطلب وحالات الرد (200/400/404/405/413/503).
+Tests for RecommendationService: request-body parsing and the HTTP status paths.
+"""
+import asyncio
+import io
+import json
+import os
+
+import numpy as np
+import pytest
+
+import RecommendationService as rs
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            "benchmarks", "fixtures", "landmarks.npz")
+
+
+def npy_body(arr):
+    buf = io.BytesIO()
+    np.save(buf, arr)
+    return buf.getvalue()
+
+
+def fixture_face():
+    return np.load(FIXTURE_PATH)['landmarks'][0].astype(np.float64)
+
+
+async def exchange(service, raw, run_batcher=True):
+    """
+    إرسال طلب خام إلى خادم مؤقت وقراءة الرد حتى الإغلاق - Send raw bytes to a
+    temporary server and read one response. Returns (status, payload).
+    """
+    server = await asyncio.start_server(service.handle, "127.0.0.1", 0, limit=rs.MAX_BODY)
+    batcher = asyncio.create_task(service.landmarks.run()) if run_batcher else None
+    try:
+        reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+        writer.write(raw)
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b""): break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length": length = int(value)
+        payload = json.loads(await reader.readexactly(length))
+        writer.close()
+        return status, payload
+    finally:
+        if batcher is not None: batcher.cancel()
+        server.close()
+        await server.wait_closed()
+
+
+def request(method, path, body=b"", content_type="application/json", headers=()):
+    head = [f"{method} {path} HTTP/1.1", "Host: localhost", f"Content-Length: {len(body)}",
+            f"Content-Type: {content_type}", "Connection: close", *headers]
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+
+def call(raw, service=None, run_batcher=True):
+    return asyncio.run(exchange(service or rs.RecommendationService(workers=0), raw, run_batcher))
+
+
+# ==========================================
+# تحليل جسم الطلب (Body Parsing)
+# ==========================================
+@pytest.mark.parametrize("body, content_type", [
+    (b'{"landmarks": [{"x": 1}, {"x": 2}]}', "application/json"),
+    (b'{"x": 1}', "application/json"),
+    (b'null', "application/json"),
+    (b'not json', "application/json"),
+    (b'{"faces": [[1, 2], [3]]}', "application/json"),
+    (b'{"faces": [[1e400, 1]]}', "application/json"),
+    (b'', "application/x-npy"),
+    (npy_body(np.zeros((468, 2)))[:60], "application/x-npy"),
+    (npy_body(np.zeros((468, 2)))[:-100], "application/x-npy"),
+    (npy_body(np.zeros((468, 3))), "application/x-npy"),
+    (npy_body(np.zeros((rs.MAX_FACES_PER_REQUEST + 1, 468, 2))), "application/x-npy"),
+], ids=["dict-items", "no-faces-key", "null", "not-json", "ragged", "inf", "empty-npy",
+        "truncated-header", "truncated-data", "wrong-shape", "too-many-faces"])
+def test_malformed_bodies_raise_value_error(body, content_type):
+    with pytest.raises(ValueError):
+        rs.parse_landmarks(body, content_type)
+
+
+def test_parse_single_face_and_batch():
+    face = fixture_face()
+    assert rs.parse_landmarks(json.dumps({'landmarks': face.tolist()}).encode(), "application/json").shape == (1, 468, 2)
+    assert rs.parse_landmarks(npy_body(np.stack([face, face])), "application/x-npy").shape == (2, 468, 2)
+
+
+# ==========================================
+# حالات الرد (Status Paths)
+# ==========================================
+def test_landmarks_200():
+    body = json.dumps({'faces': [fixture_face().tolist()]}).encode()
+    status, payload = call(request("POST", "/v1/landmarks", body))
+    assert status == 200
+    assert len(payload['faces']) == 1 and 'recommendations' in payload['faces'][0]
+
+
+@pytest.mark.parametrize("body, content_type", [
+    (b'{"landmarks": [{"x": 1}, {"x": 2}]}', "application/json"),
+    (b'', "application/x-npy"),
+    (b'{"x": 1}', "application/json"),
+])
+def test_malformed_body_400(body, content_type):
+    status, payload = call(request("POST", "/v1/landmarks", body, content_type))
+    assert status == 400 and payload['error']
+
+
+@pytest.mark.parametrize("raw", [
+    b"GARBAGE\r\n\r\n",
+    b"POST /v1/landmarks HTTP/1.1\r\nContent-Length: abc\r\n\r\n",
+    b"POST /v1/landmarks HTTP/1.1\r\nContent-Length: -5\r\n\r\n",
+], ids=["request-line", "content-length", "negative-length"])
+def test_malformed_request_400(raw):
+    assert call(raw)[0] == 400
+
+
+def test_unknown_path_404():
+    assert call(request("GET", "/v2/nothing"))[0] == 404
+
+
+def test_frames_disabled_404():
+    assert call(request("POST", "/v1/frame", b"\xff\xd8", "image/jpeg"))[0] == 404
+
+
+@pytest.mark.parametrize("method, path", [("GET", "/v1/landmarks"), ("POST", "/v1/health")])
+def test_wrong_method_405(method, path):
+    assert call(request(method, path))[0] == 405
+
+
+def test_body_over_limit_413():
+    raw = (f"POST /v1/landmarks HTTP/1.1\r\nContent-Length: {rs.MAX_BODY + 1}\r\n"
+           "Connection: close\r\n\r\n").encode("latin-1")
+    assert call(raw)[0] == 413
+
+
+def test_full_queue_503():
+    async def scenario():
+        # بدون مُجمّع يعمل يبقى أول طلب في الطابور فيُرفض الثاني
+        # No batcher running: the first request stays queued, so the second is rejected
+        service = rs.RecommendationService(workers=0, max_queue=1)
+        service.landmarks.queue.put_nowait((None, asyncio.get_running_loop().create_future()))
+        body = json.dumps({'landmarks': fixture_face().tolist()}).encode()
+        return await exchange(service, request("POST", "/v1/landmarks", body), run_batcher=False), service
+
+    (status, _), service = asyncio.run(scenario())
+    assert status == 503
+    assert service.landmarks.stats['rejected'] == 1
@@ -0,0 +1,45 @@
+"""
+اختبارات ShapeEvaluator: بصمة نسخة القواعد وتطابق المسار الحي مع مسار الدفعات.
+Tests for ShapeEvaluator: the rule classifier's version and live/batch agreement.
+"""
+import numpy as np
+
+import FaceGeometry
+import ShapeEvaluator
+from ShapeClassifier import RuleClassifier
+
+
+def feature_rows(n=500):
+    rng = np.random.default_rng(0)
+    return np.column_stack([rng.uniform(115, 135, n), rng.uniform(85, 100, n),
+                            rng.uniform(60, 80, n), rng.uniform(78, 95, n)])
+
+
+def test_threshold_edit_is_a_new_version(monkeypatch):
+    clf = RuleClassifier()
+    before = ShapeEvaluator.classifier_version(clf)
+    assert ShapeEvaluator.classifier_version(clf) == before
+    monkeypatch.setitem(FaceGeometry.SHAPE_RULES, 'oval_jaw_ratio', 95.0)
+    assert ShapeEvaluator.classifier_version(clf) != before
+
+
+def test_report_uses_live_path_and_matches_batch(tmp_path):
+    clf, X = RuleClassifier(), feature_rows()
+    truth = clf.predict(X)
+    cache = ShapeEvaluator.ResultCache(str(tmp_path / "eval.sqlite"))
+    try:
+        version = ShapeEvaluator.classifier_version(clf)
+        report = ShapeEvaluator.evaluate_input(clf, version, X, truth, cache, repeat=1)
+        assert report['accuracy'] == 1.0
+        assert report['batch_mismatches'] == 0
+        assert report['rescored'] == len(X) and not report['cached']
+        assert list(ShapeEvaluator.live_predict(clf, X)) == list(truth)
+
+        again = ShapeEvaluator.evaluate_input(clf, version, X, truth, cache, repeat=1)
+        assert again['cached'] and again['rescored'] == 0
+        assert again['accuracy'] == report['accuracy']
+        # السرعة تُقاس من جديد ولا تُحفظ - speed is re-measured, not stored
+        assert again['faces_per_s'] is not None
+        assert 'faces_per_s' not in cache.report(version, ShapeEvaluator.feature_hash(X, truth))
+    finally:
+        cache.close()
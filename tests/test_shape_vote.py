@@ -0,0 +1,116 @@
+"""
+اختبارات ShapeVoter: الأغلبية، ثبات القائد، مسح التقدم، ووضع النسب المنعّمة.
+Tests for ShapeVoter: majority vote, leader hysteresis, miss resets and the EW-ratio mode.
+"""
+import numpy as np
+import pytest
+
+from ShapeVote import ShapeVoter
+
+
+def push_all(voter, shapes):
+    for shape in shapes: voter.push(shape)
+    return voter
+
+
+# ==========================================
+# الأغلبية والنافذة (Majority & Window)
+# ==========================================
+def test_push_counts_and_majority():
+    voter = push_all(ShapeVoter(size=5), ["Oval", "Round", "Oval"])
+    assert voter.counts == {"Oval": 2, "Round": 1}
+    assert voter.shape == "Oval"
+    assert voter.progress == pytest.approx(3 / 5)
+    assert not voter.full
+
+
+def test_window_drops_oldest_votes():
+    voter = push_all(ShapeVoter(size=3), ["Oval", "Oval", "Oval", "Heart", "Heart"])
+    assert voter.full
+    assert voter.count == 3
+    assert voter.counts == {"Oval": 1, "Heart": 2}
+    assert voter.shape == "Heart"
+
+
+def test_push_returns_self():
+    voter = ShapeVoter(size=3)
+    assert voter.push("Oval") is voter
+
+
+# ==========================================
+# ثبات القائد (Leader Hysteresis)
+# ==========================================
+def test_tie_keeps_current_leader():
+    voter = push_all(ShapeVoter(size=4), ["Oval", "Round", "Round", "Oval"])
+    assert voter.counts == {"Oval": 2, "Round": 2}
+    assert voter.shape == "Round"
+
+
+def test_leader_changes_only_when_beaten_outright():
+    voter = push_all(ShapeVoter(size=4), ["Oval", "Oval", "Round"])
+    voter.push("Round")
+    assert voter.shape == "Oval"
+    voter.push("Round")  # Oval يفقد صوتاً - evicts an Oval vote: Round 3 vs Oval 1
+    assert voter.shape == "Round"
+
+
+def test_leader_re_elected_when_it_loses_its_votes():
+    # القائد يخسر أصواته بالإزاحة لا بتفوق الشكل المضاف - the leader loses votes to eviction
+    voter = push_all(ShapeVoter(size=4), ["Oval", "Oval", "Round", "Round"])
+    assert voter.shape == "Oval"
+    voter.push("Heart")  # Oval 1, Round 2, Heart 1
+    assert voter.shape == "Round"
+
+
+# ==========================================
+# الإطارات غير المستقيمة (Misses)
+# ==========================================
+def test_misses_reset_only_after_max_misses():
+    voter = push_all(ShapeVoter(size=5, max_misses=2), ["Oval", "Oval"])
+    assert voter.miss() is False
+    assert voter.miss() is False
+    assert voter.shape == "Oval"
+    assert voter.miss() is True
+    assert voter.shape is None
+    assert voter.count == 0 and voter.counts == {}
+
+
+def test_push_clears_miss_streak():
+    voter = ShapeVoter(size=5, max_misses=1).push("Oval")
+    voter.miss()
+    voter.push("Oval")
+    assert voter.miss() is False
+    assert voter.shape == "Oval"
+
+
+# ==========================================
+# النسب المنعّمة (EW-Ratio Mode)
+# ==========================================
+def test_ratios_ignored_without_alpha():
+    voter = ShapeVoter(size=3).push("Oval", [130.0, 90.0])
+    assert voter.ratios is None
+
+
+def classify_by_face_ratio(ratios):
+    return "Oblong" if ratios[0] >= 128 else "Round"
+
+
+def test_ew_ratios_and_classify():
+    voter = ShapeVoter(size=5, ratio_alpha=0.5, classify=classify_by_face_ratio)
+    voter.push("Round", [120.0, 90.0])
+    np.testing.assert_allclose(voter.ratios, [120.0, 90.0])
+    assert voter.shape == "Round"
+    voter.push("Oblong", [140.0, 80.0])
+    np.testing.assert_allclose(voter.ratios, [130.0, 85.0])
+    # الشكل من النسب المنعّمة لا من الأغلبية (تعادل 1-1 يُبقي Round قائداً)
+    # The shape comes from the smoothed ratios, not the vote (the 1-1 tie keeps Round leading)
+    assert voter.leader == "Round"
+    assert voter.shape == "Oblong"
+
+
+def test_ew_ratios_cleared_on_reset():
+    voter = ShapeVoter(size=5, max_misses=0, ratio_alpha=0.5, classify=lambda r: "Oval")
+    voter.push("Round", [120.0])
+    assert voter.miss() is True
+    assert voter.ratios is None
+    assert voter.shape is None
@@ -0,0 +1,48 @@
+"""
+اختبارات SmartExpert: نفس توصيات التنفيذ الأصلي لكل شكل وفئة زاوية.
+Tests for SmartExpert: the same top-3 as the original implementation for every
+shape and angle bucket.
+"""
+import pytest
+
+from benchmarks.bench_recommend import legacy_recommend
+from SmartExpert import SmartExpert, load_rules
+
+SHAPES = [name.capitalize() for name in load_rules()['shapes']] + ["Unknown", "oval face"]
+# زوايا داخل كل فئة وعلى حدودها - Angles inside every bucket and on its edges
+ANGLES = [60, 80, 95, 99.9, 100, 100.1, 105, 120, 150]
+
+
+@pytest.fixture(scope="module")
+def expert():
+    return SmartExpert()
+
+
+def glass_ids(expert, glasses):
+    by_img = {v['img']: k for k, v in expert.glass_types.items()}
+    return [by_img[g['img']] for g in glasses]
+
+
+def test_angles_cover_every_bucket(expert):
+    assert {expert.angle_bucket(a) for a in ANGLES} == set(range(1 << len(expert._ranges)))
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+@pytest.mark.parametrize("angle", ANGLES)
+def test_recommend_matches_legacy(expert, shape, angle):
+    face_data = {'shape': shape, 'angle': angle}
+    assert glass_ids(expert, expert.recommend(face_data)) == glass_ids(expert, legacy_recommend(expert, face_data))
+
+
+def test_recommend_batch_matches_legacy(expert):
+    records = [{'shape': s, 'angle': a} for s in SHAPES for a in ANGLES]
+    ids, _ = expert.recommend_batch(records)
+    for face_data, row in zip(records, ids.tolist()):
+        assert [gid for gid in row if gid >= 0] == glass_ids(expert, legacy_recommend(expert, face_data))
+
+
+def test_ties_go_to_higher_glass_id(expert):
+    # Heart بزاوية حادة: wayfarer (9) و clubmaster (7) بثلاث نقاط - both score 3
+    assert glass_ids(expert, expert.recommend({'shape': 'Heart', 'angle': 80}))[:2] == [9, 7]
+    # Oval: rectangle (0) و square (1) و aviator (4) بنقطتين - all score 2
+    assert glass_ids(expert, expert.recommend({'shape': 'Oval', 'angle': 120})) == [4, 1, 0]